@@ -1,14 +1,38 @@
+import httpx
 from fastapi import Depends, Request, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.exceptions import UnauthorizedException
 from app.core.dependency_injector import DependencyInjector, ServiceScope
+from app.core.rate_limit import SlidingWindowRateLimiter
+from app.core.timing import timed
 from app.services.aws.cognito.auth import CognitoServiceInterface, CognitoService
+from app.services.aws.cognito.client import CognitoHttpClient
+from app.services.aws.cognito.token_management import TokenVerifier, TokenUse
 
 
 http_bearer = HTTPBearer()
 
+
+async def create_token_verifier() -> TokenVerifier:
+    """
+    Creates the token verifier with its signing keys and revocations loaded and its background tasks running.
+
+    If starting fails, the parts that were already started are stopped before the error is raised.
+    """
+    token_verifier = TokenVerifier()
+    try:
+        await token_verifier.start()
+    except BaseException:
+        await token_verifier.close()
+        raise
+    return token_verifier
+
+
 injector = DependencyInjector()
+injector.register_factory(httpx.AsyncClient, CognitoHttpClient.get)
+injector.register_async(TokenVerifier, create_token_verifier, aclose=TokenVerifier.close)
 injector.register(CognitoServiceInterface, CognitoService, scope=ServiceScope.SCOPED)
+injector.register(SlidingWindowRateLimiter, SlidingWindowRateLimiter, scope=ServiceScope.SINGLETON)
 
 
 async def get_access_token(credentials: HTTPAuthorizationCredentials = Security(http_bearer)):
@@ -17,11 +41,7 @@ async def get_access_token(credentials: HTTPAuthorizationCredentials = Security(
         raise UnauthorizedException()
 
     access_token = credentials.credentials
-
-    if not validate_access_token(access_token):
-        # TODO custom exception for access token
-        raise UnauthorizedException()
-
+    await validate_access_token(access_token)
     return access_token
 
 
@@ -46,17 +66,52 @@ async def get_refresh_token(request: Request) -> str:
     return refresh_header[7:].strip()
 
 
-# TODO validate token by public_key
-async def validate_access_token(access_token: str) -> bool:
-    return True
+async def validate_access_token(access_token: str) -> dict:
+    """
+    Verifies an access token locally against the user pool's signing keys.
+
+    Args:
+        access_token (str): The encoded access token.
+
+    Returns:
+        dict: The verified token claims.
+
+    Raises:
+        UnauthorizedException: If the token is invalid.
+        TokenExpiredException: If the token has expired.
+    """
+    token_verifier = await injector.resolve_async(TokenVerifier)
+    with timed("jwt-verify"):
+        return await token_verifier.verify(access_token, TokenUse.ACCESS)
 
 
 async def get_authenticated_cognito_service(access_token: str = Depends(get_access_token)):
-    cognito_service = injector.resolve(CognitoServiceInterface)
+    cognito_service = await injector.resolve_async(CognitoServiceInterface)
+    cognito_service.set_access_token(access_token)
+    return cognito_service
+
+
+async def authenticate_cognito_service(cognito_service: CognitoServiceInterface,
+                                       access_token: str) -> CognitoServiceInterface:
+    """
+    Verifies an access token passed as a GraphQL argument and sets it on the Cognito service.
+
+    Args:
+        cognito_service (CognitoServiceInterface): The Cognito service instance.
+        access_token (str): The encoded access token.
+
+    Returns:
+        CognitoServiceInterface: The service, acting for the token's user.
+
+    Raises:
+        UnauthorizedException: If the token is invalid.
+        TokenExpiredException: If the token has expired.
+    """
+    await validate_access_token(access_token)
     cognito_service.set_access_token(access_token)
     return cognito_service
 
 
 async def get_basic_cognito_service():
-    cognito_service = injector.resolve(CognitoServiceInterface)
+    cognito_service = await injector.resolve_async(CognitoServiceInterface)
     return cognito_service
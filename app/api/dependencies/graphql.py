@@ -0,0 +1,49 @@
+import inspect
+from contextlib import AsyncExitStack
+from functools import wraps
+from typing import Callable, Any
+
+from fastapi import params
+from fastapi.dependencies.utils import get_dependant, solve_dependencies
+from fastapi.exceptions import RequestValidationError
+
+
+def inject_dependencies(resolver: Callable) -> Callable:
+    """
+    Decorator resolving the FastAPI dependencies declared by a GraphQL resolver.
+
+    Ariadne calls resolvers with the GraphQL arguments only, so parameters declared with `Depends(...)`
+    or `Security(...)` would otherwise receive the marker object itself. They are solved here against the
+    HTTP request in the GraphQL context, exactly as FastAPI would for a route, and passed as keyword arguments.
+
+    Args:
+        resolver (Callable): The resolver function.
+
+    Returns:
+        Callable: The resolver with its dependencies injected.
+    """
+    dependency_parameters = [
+        parameter.replace(kind=inspect.Parameter.KEYWORD_ONLY)
+        for parameter in inspect.signature(resolver).parameters.values()
+        if isinstance(parameter.default, params.Depends)
+    ]
+    if not dependency_parameters:
+        return resolver
+
+    def collect(**values: Any) -> dict:
+        return values
+
+    collect.__signature__ = inspect.Signature(dependency_parameters)
+    dependant = get_dependant(path="", call=collect)
+
+    @wraps(resolver)
+    async def wrapper(obj: Any, info: Any, **kwargs: Any) -> Any:
+        async with AsyncExitStack() as stack:
+            values, errors, *_ = await solve_dependencies(
+                request=info.context["request"], dependant=dependant, async_exit_stack=stack
+            )
+            if errors:
+                raise RequestValidationError(errors)
+            return await resolver(obj, info, **kwargs, **values)
+
+    return wrapper
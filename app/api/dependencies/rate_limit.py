@@ -0,0 +1,62 @@
+import logging
+from functools import wraps
+from typing import Any, Callable
+
+from app.api.dependencies.auth import injector
+from app.core.config import settings
+from app.core.error_codes import TooManyRequestsSupportCodes
+from app.core.exceptions import TooManyRequestsException
+from app.core.metrics import default_recorder
+from app.core.rate_limit import KeyType, SlidingWindowRateLimiter, client_address
+
+logger = logging.getLogger(__name__)
+
+
+def rate_limited(operation: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator applying the rate limits of a GraphQL operation to its resolver.
+
+    The request is counted by the client's address and by the resolver's `username` argument before the
+    resolver (and its dependencies) run, so a rejected request costs no Cognito call. Limits are taken
+    from the RATE_LIMITS setting; operations without limits are not counted. RATE_LIMIT_ENABLED is read
+    on every call, so the settings are not loaded when resolvers are decorated at import.
+
+    Args:
+        operation (str): The GraphQL operation the limits are configured under, e.g. 'login'.
+
+    Returns:
+        Callable[[Callable], Callable]: The decorator.
+
+    Raises:
+        TooManyRequestsException: From the resolver, if the request exceeds one of the limits.
+    """
+    def decorator(resolver: Callable) -> Callable:
+        @wraps(resolver)
+        async def wrapper(obj: Any, info: Any, **kwargs: Any) -> Any:
+            if not settings.rate_limit_enabled:
+                return await resolver(obj, info, **kwargs)
+            request = info.context["request"]
+            username = kwargs.get("username")
+            values = {
+                KeyType.IP: client_address(
+                    request.client.host if request.client else None,
+                    request.headers.get("x-forwarded-for"), settings.rate_limit_trusted_hops,
+                ),
+                # Cognito usernames are case-insensitive by default
+                KeyType.USERNAME: username.casefold() if username else None,
+            }
+            exceeded = await injector.resolve(SlidingWindowRateLimiter).hit(operation, values)
+            if exceeded is not None:
+                recorder = default_recorder()
+                if recorder is not None:
+                    recorder.observe_rate_limited(operation, exceeded.key_type.value)
+                logger.info(
+                    "Rate limit %s/%ss by %s exceeded for %s; retry after %ss", exceeded.rate_limit.limit,
+                    exceeded.rate_limit.window, exceeded.key_type.value, operation, exceeded.retry_after,
+                )
+                raise TooManyRequestsException(support_code=TooManyRequestsSupportCodes.RATE_LIMITED)
+            return await resolver(obj, info, **kwargs)
+
+        return wrapper
+
+    return decorator
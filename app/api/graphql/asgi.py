@@ -0,0 +1,54 @@
+from typing import Any, Optional
+
+from starlette.types import Receive, Scope, Send
+
+
+class LazyGraphQL:
+    """
+    ASGI app for the GraphQL endpoint that imports Ariadne and builds the executable schema on first use.
+
+    Building the schema is left out of application import so that workers start faster; the lifespan
+    warm-up builds it before the worker reports ready, and otherwise the first request does.
+    """
+
+    def __init__(self, server_timing: bool = False, **options: Any):
+        """
+        Initializes the endpoint.
+
+        Args:
+            server_timing (bool): Whether to record the parse, validation and execution phases as
+                Server-Timing entries.
+            **options (Any): Keyword arguments for ariadne.asgi.GraphQL.
+        """
+        self.server_timing = server_timing
+        self.options = options
+        self._app: Optional[Any] = None
+
+    def build(self) -> Any:
+        """
+        Builds the Ariadne GraphQL app if it has not been built yet.
+
+        Returns:
+            ariadne.asgi.GraphQL: The GraphQL app.
+        """
+        if self._app is None:
+            from ariadne.asgi import GraphQL
+            from app.api.graphql.schema.mutations import get_schema
+            options = dict(self.options)
+            if self.server_timing:
+                from app.api.graphql.timing import timing_options
+                options.update(timing_options())
+            self._app = GraphQL(get_schema(), **options)
+        return self._app
+
+    @property
+    def schema(self) -> Any:
+        """
+        The executable schema, built on first access.
+        """
+        from app.api.graphql.schema.mutations import get_schema
+        self.build()
+        return get_schema()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.build()(scope, receive, send)
@@ -0,0 +1,65 @@
+from typing import TYPE_CHECKING, Any, Optional
+
+from app.core.error_codes import ErrorCodes
+from app.core.log_sampling import current_request
+from app.core.metrics import error_code, recorder
+from app.core.request_context import set_operation_name
+
+if TYPE_CHECKING:
+    from graphql import DocumentNode, GraphQLError
+
+
+def operation_field(document: 'DocumentNode', name: Optional[str] = None) -> Optional[str]:
+    """
+    Returns the top-level field of the operation executed from the document, e.g. 'login' for
+    `mutation { login(...) { ... } }`.
+
+    Operations are identified by their field rather than by the name the client gave them, which is
+    arbitrary and would make per-operation sample rates and metric labels unbounded.
+
+    Args:
+        document (DocumentNode): The parsed query document.
+        name (Optional[str]): The operation name sent by the client, if any.
+
+    Returns:
+        Optional[str]: The field name, or None if the document has no matching operation.
+    """
+    for definition in document.definitions:
+        if definition.kind != "operation_definition":
+            continue
+        if name is not None and (definition.name is None or definition.name.value != name):
+            continue
+        for selection in definition.selection_set.selections:
+            if selection.kind == "field":
+                return selection.name.value
+        return None
+    return None
+
+
+def operation_root_value(context: Any, name: Optional[str], variables: Optional[dict],
+                         document: 'DocumentNode') -> None:
+    """
+    Ariadne `root_value` callable recording the operation of the request, for per-operation log
+    sampling and metrics.
+
+    Returns:
+        None: Resolvers receive no root value, as without this callable.
+    """
+    set_operation_name(operation_field(document, name))
+    return None
+
+
+def error_formatter(error: 'GraphQLError', debug: bool = False) -> dict:
+    """
+    Ariadne `error_formatter` counting the error by its code and marking the request as failed, so
+    that all its log records are kept.
+    """
+    from ariadne import format_error
+
+    # Errors without an original exception are syntax and validation errors of the query
+    original = error.original_error
+    recorder.observe_error(ErrorCodes.INVALID_REQUEST.code if original is None else error_code(original))
+    request = current_request()
+    if request is not None and not request.failed:
+        request.fail()
+    return format_error(error, debug)
@@ -7,9 +7,12 @@ including login, sign-up, password management, and user attribute updates.
 
 from ariadne import MutationType
 from fastapi import Depends
+from app.api.dependencies.graphql import inject_dependencies
+from app.api.dependencies.rate_limit import rate_limited
 from app.services.aws.cognito.auth import CognitoServiceInterface
 from app.api.dependencies.auth import (
-    get_refresh_token, get_authenticated_cognito_service,
+    authenticate_cognito_service,
+    get_authenticated_cognito_service,
     get_basic_cognito_service
 )
 from app.api.models.auth_models import (
@@ -17,7 +20,8 @@ from app.api.models.auth_models import (
     ConfirmSignUpResponse, ResendConfirmationCodeRequest, ResendConfirmationCodeResponse,
     TokenRefreshRequest, TokenRefreshResponse, ChangePasswordRequest, ChangePasswordResponse,
     ForgotPasswordRequest, ForgotPasswordResponse, ConfirmForgotPasswordRequest,
-    ConfirmForgotPasswordResponse, UpdateUserAttributesRequest, UpdateUserAttributesResponse
+    ConfirmForgotPasswordResponse, UpdateUserAttributesRequest, UpdateUserAttributesResponse,
+    GlobalSignOutResponse, RevokeTokenRequest, RevokeTokenResponse
 )
 
 # Define the MutationType instance for GraphQL
@@ -25,6 +29,8 @@ mutation = MutationType()
 
 
 @mutation.field("login")
+@rate_limited("login")
+@inject_dependencies
 async def resolve_login(
         _, info, username: str, password: str,
         cognito_service: CognitoServiceInterface = Depends(get_basic_cognito_service)
@@ -50,6 +56,7 @@ async def resolve_login(
 
 
 @mutation.field("signUp")
+@inject_dependencies
 async def resolve_sign_up(
         _, info, username: str, password: str, email: str, phone_number: str = None,
         given_name: str = None, family_name: str = None,
@@ -83,6 +90,7 @@ async def resolve_sign_up(
 
 
 @mutation.field("confirmSignUp")
+@inject_dependencies
 async def resolve_confirm_sign_up(
         _, info, username: str, confirmation_code: str,
         cognito_service: CognitoServiceInterface = Depends(get_basic_cognito_service)
@@ -108,6 +116,8 @@ async def resolve_confirm_sign_up(
 
 
 @mutation.field("resendConfirmationCode")
+@rate_limited("resendConfirmationCode")
+@inject_dependencies
 async def resolve_resend_confirmation_code(
         _, info, username: str,
         cognito_service: CognitoServiceInterface = Depends(get_basic_cognito_service)
@@ -132,8 +142,9 @@ async def resolve_resend_confirmation_code(
 
 
 @mutation.field("refreshToken")
+@inject_dependencies
 async def resolve_refresh_token(
-        _, info, refresh_token: str = Depends(get_refresh_token),
+        _, info, refresh_token: str, username: str = None,
         cognito_service: CognitoServiceInterface = Depends(get_basic_cognito_service)
 ) -> TokenRefreshResponse:
     """
@@ -146,19 +157,22 @@ async def resolve_refresh_token(
         _: Root value, not used.
         info: GraphQL context.
         refresh_token (str): The refresh token to be used for getting new tokens.
+        username (str, optional): The user the token was issued to; required to compute the SECRET_HASH
+            when the app client has a secret.
         cognito_service (CognitoServiceInterface, optional): The Cognito service instance.
 
     Returns:
         TokenRefreshResponse: A Pydantic model with new access and ID tokens.
     """
-    request = TokenRefreshRequest(refresh_token=refresh_token)
+    request = TokenRefreshRequest(refresh_token=refresh_token, username=username)
     return await cognito_service.refresh_token(request)
 
 
 @mutation.field("changePassword")
+@inject_dependencies
 async def resolve_change_password(
-        _, info, previous_password: str, proposed_password: str,
-        cognito_service: CognitoServiceInterface = Depends(get_authenticated_cognito_service)
+        _, info, access_token: str, previous_password: str, proposed_password: str,
+        cognito_service: CognitoServiceInterface = Depends(get_basic_cognito_service)
 ) -> ChangePasswordResponse:
     """
     Handles the changePassword mutation for updating the user's password.
@@ -169,6 +183,7 @@ async def resolve_change_password(
     Args:
         _: Root value, not used.
         info: GraphQL context.
+        access_token (str): The user's access token.
         previous_password (str): The user's current password.
         proposed_password (str): The new password the user wishes to set.
         cognito_service (CognitoServiceInterface, optional): The Cognito service instance.
@@ -176,11 +191,14 @@ async def resolve_change_password(
     Returns:
         ChangePasswordResponse: A Pydantic model containing the result of the password change operation.
     """
+    await authenticate_cognito_service(cognito_service, access_token)
     request = ChangePasswordRequest(previous_password=previous_password, proposed_password=proposed_password)
     return await cognito_service.change_password(request)
 
 
 @mutation.field("forgotPassword")
+@rate_limited("forgotPassword")
+@inject_dependencies
 async def resolve_forgot_password(
         _, info, username: str,
         cognito_service: CognitoServiceInterface = Depends(get_basic_cognito_service)
@@ -205,6 +223,7 @@ async def resolve_forgot_password(
 
 
 @mutation.field("confirmForgotPassword")
+@inject_dependencies
 async def resolve_confirm_forgot_password(
         _, info, username: str, confirmation_code: str, new_password: str,
         cognito_service: CognitoServiceInterface = Depends(get_basic_cognito_service)
@@ -233,9 +252,10 @@ async def resolve_confirm_forgot_password(
 
 
 @mutation.field("updateUserAttributes")
+@inject_dependencies
 async def resolve_update_user_attributes(
-        _, info, attributes: list,
-        cognito_service: CognitoServiceInterface = Depends(get_authenticated_cognito_service)
+        _, info, access_token: str, attributes: list,
+        cognito_service: CognitoServiceInterface = Depends(get_basic_cognito_service)
 ) -> UpdateUserAttributesResponse:
     """
     Handles the updateUserAttributes mutation to update user attributes.
@@ -246,11 +266,63 @@ async def resolve_update_user_attributes(
     Args:
         _: Root value, not used.
         info: GraphQL context.
-        attributes (list): List of attributes to be updated for the user.
+        access_token (str): The user's access token.
+        attributes (list): List of AttributeInput objects ({'name': ..., 'value': ...}) to be updated.
         cognito_service (CognitoServiceInterface, optional): The Cognito service instance.
 
     Returns:
         UpdateUserAttributesResponse: A Pydantic model containing the result of the user attributes update.
     """
-    request = UpdateUserAttributesRequest(attributes=attributes)
+    await authenticate_cognito_service(cognito_service, access_token)
+    request = UpdateUserAttributesRequest(
+        attributes={attribute["name"]: attribute["value"] for attribute in attributes if attribute is not None}
+    )
     return await cognito_service.update_user_attributes(request)
+
+
+@mutation.field("globalSignOut")
+@inject_dependencies
+async def resolve_global_sign_out(
+        _, info,
+        cognito_service: CognitoServiceInterface = Depends(get_authenticated_cognito_service)
+) -> GlobalSignOutResponse:
+    """
+    Handles the globalSignOut mutation to sign the user out from all devices.
+
+    This resolver invalidates all of the authenticated user's refresh tokens in Cognito and stops
+    accepting their access tokens issued so far.
+
+    Args:
+        _: Root value, not used.
+        info: GraphQL context.
+        cognito_service (CognitoServiceInterface, optional): The Cognito service instance.
+
+    Returns:
+        GlobalSignOutResponse: A Pydantic model containing the result of the sign-out.
+    """
+    return await cognito_service.global_sign_out()
+
+
+@mutation.field("revokeToken")
+@inject_dependencies
+async def resolve_revoke_token(
+        _, info, refresh_token: str,
+        cognito_service: CognitoServiceInterface = Depends(get_authenticated_cognito_service)
+) -> RevokeTokenResponse:
+    """
+    Handles the revokeToken mutation to end the current session.
+
+    This resolver revokes the given refresh token in Cognito and stops accepting the access
+    tokens issued with it, including the one used to authenticate the request.
+
+    Args:
+        _: Root value, not used.
+        info: GraphQL context.
+        refresh_token (str): The refresh token of the session to end.
+        cognito_service (CognitoServiceInterface, optional): The Cognito service instance.
+
+    Returns:
+        RevokeTokenResponse: A Pydantic model containing the result of the revocation.
+    """
+    request = RevokeTokenRequest(refresh_token=refresh_token)
+    return await cognito_service.revoke_token(request)
@@ -1,7 +1,9 @@
 """
 GraphQL schema definitions for mutations related to user authentication and management.
 """
+from functools import lru_cache
 from ariadne import make_executable_schema, gql
+from graphql import GraphQLSchema
 from app.api.graphql.resolvers.user_resolvers import mutation
 
 # Define GraphQL schema using SDL (Schema Definition Language)
@@ -52,16 +54,26 @@ type_defs = gql("""
         message: String!
     }
 
+    type GlobalSignOutResponse {
+        message: String!
+    }
+
+    type RevokeTokenResponse {
+        message: String!
+    }
+
     type Mutation {
         login(username: String!, password: String!): LoginResponse!
         signUp(username: String!, password: String!, email: String!, phone_number: String, given_name: String, family_name: String): SignUpResponse!
         confirmSignUp(username: String!, confirmation_code: String!): ConfirmSignUpResponse!
         resendConfirmationCode(username: String!): ResendConfirmationCodeResponse!
-        refreshToken(refresh_token: String!): TokenRefreshResponse!
+        refreshToken(refresh_token: String!, username: String): TokenRefreshResponse!
         changePassword(access_token: String!, previous_password: String!, proposed_password: String!): ChangePasswordResponse!
         forgotPassword(username: String!): ForgotPasswordResponse!
         confirmForgotPassword(username: String!, confirmation_code: String!, new_password: String!): ConfirmForgotPasswordResponse!
         updateUserAttributes(access_token: String!, attributes: [AttributeInput]!): UpdateUserAttributesResponse!
+        globalSignOut: GlobalSignOutResponse!
+        revokeToken(refresh_token: String!): RevokeTokenResponse!
     }
 
     input AttributeInput {
@@ -70,5 +82,17 @@ type_defs = gql("""
     }
 """)
 
-# Create the executable schema by combining type definitions and resolvers
-schema = make_executable_schema(type_defs, mutation)
+
+@lru_cache(maxsize=1)
+def get_schema() -> GraphQLSchema:
+    """
+    Creates the executable schema by combining type definitions and resolvers, once, on first use.
+    """
+    return make_executable_schema(type_defs, mutation)
+
+
+def __getattr__(name: str):
+    # Keeps `from ... import schema` working while deferring the build until it is first needed
+    if name == "schema":
+        return get_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
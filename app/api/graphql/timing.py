@@ -0,0 +1,53 @@
+from inspect import isawaitable
+from typing import Any, Dict
+
+from app.core.timing import timed
+
+
+def timing_options() -> Dict[str, Any]:
+    """
+    Returns ariadne.asgi.GraphQL options recording the parse, validation and execution phases of
+    every operation as Server-Timing entries ('gql-parse', 'gql-validate', 'gql-execute').
+
+    graphql-core is imported here rather than at module level, since it is only needed once the
+    GraphQL app is built.
+
+    Returns:
+        Dict[str, Any]: The 'query_parser', 'query_validator' and 'execution_context_class' options.
+    """
+    from graphql import ExecutionContext, parse, validate
+
+    def query_parser(context: Any, data: dict):
+        with timed("gql-parse"):
+            return parse(data["query"])
+
+    def query_validator(schema: Any, document: Any, *args: Any, **kwargs: Any):
+        with timed("gql-validate"):
+            return validate(schema, document, *args, **kwargs)
+
+    class TimedExecutionContext(ExecutionContext):
+
+        def execute_operation(self, operation: Any, root_value: Any) -> Any:
+            timer = timed("gql-execute").__enter__()
+            try:
+                result = super().execute_operation(operation, root_value)
+            except BaseException:
+                timer.__exit__()
+                raise
+            if not isawaitable(result):
+                timer.__exit__()
+                return result
+
+            async def await_result() -> Any:
+                try:
+                    return await result
+                finally:
+                    timer.__exit__()
+
+            return await_result()
+
+    return {
+        "query_parser": query_parser,
+        "query_validator": query_validator,
+        "execution_context_class": TimedExecutionContext,
+    }
@@ -1,8 +1,47 @@
-from pydantic import BaseModel, EmailStr, constr
-from typing import Optional, Dict
+from pydantic import BaseModel, ConfigDict, EmailStr, constr
+from typing import Optional, Dict, Any, List, Type
+from app.core.exceptions import AuthChallengeRequiredException, InternalErrorException
 
 
-class LoginRequest(BaseModel):
+class AuthModel(BaseModel):
+    """
+    Base of the authentication models.
+
+    Validators are built on first use rather than at import time, which keeps application startup fast;
+    `build_models()` builds them all up front, e.g. during the startup warm-up.
+    """
+    model_config = ConfigDict(defer_build=True)
+
+
+def _code_delivery_message(data: Dict[str, Any], default: str) -> str:
+    """
+    Builds a user-facing message from the CodeDeliveryDetails of a Cognito response, if present.
+    """
+    details = data.get("CodeDeliveryDetails")
+    if not details:
+        return default
+    return f"Code sent via {details.get('DeliveryMedium', 'EMAIL').lower()} to {details.get('Destination', '')}."
+
+
+def _authentication_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns the AuthenticationResult of a Cognito InitiateAuth response.
+
+    Raises:
+        AuthChallengeRequiredException: If Cognito answered with a challenge (ChallengeName and Session)
+            instead of tokens.
+        InternalErrorException: If the response has neither tokens nor a challenge.
+    """
+    challenge = data.get("ChallengeName")
+    if challenge:
+        raise AuthChallengeRequiredException(support_code=challenge)
+    result = data.get("AuthenticationResult")
+    if not result or not result.get("AccessToken"):
+        raise InternalErrorException()
+    return result
+
+
+class LoginRequest(AuthModel):
     """
     Model for user login request.
 
@@ -17,7 +56,7 @@ class LoginRequest(BaseModel):
     password: constr(min_length=6, max_length=128)
 
 
-class LoginResponse(BaseModel):
+class LoginResponse(AuthModel):
     """
     Model for user login response.
 
@@ -35,8 +74,24 @@ class LoginResponse(BaseModel):
     refresh_token: Optional[str] = None
     id_token: Optional[str] = None
 
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "LoginResponse":
+        """
+        Builds the response from the AuthenticationResult of a Cognito InitiateAuth response.
+
+        Raises:
+            AuthChallengeRequiredException: If Cognito answered with a challenge instead of tokens.
+        """
+        result = _authentication_result(data)
+        return cls(
+            access_token=result.get("AccessToken"),
+            token_type=result.get("TokenType") or "Bearer",
+            refresh_token=result.get("RefreshToken"),
+            id_token=result.get("IdToken"),
+        )
+
 
-class SignUpRequest(BaseModel):
+class SignUpRequest(AuthModel):
     """
     Model for user sign-up request.
 
@@ -59,7 +114,7 @@ class SignUpRequest(BaseModel):
     family_name: Optional[constr(max_length=50)] = None
 
 
-class SignUpResponse(BaseModel):
+class SignUpResponse(AuthModel):
     """
     Model for user sign-up response.
 
@@ -73,8 +128,19 @@ class SignUpResponse(BaseModel):
     message: str
     user_sub: Optional[str] = None
 
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "SignUpResponse":
+        """
+        Builds the response from a Cognito SignUp response body.
+        """
+        if data.get("UserConfirmed"):
+            message = "User registered successfully."
+        else:
+            message = _code_delivery_message(data, "User registered. Please confirm your account.")
+        return cls(message=message, user_sub=data.get("UserSub"))
 
-class ConfirmSignUpRequest(BaseModel):
+
+class ConfirmSignUpRequest(AuthModel):
     """
     Model for sign-up confirmation request.
 
@@ -89,7 +155,7 @@ class ConfirmSignUpRequest(BaseModel):
     confirmation_code: constr(min_length=6, max_length=10)
 
 
-class ConfirmSignUpResponse(BaseModel):
+class ConfirmSignUpResponse(AuthModel):
     """
     Model for sign-up confirmation response.
 
@@ -101,8 +167,15 @@ class ConfirmSignUpResponse(BaseModel):
     """
     message: str
 
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "ConfirmSignUpResponse":
+        """
+        Builds the response from a Cognito API response body.
+        """
+        return cls(message="User confirmed successfully.")
+
 
-class ResendConfirmationCodeRequest(BaseModel):
+class ResendConfirmationCodeRequest(AuthModel):
     """
     Model for resending confirmation code request.
 
@@ -115,7 +188,7 @@ class ResendConfirmationCodeRequest(BaseModel):
     username: constr(min_length=1, max_length=50)
 
 
-class ResendConfirmationCodeResponse(BaseModel):
+class ResendConfirmationCodeResponse(AuthModel):
     """
     Model for resending confirmation code response.
 
@@ -127,21 +200,31 @@ class ResendConfirmationCodeResponse(BaseModel):
     """
     message: str
 
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "ResendConfirmationCodeResponse":
+        """
+        Builds the response from a Cognito API response body.
+        """
+        return cls(message=_code_delivery_message(data, "Confirmation code resent."))
 
-class TokenRefreshRequest(BaseModel):
+
+class TokenRefreshRequest(AuthModel):
     """
     Model for token refresh request.
 
     Attributes:
         refresh_token (constr(min_length=1)): The refresh token used to obtain a new access token.
+        username (Optional[str]): The username (sub) the token was issued to; only required to
+            compute the SECRET_HASH when the app client has a secret.
 
     Reference:
         [AWS Cognito RefreshToken API](https://docs.aws.amazon.com/cognitoidentitypools/latest/APIReference/API_RefreshToken.html)
     """
     refresh_token: constr(min_length=1)
+    username: Optional[str] = None
 
 
-class TokenRefreshResponse(BaseModel):
+class TokenRefreshResponse(AuthModel):
     """
     Model for token refresh response.
 
@@ -157,8 +240,23 @@ class TokenRefreshResponse(BaseModel):
     token_type: str = "Bearer"
     id_token: Optional[str] = None
 
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "TokenRefreshResponse":
+        """
+        Builds the response from the AuthenticationResult of a Cognito InitiateAuth response.
+
+        Raises:
+            AuthChallengeRequiredException: If Cognito answered with a challenge instead of tokens.
+        """
+        result = _authentication_result(data)
+        return cls(
+            access_token=result.get("AccessToken"),
+            token_type=result.get("TokenType") or "Bearer",
+            id_token=result.get("IdToken"),
+        )
 
-class ChangePasswordRequest(BaseModel):
+
+class ChangePasswordRequest(AuthModel):
     """
     Model for changing password request.
 
@@ -177,7 +275,7 @@ class ChangePasswordRequest(BaseModel):
     proposed_password: constr(min_length=6, max_length=128)
 
 
-class ChangePasswordResponse(BaseModel):
+class ChangePasswordResponse(AuthModel):
     """
     Model for changing password response.
 
@@ -189,8 +287,15 @@ class ChangePasswordResponse(BaseModel):
     """
     message: str
 
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "ChangePasswordResponse":
+        """
+        Builds the response from a Cognito API response body.
+        """
+        return cls(message="Password changed successfully.")
+
 
-class ForgotPasswordRequest(BaseModel):
+class ForgotPasswordRequest(AuthModel):
     """
     Model for forgot password request.
 
@@ -203,7 +308,7 @@ class ForgotPasswordRequest(BaseModel):
     username: constr(min_length=1, max_length=50)
 
 
-class ForgotPasswordResponse(BaseModel):
+class ForgotPasswordResponse(AuthModel):
     """
     Model for forgot password response.
 
@@ -215,8 +320,15 @@ class ForgotPasswordResponse(BaseModel):
     """
     message: str
 
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "ForgotPasswordResponse":
+        """
+        Builds the response from a Cognito API response body.
+        """
+        return cls(message=_code_delivery_message(data, "Password reset code sent."))
 
-class ConfirmForgotPasswordRequest(BaseModel):
+
+class ConfirmForgotPasswordRequest(AuthModel):
     """
     Model for confirming forgot password request.
 
@@ -233,7 +345,7 @@ class ConfirmForgotPasswordRequest(BaseModel):
     new_password: constr(min_length=6, max_length=128)
 
 
-class ConfirmForgotPasswordResponse(BaseModel):
+class ConfirmForgotPasswordResponse(AuthModel):
     """
     Model for confirming forgot password response.
 
@@ -245,8 +357,15 @@ class ConfirmForgotPasswordResponse(BaseModel):
     """
     message: str
 
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "ConfirmForgotPasswordResponse":
+        """
+        Builds the response from a Cognito API response body.
+        """
+        return cls(message="Password reset successfully.")
+
 
-class UpdateUserAttributesRequest(BaseModel):
+class UpdateUserAttributesRequest(AuthModel):
     """
     Model for updating user attributes request.
 
@@ -263,7 +382,7 @@ class UpdateUserAttributesRequest(BaseModel):
     attributes: Dict[str, str]
 
 
-class UpdateUserAttributesResponse(BaseModel):
+class UpdateUserAttributesResponse(AuthModel):
     """
     Model for updating user attributes response.
 
@@ -274,3 +393,82 @@ class UpdateUserAttributesResponse(BaseModel):
         [AWS Cognito UpdateUserAttributes API](https://docs.aws.amazon.com/cognitoidentitypools/latest/APIReference/API_UpdateUserAttributes.html)
     """
     message: str
+
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "UpdateUserAttributesResponse":
+        """
+        Builds the response from a Cognito API response body.
+        """
+        return cls(message="User attributes updated successfully.")
+
+
+class GlobalSignOutResponse(AuthModel):
+    """
+    Model for global sign-out response.
+
+    Attributes:
+        message (str): Message indicating the result of the sign-out process.
+
+    Note:
+        Access Token is required for authorization and should be sent in the Authorization header as Bearer token.
+        There is no request model since the operation takes no other parameters.
+
+    Reference:
+        [AWS Cognito GlobalSignOut API](https://docs.aws.amazon.com/cognito-user-identity-pools/latest/APIReference/API_GlobalSignOut.html)
+    """
+    message: str
+
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "GlobalSignOutResponse":
+        """
+        Builds the response from a Cognito API response body.
+        """
+        return cls(message="Signed out from all devices successfully.")
+
+
+class RevokeTokenRequest(AuthModel):
+    """
+    Model for revoke token request.
+
+    Attributes:
+        refresh_token (constr(min_length=1)): The refresh token to revoke, together with the access
+            and ID tokens issued with it.
+
+    Reference:
+        [AWS Cognito RevokeToken API](https://docs.aws.amazon.com/cognito-user-identity-pools/latest/APIReference/API_RevokeToken.html)
+    """
+    refresh_token: constr(min_length=1)
+
+
+class RevokeTokenResponse(AuthModel):
+    """
+    Model for revoke token response.
+
+    Attributes:
+        message (str): Message indicating the result of the revocation.
+
+    Reference:
+        [AWS Cognito RevokeToken API](https://docs.aws.amazon.com/cognito-user-identity-pools/latest/APIReference/API_RevokeToken.html)
+    """
+    message: str
+
+    @classmethod
+    def from_cognito(cls, data: Dict[str, Any]) -> "RevokeTokenResponse":
+        """
+        Builds the response from a Cognito API response body.
+        """
+        return cls(message="Token revoked successfully.")
+
+
+def build_models() -> List[Type[AuthModel]]:
+    """
+    Builds the validators of all authentication models that have not been built yet.
+
+    Returns:
+        List[Type[AuthModel]]: The models.
+    """
+    models = [model for model in globals().values()
+              if isinstance(model, type) and issubclass(model, AuthModel) and model is not AuthModel]
+    for model in models:
+        model.model_rebuild()
+    return models
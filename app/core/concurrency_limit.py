@@ -0,0 +1,116 @@
+import re
+import time
+from enum import Enum
+from typing import Dict, Mapping, Optional
+
+import orjson
+
+from app.core.config import settings
+
+
+class Priority(str, Enum):
+    """
+    Load shedding priority of a request; when the worker is overloaded, SHEDDABLE requests are rejected
+    first and CRITICAL ones last.
+    """
+    CRITICAL = "critical"
+    NORMAL = "normal"
+    SHEDDABLE = "sheddable"
+
+
+# Share of the concurrency limit each priority may use: requests of a priority are rejected once the
+# requests in flight reach its share, so lower priorities are shed before the limit is reached
+PRIORITY_SHARES: Mapping[Priority, float] = {
+    Priority.CRITICAL: 1.0,
+    Priority.NORMAL: 0.9,
+    Priority.SHEDDABLE: 0.75,
+}
+
+# First field of a GraphQL document, skipping the operation type, name and variables and an alias
+_FIRST_FIELD = re.compile(r"^[^{]*\{\s*(?:[_A-Za-z]\w*\s*:\s*)?([_A-Za-z]\w*)")
+
+
+def graphql_operation_field(body: bytes) -> Optional[str]:
+    """
+    Extracts the top-level field of a GraphQL request body (e.g. 'login') without parsing the document.
+
+    This is a cheap approximation for choosing a priority before the request is admitted; documents
+    starting with a fragment definition or batched requests yield a wrong field or None.
+
+    Args:
+        body (bytes): The JSON request body.
+
+    Returns:
+        Optional[str]: The field name, or None if it cannot be determined.
+    """
+    try:
+        query = orjson.loads(body).get("query")
+    except (orjson.JSONDecodeError, AttributeError):
+        return None
+    if not isinstance(query, str):
+        return None
+    match = _FIRST_FIELD.match(query)
+    return match.group(1) if match else None
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the number of requests a worker handles at once, adapting the limit to observed latency (AIMD).
+
+    While requests complete within the latency target and the limit is being used, the limit grows by
+    one per limit's worth of completions (additive increase). A request slower than the target shrinks
+    the limit by the backoff factor (multiplicative decrease), at most once per target interval so that
+    one burst of slow requests does not collapse it. Requests beyond the share of the limit allowed for
+    their priority are rejected at once rather than queued.
+    """
+
+    def __init__(self, initial_limit: Optional[int] = None, min_limit: Optional[int] = None,
+                 max_limit: Optional[int] = None, latency_target: Optional[float] = None, backoff: float = 0.9):
+        """
+        Initializes the limiter; values default to the CONCURRENCY_* settings.
+
+        Args:
+            initial_limit (Optional[int]): The limit to start with.
+            min_limit (Optional[int]): The lowest limit.
+            max_limit (Optional[int]): The highest limit.
+            latency_target (Optional[float]): Request latency in seconds above which the limit shrinks.
+            backoff (float): Factor the limit is multiplied with when it shrinks.
+        """
+        self.min_limit = settings.concurrency_min_limit if min_limit is None else min_limit
+        self.max_limit = settings.concurrency_max_limit if max_limit is None else max_limit
+        self.limit = float(settings.concurrency_initial_limit if initial_limit is None else initial_limit)
+        self.latency_target = settings.concurrency_latency_target if latency_target is None else latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self.rejected: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._last_decrease = 0.0
+
+    def try_acquire(self, priority: Priority) -> bool:
+        """
+        Admits a request if the requests in flight are below the share of the limit of its priority.
+
+        Returns:
+            bool: True if the request was admitted and must be released with `release`.
+        """
+        if self.in_flight >= self.limit * PRIORITY_SHARES[priority]:
+            self.rejected[priority] += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float):
+        """
+        Releases an admitted request and adapts the limit to its latency.
+
+        Args:
+            latency (float): The request's latency in seconds.
+        """
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if latency > self.latency_target:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif in_flight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
@@ -1,4 +1,5 @@
-from typing import Type, Dict, TypeVar
+from functools import lru_cache
+from typing import Type, Dict, TypeVar, Optional, Any
 import os
 import logging
 
@@ -10,8 +11,6 @@ from pydantic_core import ValidationError
 ConfigType = TypeVar('ConfigType', bound='BaseConfig')
 
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
@@ -20,12 +19,125 @@ class BaseConfig(BaseSettings):
     aws_region: str = Field(..., env="AWS_REGION")
     aws_cognito_user_pool_id: str = Field(..., env="AWS_COGNITO_USER_POOL_ID")
     aws_cognito_client_id: str = Field(..., env="AWS_COGNITO_CLIENT_ID")
+    aws_cognito_client_secret: Optional[str] = Field(None, env="AWS_COGNITO_CLIENT_SECRET")
+    aws_cognito_endpoint: Optional[str] = Field(None, env="AWS_COGNITO_ENDPOINT")
+    aws_cognito_issuer: Optional[str] = Field(None, env="AWS_COGNITO_ISSUER")
     dynamodb_table_name: str = Field(..., env="DYNAMODB_TABLE_NAME")
     dynamodb_endpoint: str = Field(..., env="DYNAMODB_ENDPOINT")
     s3_bucket_name: str = Field(..., env="S3_BUCKET_NAME")
     logging_level: str = Field('INFO', env="LOGGING_LEVEL")
+    log_format: str = Field('text', env="LOG_FORMAT")
+    log_queue_size: int = Field(10000, env="LOG_QUEUE_SIZE")
+
+    # Log sampling: fraction of requests whose records below WARNING are logged (1.0 logs all), overridable
+    # per logger and per GraphQL operation as JSON objects, e.g. LOG_OPERATION_SAMPLE_RATES='{"login": 0.05}'
+    log_sample_rate: float = Field(1.0, env="LOG_SAMPLE_RATE")
+    log_logger_sample_rates: Dict[str, float] = Field({}, env="LOG_LOGGER_SAMPLE_RATES")
+    log_operation_sample_rates: Dict[str, float] = Field({}, env="LOG_OPERATION_SAMPLE_RATES")
+    log_slow_request_threshold: float = Field(1.0, env="LOG_SLOW_REQUEST_THRESHOLD")
+    log_sample_buffer_size: int = Field(200, env="LOG_SAMPLE_BUFFER_SIZE")
+
+    # Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR to aggregate them over several workers
+    metrics_enabled: bool = Field(True, env="METRICS_ENABLED")
+
+    # Adaptive concurrency limit per worker; requests beyond it are rejected with 503 by priority.
+    # LOAD_SHEDDING_PRIORITIES maps GraphQL operations to 'critical', 'normal' (default) or 'sheddable';
+    # bodies larger than LOAD_SHEDDING_MAX_PEEK_BYTES are not read for it and get the default priority
+    concurrency_limit_enabled: bool = Field(True, env="CONCURRENCY_LIMIT_ENABLED")
+    concurrency_initial_limit: int = Field(100, env="CONCURRENCY_INITIAL_LIMIT")
+    concurrency_min_limit: int = Field(10, env="CONCURRENCY_MIN_LIMIT")
+    concurrency_max_limit: int = Field(1000, env="CONCURRENCY_MAX_LIMIT")
+    concurrency_latency_target: float = Field(1.0, env="CONCURRENCY_LATENCY_TARGET")
+    concurrency_retry_after: int = Field(1, env="CONCURRENCY_RETRY_AFTER")
+    load_shedding_priorities: Dict[str, str] = Field(
+        {"login": "critical", "refreshToken": "critical", "signUp": "sheddable", "resendConfirmationCode": "sheddable"},
+        env="LOAD_SHEDDING_PRIORITIES",
+    )
+    load_shedding_max_peek_bytes: int = Field(16384, env="LOAD_SHEDDING_MAX_PEEK_BYTES")
+
+    # Sliding-window rate limits of the auth mutations, per GraphQL operation and key type ('ip' or
+    # 'username'), as 'requests/seconds'. RATE_LIMIT_STORE is 'memory' (per worker) or 'redis', shared by
+    # all instances through RATE_LIMIT_REDIS_URL. Behind proxies, RATE_LIMIT_TRUSTED_HOPS is the number of
+    # them appending to X-Forwarded-For
+    rate_limit_enabled: bool = Field(True, env="RATE_LIMIT_ENABLED")
+    rate_limits: Dict[str, Dict[str, str]] = Field(
+        {
+            "login": {"ip": "30/60", "username": "10/300"},
+            "forgotPassword": {"ip": "10/300", "username": "3/900"},
+            "resendConfirmationCode": {"ip": "10/300", "username": "3/900"},
+        },
+        env="RATE_LIMITS",
+    )
+    rate_limit_store: str = Field('memory', env="RATE_LIMIT_STORE")
+    rate_limit_redis_url: str = Field('redis://localhost:6379/0', env="RATE_LIMIT_REDIS_URL")
+    rate_limit_redis_pool_size: int = Field(10, env="RATE_LIMIT_REDIS_POOL_SIZE")
+    rate_limit_redis_timeout: float = Field(0.1, env="RATE_LIMIT_REDIS_TIMEOUT")
+    rate_limit_memory_shards: int = Field(16, env="RATE_LIMIT_MEMORY_SHARDS")
+    rate_limit_memory_max_entries: int = Field(100_000, env="RATE_LIMIT_MEMORY_MAX_ENTRIES")
+    rate_limit_trusted_hops: int = Field(0, env="RATE_LIMIT_TRUSTED_HOPS")
+
+    # Adds a Server-Timing response header with the duration of each request phase; it reveals
+    # internals such as upstream latency, so enable it for debugging or behind a trusted edge only
+    server_timing_enabled: bool = Field(False, env="SERVER_TIMING_ENABLED")
     environment: str = Field('DEVELOPMENT', env="ENVIRONMENT")
 
+    # Startup warm-up
+    warm_up_budget: float = Field(10.0, env="WARM_UP_BUDGET")
+    warm_up_cognito_connections: int = Field(4, env="WARM_UP_COGNITO_CONNECTIONS")
+
+    # Shared Cognito HTTP client pool
+    cognito_http_timeout: float = Field(10.0, env="COGNITO_HTTP_TIMEOUT")
+    cognito_http_max_connections: int = Field(100, env="COGNITO_HTTP_MAX_CONNECTIONS")
+    cognito_http_max_keepalive_connections: int = Field(20, env="COGNITO_HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    cognito_http_keepalive_expiry: float = Field(30.0, env="COGNITO_HTTP_KEEPALIVE_EXPIRY")
+    cognito_secret_hash_cache_size: int = Field(4096, env="COGNITO_SECRET_HASH_CACHE_SIZE")
+
+    # Cognito retries
+    cognito_retry_max_attempts: int = Field(3, env="COGNITO_RETRY_MAX_ATTEMPTS")
+    cognito_retry_base_delay: float = Field(0.05, env="COGNITO_RETRY_BASE_DELAY")
+    cognito_retry_max_delay: float = Field(1.0, env="COGNITO_RETRY_MAX_DELAY")
+    cognito_retry_budget_ratio: float = Field(0.1, env="COGNITO_RETRY_BUDGET_RATIO")
+    cognito_retry_budget_min_per_second: float = Field(5.0, env="COGNITO_RETRY_BUDGET_MIN_PER_SECOND")
+
+    # Cognito circuit breakers
+    cognito_breaker_window_size: int = Field(50, env="COGNITO_BREAKER_WINDOW_SIZE")
+    cognito_breaker_minimum_calls: int = Field(20, env="COGNITO_BREAKER_MINIMUM_CALLS")
+    cognito_breaker_failure_rate_threshold: float = Field(0.5, env="COGNITO_BREAKER_FAILURE_RATE_THRESHOLD")
+    cognito_breaker_slow_call_duration: float = Field(3.0, env="COGNITO_BREAKER_SLOW_CALL_DURATION")
+    cognito_breaker_slow_call_rate_threshold: float = Field(0.5, env="COGNITO_BREAKER_SLOW_CALL_RATE_THRESHOLD")
+    cognito_breaker_open_duration: float = Field(15.0, env="COGNITO_BREAKER_OPEN_DURATION")
+    cognito_breaker_half_open_max_calls: int = Field(3, env="COGNITO_BREAKER_HALF_OPEN_MAX_CALLS")
+
+    # Client-side Cognito quota limits (requests per second, per worker process)
+    cognito_quota_user_authentication_rps: float = Field(120.0, env="COGNITO_QUOTA_USER_AUTHENTICATION_RPS")
+    cognito_quota_user_creation_rps: float = Field(50.0, env="COGNITO_QUOTA_USER_CREATION_RPS")
+    cognito_quota_user_account_recovery_rps: float = Field(30.0, env="COGNITO_QUOTA_USER_ACCOUNT_RECOVERY_RPS")
+    cognito_quota_user_update_rps: float = Field(25.0, env="COGNITO_QUOTA_USER_UPDATE_RPS")
+    cognito_quota_max_wait: float = Field(0.5, env="COGNITO_QUOTA_MAX_WAIT")
+
+    # Seconds a completed token refresh is reused for identical refresh tokens
+    refresh_token_coalesce_window: float = Field(1.0, env="REFRESH_TOKEN_COALESCE_WINDOW")
+
+    # Local JWT verification
+    jwks_refresh_interval: float = Field(3600.0, env="JWKS_REFRESH_INTERVAL")
+    jwks_min_refetch_interval: float = Field(30.0, env="JWKS_MIN_REFETCH_INTERVAL")
+    jwt_leeway: float = Field(5.0, env="JWT_LEEWAY")
+    jwt_max_length: int = Field(8192, env="JWT_MAX_LENGTH")
+    token_cache_max_entries: int = Field(100_000, env="TOKEN_CACHE_MAX_ENTRIES")
+    token_cache_max_bytes: int = Field(64 * 1024 * 1024, env="TOKEN_CACHE_MAX_BYTES")
+    token_cache_max_ttl: float = Field(300.0, env="TOKEN_CACHE_MAX_TTL")
+    token_revocation_store: str = Field('memory', env="TOKEN_REVOCATION_STORE")
+    token_revocation_table: str = Field('revoked_tokens', env="TOKEN_REVOCATION_TABLE")
+    token_revocation_index: str = Field('', env="TOKEN_REVOCATION_INDEX")
+    token_revocation_sync_interval: float = Field(30.0, env="TOKEN_REVOCATION_SYNC_INTERVAL")
+    token_revocation_max_lifetime: float = Field(86400.0, env="TOKEN_REVOCATION_MAX_LIFETIME")
+    token_verification_mode: str = Field('adaptive', env="TOKEN_VERIFICATION_MODE")
+    token_verification_pool: str = Field('thread', env="TOKEN_VERIFICATION_POOL")
+    token_verification_workers: int = Field(2, env="TOKEN_VERIFICATION_WORKERS")
+    token_verification_lag_threshold: float = Field(0.01, env="TOKEN_VERIFICATION_LAG_THRESHOLD")
+    token_verification_batch_size: int = Field(64, env="TOKEN_VERIFICATION_BATCH_SIZE")
+    token_verification_batch_window: float = Field(0.002, env="TOKEN_VERIFICATION_BATCH_WINDOW")
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -75,13 +187,22 @@ def load_settings() -> BaseConfig:
         raise
 
 
-# Instantiate the settings object based on the current environment
-settings = load_settings()
+@lru_cache(maxsize=1)
+def get_settings() -> BaseConfig:
+    """
+    Returns the settings, loading them on first use.
+    """
+    return load_settings()
+
+
+class LazySettings:
+    """
+    Proxy to the settings that loads them on first attribute access instead of at import time.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
 
-# Configure logging level based on settings
-if settings.logging_level.upper() == 'DEBUG':
-    logger.setLevel(logging.DEBUG)
-else:
-    logger.setLevel(logging.INFO)
 
-logger.info(f"Running in {settings.environment} environment with logging level {settings.logging_level}")
+# The settings object for the current environment, loaded on first use
+settings: BaseConfig = LazySettings()  # type: ignore[assignment]
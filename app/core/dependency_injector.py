@@ -1,4 +1,10 @@
-from typing import Type, Callable, Dict, Any, Tuple
+import asyncio
+import inspect
+import logging
+import typing
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Type, Callable, Dict, Any, Tuple, Optional, AsyncIterator, List
 from enum import Enum
 
 
@@ -8,11 +14,140 @@ class ServiceScope(Enum):
     SCOPED = "scoped"
 
 
+class CircularDependencyError(TypeError):
+    """
+    Raised when registering a service would make its constructor dependencies circular.
+    """
+
+    def __init__(self, cycle: List[Type]):
+        self.cycle = cycle
+        super().__init__("Circular dependency: " + " -> ".join(service.__name__ for service in cycle))
+
+
+class ScopeNotActiveError(RuntimeError):
+    """
+    Raised when a SCOPED service is resolved outside any scope opened with `DependencyInjector.scope()`.
+    """
+
+    def __init__(self, interface: Type):
+        self.interface = interface
+        super().__init__(f"{interface.__name__} is SCOPED and can only be resolved inside a dependency scope")
+
+
+class Dependency(typing.NamedTuple):
+    """
+    A constructor parameter that may be injected.
+
+    Attributes:
+        name (str): The parameter name.
+        interface (Type): The annotated type, with Optional[...] unwrapped.
+        required (bool): Whether the parameter has no default value.
+    """
+    name: str
+    interface: Type
+    required: bool
+
+
+def constructor_dependencies(implementation: Callable) -> List[Dependency]:
+    """
+    Introspects the type-annotated parameters of a class constructor or factory.
+
+    Args:
+        implementation (Callable): The class or factory.
+
+    Returns:
+        List[Dependency]: Its parameters whose annotation is a class, in declaration order.
+    """
+    try:
+        signature = inspect.signature(implementation)
+    except (TypeError, ValueError):
+        return []
+    target = implementation.__init__ if isinstance(implementation, type) else implementation
+    try:
+        hints = typing.get_type_hints(target)
+    except Exception:
+        hints = {}
+    dependencies = []
+    for parameter in signature.parameters.values():
+        if parameter.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+        annotation = hints.get(parameter.name, parameter.annotation)
+        arguments = [argument for argument in typing.get_args(annotation) if argument is not type(None)]
+        if typing.get_origin(annotation) is typing.Union and len(arguments) == 1:
+            annotation = arguments[0]
+        if isinstance(annotation, type):
+            dependencies.append(Dependency(parameter.name, annotation, parameter.default is inspect.Parameter.empty))
+    return dependencies
+
+
+logger = logging.getLogger(__name__)
+
+
+async def dispose_instance(instance: Any, hook: Optional[Callable[[Any], Any]] = None):
+    """
+    Releases a service instance with its registered hook, or its own `aclose()` or `close()` method.
+
+    The hook or method may be sync or async; errors are logged rather than raised so that disposing
+    one instance never prevents disposing the others.
+
+    Args:
+        instance (Any): The instance to release.
+        hook (Optional[Callable[[Any], Any]]): A hook called with the instance instead of its own method.
+    """
+    try:
+        if hook is not None:
+            result = hook(instance)
+        else:
+            close = getattr(instance, "aclose", None) or getattr(instance, "close", None)
+            if close is None:
+                return
+            result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.error(f"Failed to dispose {type(instance).__name__}: {e}")
+
+
+class DependencyScope:
+    """
+    A unit of work, typically one request, whose SCOPED services are created once and disposed at its end.
+    """
+
+    def __init__(self):
+        self.instances: Dict[Type, Any] = {}
+
+    async def dispose(self):
+        """
+        Closes the scoped instances in reverse order of creation.
+        """
+        instances, self.instances = list(self.instances.values()), {}
+        for instance in reversed(instances):
+            await dispose_instance(instance)
+
+
+_current_scope: ContextVar[Optional[DependencyScope]] = ContextVar("dependency_scope", default=None)
+
+
 class DependencyInjector:
     """
     A sophisticated dependency injection container with advanced features such as scopes, factory methods, and lazy initialization.
     This class allows for flexible registration and resolution of services, including singleton, transient, and scoped lifetimes,
     parameterized constructors, and lazy initialization.
+
+    Constructor parameters annotated with a registered interface (or Optional of one) are injected. Signatures are
+    introspected once, at registration, where circular dependencies are also rejected; on first resolution each
+    service is compiled into a plan - a closure calling its constructor with the already compiled plans of its
+    dependencies - so that resolving is a dict lookup plus direct calls. Plans are recompiled after any new
+    registration.
+
+    SCOPED services live as long as the innermost scope opened with `scope()` in the current context, which is
+    tracked with a context variable so that it follows the request through awaits and into the tasks it starts.
+    Resolving them outside any scope raises ScopeNotActiveError.
+
+    Services needing async setup are registered with `register_async()` and resolved with `resolve_async()`; async
+    singletons are created exactly once under a lock, even when many requests need them at the same time. Sync
+    resolution of such a singleton (or of a service depending on it) works once it has been created, e.g. by
+    `warm_up()` at startup. `dispose()` releases all singletons in reverse order of creation at shutdown.
     """
 
     def __init__(self):
@@ -22,8 +157,16 @@ class DependencyInjector:
         self._services: Dict[Type, Tuple[Callable, ServiceScope]] = {}
         self._factories: Dict[Type, Callable] = {}
         self._scopes: Dict[Type, Any] = {}
+        self._async_factories: Dict[Type, Tuple[Callable, ServiceScope]] = {}
+        self._disposers: Dict[Type, Callable[[Any], Any]] = {}
+        self._locks: Dict[Type, asyncio.Lock] = {}
+        self._created: List[Type] = []
+        self._dependencies: Dict[Type, List[Dependency]] = {}
+        self._plans: Dict[Type, Callable[[], Any]] = {}
+        self.ready = False
 
-    def register(self, interface: Type, implementation: Type, scope: ServiceScope = ServiceScope.TRANSIENT):
+    def register(self, interface: Type, implementation: Type, scope: ServiceScope = ServiceScope.TRANSIENT,
+                 aclose: Optional[Callable[[Any], Any]] = None):
         """
         Registers a service with a specified scope.
 
@@ -31,24 +174,154 @@ class DependencyInjector:
             interface (Type): The interface or abstract base class for the service.
             implementation (Type): The concrete implementation of the interface.
             scope (ServiceScope): The scope of the service (singleton, transient, or scoped).
+            aclose (Optional[Callable[[Any], Any]]): Hook releasing a singleton at shutdown; by default its own
+                `aclose()` or `close()` method is used.
+
+        Raises:
+            CircularDependencyError: If the service's constructor dependencies lead back to it.
         """
         if not isinstance(interface, type) or not isinstance(implementation, type):
             raise TypeError("Both interface and implementation must be of type 'Type'")
 
+        self._add(interface, implementation, aclose)
         self._services[interface] = (implementation, scope)
 
     def register_factory(self, interface: Type, factory: Callable):
         """
         Registers a factory method for creating instances of a service.
 
+        The factory's annotated parameters are injected like constructor parameters.
+
         Args:
             interface (Type): The interface or abstract base class for the service.
             factory (Callable): The factory method that returns an instance of the service.
+
+        Raises:
+            CircularDependencyError: If the factory's dependencies lead back to the service.
         """
         if not callable(factory):
             raise TypeError("Factory must be callable")
+        self._add(interface, factory)
         self._factories[interface] = factory
 
+    def register_async(self, interface: Type, factory: Callable, scope: ServiceScope = ServiceScope.SINGLETON,
+                       aclose: Optional[Callable[[Any], Any]] = None):
+        """
+        Registers a coroutine function creating a service, e.g. one that opens a pool or loads keys.
+
+        The factory's annotated parameters are injected like constructor parameters.
+
+        Args:
+            interface (Type): The interface or abstract base class for the service.
+            factory (Callable): The coroutine function that returns an initialized instance of the service.
+            scope (ServiceScope): SINGLETON or TRANSIENT.
+            aclose (Optional[Callable[[Any], Any]]): Hook releasing a singleton at shutdown; by default its own
+                `aclose()` or `close()` method is used.
+
+        Raises:
+            CircularDependencyError: If the factory's dependencies lead back to the service.
+        """
+        if not inspect.iscoroutinefunction(factory):
+            raise TypeError("Async factory must be a coroutine function")
+        if scope == ServiceScope.SCOPED:
+            raise ValueError("Async services must be SINGLETON or TRANSIENT")
+        self._add(interface, factory, aclose)
+        self._async_factories[interface] = (factory, scope)
+
+    def _add(self, interface: Type, implementation: Callable, aclose: Optional[Callable[[Any], Any]] = None):
+        dependencies = constructor_dependencies(implementation)
+        cycle = self._find_cycle(interface, dependencies)
+        if cycle:
+            raise CircularDependencyError(cycle)
+        self._services.pop(interface, None)
+        self._factories.pop(interface, None)
+        self._async_factories.pop(interface, None)
+        self._disposers.pop(interface, None)
+        if aclose is not None:
+            self._disposers[interface] = aclose
+        self._dependencies[interface] = dependencies
+        self._plans.clear()
+
+    def _is_registered(self, interface: Type) -> bool:
+        return interface in self._services or interface in self._factories or interface in self._async_factories
+
+    def _find_cycle(self, interface: Type, dependencies: List[Dependency]) -> Optional[List[Type]]:
+        visited = set()
+        stack = [(dependency.interface, [interface, dependency.interface]) for dependency in dependencies]
+        while stack:
+            current, path = stack.pop()
+            if current is interface:
+                return path
+            if current in visited or current not in self._dependencies:
+                continue
+            visited.add(current)
+            stack.extend(
+                (dependency.interface, path + [dependency.interface]) for dependency in self._dependencies[current]
+            )
+        return None
+
+    def _compile(self, interface: Type) -> Callable[[], Any]:
+        if interface in self._async_factories:
+            scopes = self._scopes
+
+            def created() -> Any:
+                instance = scopes.get(interface)
+                if instance is None:
+                    raise RuntimeError(
+                        f"{interface.__name__} is created asynchronously; use resolve_async() or warm_up() first"
+                    )
+                return instance
+            return created
+
+        if interface in self._services:
+            implementation, scope = self._services[interface]
+        elif interface in self._factories:
+            implementation, scope = self._factories[interface], ServiceScope.TRANSIENT
+        else:
+            raise KeyError(f"No implementation registered for {interface}")
+
+        injected = []
+        for dependency in self._dependencies[interface]:
+            if self._is_registered(dependency.interface):
+                plan = self._plans.get(dependency.interface)
+                if plan is None:
+                    plan = self._plans[dependency.interface] = self._compile(dependency.interface)
+                injected.append((dependency.name, plan))
+            elif dependency.required:
+                raise TypeError(
+                    f"Cannot inject parameter '{dependency.name}' of {interface.__name__}: "
+                    f"{dependency.interface.__name__} is not registered"
+                )
+
+        if injected:
+            def build() -> Any:
+                return implementation(**{name: plan() for name, plan in injected})
+        else:
+            build = implementation
+
+        if scope == ServiceScope.SINGLETON:
+            scopes = self._scopes
+            created = self._created
+
+            def plan() -> Any:
+                instance = scopes.get(interface)
+                if instance is None:
+                    instance = scopes[interface] = build()
+                    created.append(interface)
+                return instance
+        elif scope == ServiceScope.SCOPED:
+            def plan() -> Any:
+                current_scope = _current_scope.get()
+                if current_scope is None:
+                    raise ScopeNotActiveError(interface)
+                instance = current_scope.instances.get(interface)
+                if instance is None:
+                    instance = current_scope.instances[interface] = build()
+                return instance
+        else:
+            plan = build
+        return plan
+
     def resolve(self, interface: Type) -> Any:
         """
         Resolves an instance of a service, handling singleton, transient, and scoped cases.
@@ -61,24 +334,103 @@ class DependencyInjector:
 
         Raises:
             KeyError: If the interface is not registered.
+            ScopeNotActiveError: If the service, or one it depends on, is SCOPED and no scope is open.
         """
-        if interface in self._services:
-            implementation, scope = self._services[interface]
-            if scope == ServiceScope.SINGLETON:
-                if interface in self._scopes:
-                    return self._scopes[interface]
-                instance = implementation()
+        plan = self._plans.get(interface)
+        if plan is None:
+            plan = self._plans[interface] = self._compile(interface)
+        return plan()
+
+    async def resolve_async(self, interface: Type) -> Any:
+        """
+        Resolves an instance of a service, creating async services and the async singletons it depends on.
+
+        Args:
+            interface (Type): The interface or abstract base class for the service.
+
+        Returns:
+            Any: The instance of the resolved service.
+
+        Raises:
+            KeyError: If the interface is not registered.
+            ScopeNotActiveError: If the service, or one it depends on, is SCOPED and no scope is open.
+        """
+        if interface not in self._async_factories:
+            await self._create_async_dependencies(interface)
+            return self.resolve(interface)
+
+        factory, scope = self._async_factories[interface]
+        if scope == ServiceScope.TRANSIENT:
+            return await factory(**await self._resolve_arguments(interface))
+
+        instance = self._scopes.get(interface)
+        if instance is not None:
+            return instance
+        lock = self._locks.setdefault(interface, asyncio.Lock())
+        async with lock:
+            instance = self._scopes.get(interface)
+            if instance is None:
+                instance = await factory(**await self._resolve_arguments(interface))
                 self._scopes[interface] = instance
-                return instance
-            elif scope == ServiceScope.SCOPED:
-                return implementation()
-            else:
-                return implementation()
+                self._created.append(interface)
+        return instance
+
+    async def _create_async_dependencies(self, interface: Type):
+        for dependency in self._dependencies.get(interface, ()):
+            if dependency.interface in self._async_factories:
+                await self.resolve_async(dependency.interface)
+            elif self._is_registered(dependency.interface):
+                await self._create_async_dependencies(dependency.interface)
+
+    async def _resolve_arguments(self, interface: Type) -> Dict[str, Any]:
+        return {
+            dependency.name: await self.resolve_async(dependency.interface)
+            for dependency in self._dependencies[interface]
+            if self._is_registered(dependency.interface)
+        }
+
+    async def warm_up(self):
+        """
+        Creates every singleton, including async ones, so that no request pays for their initialization,
+        then marks the injector as ready.
+        """
+        singletons = [
+            interface for interface, (_, scope) in [*self._services.items(), *self._async_factories.items()]
+            if scope == ServiceScope.SINGLETON
+        ]
+        for interface in singletons:
+            await self.resolve_async(interface)
+        self.ready = True
 
-        if interface in self._factories:
-            return self._factories[interface]()
+    async def dispose(self):
+        """
+        Releases the created singletons in reverse order of creation, e.g. during application shutdown.
+        """
+        self.ready = False
+        created, self._created = self._created, []
+        for interface in reversed(created):
+            instance = self._scopes.pop(interface, None)
+            if instance is not None:
+                await dispose_instance(instance, self._disposers.get(interface))
+
+    @asynccontextmanager
+    async def scope(self) -> AsyncIterator[DependencyScope]:
+        """
+        Opens a scope for SCOPED services in the current context and disposes its instances on exit.
+
+        Scopes nest: a background task can open its own scope, whose instances are independent of, and may
+        outlive, those of the request that started it.
 
-        raise KeyError(f"No implementation registered for {interface}")
+        Yields:
+            DependencyScope: The new scope.
+        """
+        dependency_scope = DependencyScope()
+        token = _current_scope.set(dependency_scope)
+        try:
+            yield dependency_scope
+        finally:
+            _current_scope.reset(token)
+            await dependency_scope.dispose()
 
     def clear(self):
         """
@@ -86,4 +438,11 @@ class DependencyInjector:
         """
         self._services.clear()
         self._factories.clear()
+        self._async_factories.clear()
+        self._disposers.clear()
+        self._locks.clear()
         self._scopes.clear()
+        self._created.clear()
+        self._dependencies.clear()
+        self._plans.clear()
+        self.ready = False
@@ -50,6 +50,11 @@ class ErrorCodes:
         message="Service is temporarily unavailable. Please try again later.",
         http_status=HTTPStatus.SERVICE_UNAVAILABLE
     )
+    TOO_MANY_REQUESTS = ErrorDescriptor(
+        code="1003",
+        message="Too many requests. Please slow down and try again later.",
+        http_status=HTTPStatus.TOO_MANY_REQUESTS
+    )
 
     # Authentication-related error codes (2000-2999)
     AUTHENTICATION_FAILED = ErrorDescriptor(
@@ -97,6 +102,11 @@ class ErrorCodes:
         message="A user with this information already exists.",
         http_status=HTTPStatus.CONFLICT
     )
+    AUTH_CHALLENGE_REQUIRED = ErrorDescriptor(
+        code="2009",
+        message="Additional authentication steps are required to sign in.",
+        http_status=HTTPStatus.UNAUTHORIZED
+    )
 
 
 class ServiceUnavailableSupportCodes:
@@ -135,3 +145,28 @@ class ServiceUnavailableSupportCodes:
 
     Reference: https://docs.aws.amazon.com/cognitoidentityprovider/latest/APIReference/API_AdminInitiateAuth.html
     """
+
+    COGNITO_CIRCUIT_OPEN = "COG-CIR-0005"
+    """
+    Exception raised when calls to AWS Cognito are rejected locally because its circuit breaker is open
+    after repeated failures or slow responses.
+    """
+
+    # Local overload protection
+    SERVER_OVERLOADED = "APP-OVL-0001"
+    """
+    Exception raised when a request is rejected (load shedding) because the worker is at its adaptive
+    concurrency limit for the request's priority.
+    """
+
+
+class TooManyRequestsSupportCodes:
+    """
+    A class to manage support codes for requests rejected by local rate limits (error code:1003).
+    """
+
+    RATE_LIMITED = "APP-RTL-0001"
+    """
+    Exception raised when a request exceeds the sliding-window rate limit of its operation for the
+    client's address or for the username.
+    """
@@ -43,6 +43,13 @@ class ServiceUnavailableException(AppException):
     error_descriptor = ErrorCodes.SERVICE_UNAVAILABLE
 
 
+class TooManyRequestsException(AppException):
+    """
+    Exception raised when a request is rejected because a rate limit or quota is exceeded.
+    """
+    error_descriptor = ErrorCodes.TOO_MANY_REQUESTS
+
+
 class AuthenticationFailedException(AppException):
     """
     Exception raised for authentication failures.
@@ -115,6 +122,16 @@ class UnauthorizedException(AppException):
     error_descriptor = ErrorCodes.UNAUTHORIZED
 
 
+class AuthChallengeRequiredException(AppException):
+    """
+    Exception raised when Cognito answers a sign-in with a challenge (e.g. NEW_PASSWORD_REQUIRED or
+    SOFTWARE_TOKEN_MFA) instead of tokens; the challenge name is given as the support code.
+
+    Reference: https://docs.aws.amazon.com/cognitoidentityprovider/latest/APIReference/API_InitiateAuth.html
+    """
+    error_descriptor = ErrorCodes.AUTH_CHALLENGE_REQUIRED
+
+
 class UserAlreadyExistsException(AppException):
     """
     Exception raised when a user with the same credentials already exists.
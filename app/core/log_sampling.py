@@ -0,0 +1,242 @@
+import logging
+import random
+import time
+import zlib
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import MetricsRecorder
+from app.core.request_context import get_operation_name, get_request_id, new_request_id
+
+
+class SampledRequest:
+    """
+    Sampling state of one request.
+
+    The request id is hashed to a fraction in [0, 1); a record is logged if the fraction is below
+    the applicable sample rate. Since the fraction is the same for every record of the request, a
+    sampled request is logged completely, and a request sampled at some rate is also sampled at
+    every higher rate. Records that are not sampled are buffered until the request ends, and are
+    logged after all if the request fails or turns out slow.
+    """
+
+    __slots__ = ("request_id", "fraction", "started", "failed", "kept", "buffer", "handler")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.fraction = zlib.crc32(request_id.encode("utf-8")) / 2 ** 32
+        self.started = time.perf_counter()
+        self.failed = False
+        self.kept = False
+        self.buffer: List[logging.LogRecord] = []
+        self.handler: Optional["SamplingHandler"] = None
+
+    def fail(self):
+        """
+        Marks the request as failed, which logs its records regardless of the sample rate.
+        """
+        self.failed = True
+        self.keep()
+
+    def keep(self):
+        """
+        Logs the buffered records of the request and every record it logs from now on.
+        """
+        self.kept = True
+        if self.handler is not None:
+            self.handler.flush_request(self)
+
+    def finish(self, slow_threshold: float):
+        """
+        Ends the request: keeps its buffered records if it failed or took at least `slow_threshold`
+        seconds, and discards them otherwise.
+        """
+        if not self.kept and time.perf_counter() - self.started >= slow_threshold:
+            self.keep()
+        if self.handler is not None:
+            self.handler.discarded += len(self.buffer)
+        self.buffer.clear()
+
+
+_current_request: ContextVar[Optional[SampledRequest]] = ContextVar("sampled_request", default=None)
+
+
+def current_request() -> Optional[SampledRequest]:
+    """
+    Returns the sampling state of the request being handled, if any.
+    """
+    return _current_request.get()
+
+
+class SamplingHandler(logging.Handler):
+    """
+    Handler passing a sample of the records below WARNING on to its target handler.
+
+    Within a request, records are sampled by request id (see SampledRequest) at the lowest of the rate
+    configured for the logger (or its closest configured ancestor) and the rate configured for the
+    GraphQL operation; if neither is configured, the default rate applies. Records at WARNING or above
+    are always logged; an ERROR record, a failed request or a request slower than the threshold also
+    logs the records the request had buffered. Outside a request records are sampled at random.
+    """
+
+    def __init__(self, target: Optional[logging.Handler] = None, default_rate: Optional[float] = None,
+                 logger_rates: Optional[Dict[str, float]] = None, operation_rates: Optional[Dict[str, float]] = None,
+                 slow_threshold: Optional[float] = None, buffer_size: Optional[int] = None,
+                 recorder: Optional[MetricsRecorder] = None):
+        """
+        Initializes the handler; rates and limits default to the LOG_SAMPLE_* settings.
+
+        Args:
+            target (Optional[logging.Handler]): The handler the sampled records are passed to.
+            default_rate (Optional[float]): Sample rate when neither logger nor operation has one.
+            logger_rates (Optional[Dict[str, float]]): Sample rates by logger name.
+            operation_rates (Optional[Dict[str, float]]): Sample rates by GraphQL operation name.
+            slow_threshold (Optional[float]): Seconds after which a request logs all its records.
+            buffer_size (Optional[int]): Maximum number of records buffered per request.
+            recorder (Optional[MetricsRecorder]): Records the discarded records as metrics, if given.
+        """
+        super().__init__()
+        self.target = target
+        self.default_rate = settings.log_sample_rate if default_rate is None else default_rate
+        self.logger_rates = settings.log_logger_sample_rates if logger_rates is None else logger_rates
+        self.operation_rates = settings.log_operation_sample_rates if operation_rates is None else operation_rates
+        self.slow_threshold = settings.log_slow_request_threshold if slow_threshold is None else slow_threshold
+        self.buffer_size = settings.log_sample_buffer_size if buffer_size is None else buffer_size
+        self.discarded = 0
+        self.recorder = recorder
+        self._logger_rate_cache: Dict[str, Optional[float]] = {}
+
+    @property
+    def active(self) -> bool:
+        """
+        Whether any rate is below 1, i.e. whether the handler drops anything at all.
+        """
+        rates = [self.default_rate, *self.logger_rates.values(), *self.operation_rates.values()]
+        return any(rate < 1.0 for rate in rates)
+
+    def setTarget(self, target: logging.Handler):
+        """
+        Sets the handler the sampled records are passed to.
+        """
+        self.target = target
+
+    def logger_rate(self, name: str) -> Optional[float]:
+        """
+        Returns the rate configured for the logger or its closest configured ancestor, if any.
+        """
+        try:
+            return self._logger_rate_cache[name]
+        except KeyError:
+            pass
+        rate = None
+        candidate = name
+        while candidate:
+            if candidate in self.logger_rates:
+                rate = self.logger_rates[candidate]
+                break
+            candidate = candidate.rpartition(".")[0]
+        self._logger_rate_cache[name] = rate
+        return rate
+
+    def rate(self, record: logging.LogRecord, request: Optional[SampledRequest]) -> float:
+        """
+        Returns the sample rate applicable to the record.
+        """
+        logger_rate = self.logger_rate(record.name)
+        operation = get_operation_name() if request is not None and self.operation_rates else None
+        operation_rate = self.operation_rates.get(operation) if operation is not None else None
+        if logger_rate is None and operation_rate is None:
+            return self.default_rate
+        if logger_rate is None or operation_rate is None:
+            return logger_rate if operation_rate is None else operation_rate
+        return min(logger_rate, operation_rate)
+
+    def emit(self, record: logging.LogRecord):
+        if self.target is None:
+            return
+        request = _current_request.get()
+        if record.levelno >= logging.WARNING:
+            if request is not None and record.levelno >= logging.ERROR and not request.failed:
+                request.handler = self
+                request.fail()
+            self.target.handle(record)
+            return
+
+        if request is None:
+            rate = self.rate(record, None)
+            if rate >= 1.0 or random.random() < rate:
+                self.target.handle(record)
+            else:
+                self._discard()
+            return
+
+        if request.kept or request.fraction < self.rate(record, request):
+            self.target.handle(record)
+        elif time.perf_counter() - request.started >= self.slow_threshold:
+            request.handler = self
+            request.keep()
+            self.target.handle(record)
+        elif len(request.buffer) < self.buffer_size:
+            request.handler = self
+            request.buffer.append(record)
+        else:
+            self._discard()
+
+    def _discard(self):
+        self.discarded += 1
+        if self.recorder is not None:
+            self.recorder.observe_log_dropped("sampled")
+
+    def flush_request(self, request: SampledRequest):
+        """
+        Passes the records buffered by the request on to the target.
+        """
+        records, request.buffer = request.buffer, []
+        if self.target is not None:
+            for record in records:
+                self.target.handle(record)
+
+
+class LogSamplingMiddleware:
+    """
+    Pure ASGI middleware tracking the sampling state of every HTTP request.
+
+    The request is identified by the id assigned by RequestIdMiddleware, which must wrap this middleware.
+    A response status of 500 or above, or an exception, marks the request as failed.
+    """
+
+    def __init__(self, app: ASGIApp, slow_threshold: Optional[float] = None):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            slow_threshold (Optional[float]): Seconds after which a request logs all its records.
+        """
+        self.app = app
+        self.slow_threshold = settings.log_slow_request_threshold if slow_threshold is None else slow_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = SampledRequest(get_request_id() or new_request_id())
+        token = _current_request.set(request)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] >= 500:
+                request.fail()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            request.fail()
+            raise
+        finally:
+            request.finish(self.slow_threshold)
+            _current_request.reset(token)
@@ -1,29 +1,151 @@
+import atexit
+import copy
+import datetime
 import logging
+import queue
 import sys
-from app.core.config import settings
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
+import orjson
 
-def configure_logging(level: int = logging.INFO) -> None:
+from app.core.metrics import MetricsRecorder
+from app.core.request_context import get_request_id
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through `extra` and is logged as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Stamps the id of the request being handled on every record as `request_id` ('-' outside a request).
+
+    Attached to the handler of the root logger, so it runs in the thread and context that logged the record.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id() or "-"
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, serialized with orjson.
+
+    The object has 'timestamp' (UTC, ISO 8601), 'level', 'logger' and 'message' keys, 'exception' if
+    the record carries one, and one key per attribute passed with `extra`. Values orjson cannot
+    serialize natively are logged as their `str()`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Hands records to a bounded queue drained by a background thread, never blocking the caller.
+
+    When the queue is full the record is dropped and counted in `dropped` (and in the 'queue_full'
+    log_records_dropped_total metric if a recorder is given), so a slow log sink
+    degrades logging instead of request handling. The message is not formatted here: the record is
+    passed on with its arguments and formatted by the writer thread, so the caller only pays for
+    creating the record. Exception tracebacks are rendered eagerly, since the frames they refer to
+    may change once the caller continues.
+    """
+
+    def __init__(self, log_queue: queue.Queue, recorder: Optional[MetricsRecorder] = None):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.recorder = recorder
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if self.recorder is not None:
+                self.recorder.observe_log_dropped("queue_full")
+
+
+class DrainingQueueListener(QueueListener):
+    """
+    Queue listener whose stop waits for room in a full queue instead of failing, so that shutdown
+    writes every queued record even when the queue is saturated.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def configure_logging(level: int = logging.INFO, log_format: str = "text", queue_size: int = 0,
+                      sampling_handler: Optional[logging.Handler] = None,
+                      recorder: Optional[MetricsRecorder] = None) -> None:
     """
     Configures the logging settings for the application.
 
     Args:
         level: The logging level to set (e.g., logging.DEBUG, logging.INFO).
+        log_format: 'text' for human-readable lines or 'json' for one JSON object per line.
+        queue_size: If positive, records are written to stdout by a background thread through a
+            queue of this size, dropping records when it is full; otherwise they are written synchronously.
+        sampling_handler: Optional handler with a `setTarget` method (e.g. log_sampling.SamplingHandler)
+            deciding which records are written.
+        recorder: Records the records dropped from the queue as metrics, if given.
     """
+    global _listener
+
     # Check if the root logger already has handlers
     if not logging.getLogger().hasHandlers():
-        logging.basicConfig(
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            level=level,
-            handlers=[
-                logging.StreamHandler(sys.stdout),
-                # Additional handlers can be added here if needed
-            ]
-        )
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(JSONFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+        handler: logging.Handler = stream_handler
+        if queue_size > 0:
+            handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size), recorder)
+            _listener = DrainingQueueListener(handler.queue, stream_handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+        if sampling_handler is not None:
+            sampling_handler.setTarget(handler)
+            handler = sampling_handler
+        handler.addFilter(RequestIdFilter())
+
+        logging.basicConfig(level=level, handlers=[handler])
         logger = logging.getLogger(__name__)
         logger.info("Logging has been configured.")
 
 
-# Initialize logging with the level specified in settings
-logging_level = getattr(logging, settings.logging_level.upper(), logging.INFO)
-configure_logging(level=logging_level)
+def shutdown_logging() -> None:
+    """
+    Writes the records still queued and stops the background writer, e.g. on application shutdown.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,401 @@
+import os
+from typing import Dict, Optional, Tuple, Union
+
+from fastapi.exceptions import RequestValidationError
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client import generate_latest, multiprocess
+from starlette.exceptions import HTTPException
+
+from app.core.config import settings
+from app.core.error_codes import ErrorCodes
+
+# Set for multi-worker deployments: every worker then writes its values to memory-mapped files in
+# this directory, and /metrics aggregates the files of all workers. It has to be set (and emptied)
+# before the workers start, since prometheus_client picks its storage when it is imported.
+MULTIPROCESS_DIR_VARIABLE = "PROMETHEUS_MULTIPROC_DIR"
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled, by route, method, GraphQL operation and status.",
+    ["route", "method", "operation", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency, by route and GraphQL operation.",
+    ["route", "operation"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being handled.", multiprocess_mode="livesum",
+)
+ERRORS = Counter(
+    "app_errors_total", "Errors returned to clients, by ErrorDescriptor code.", ["code"],
+)
+
+REQUESTS_SHED = Counter(
+    "http_requests_shed_total", "HTTP requests rejected by the adaptive concurrency limit, by priority.",
+    ["priority"],
+)
+CONCURRENCY_LIMIT = Gauge(
+    "http_concurrency_limit", "Current adaptive concurrency limit.", multiprocess_mode="livesum",
+)
+
+REQUESTS_RATE_LIMITED = Counter(
+    "rate_limited_requests_total", "Requests rejected by a rate limit, by GraphQL operation and key type.",
+    ["operation", "key_type"],
+)
+
+RETRY_EVENTS = Counter(
+    "upstream_retry_events_total",
+    "Calls through an upstream's retry policy and their retry outcomes, by upstream and RetryStats counter.",
+    ["upstream", "event"],
+)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "circuit_breaker_state", "State of a circuit breaker: 0 closed, 1 half-open, 2 open.",
+    ["breaker"], multiprocess_mode="livemax",
+)
+CIRCUIT_BREAKER_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state transitions, by breaker and new state.",
+    ["breaker", "state"],
+)
+QUOTA_REJECTIONS = Counter(
+    "cognito_quota_rejections_total",
+    "Cognito calls rejected locally because their quota category had no token in time, by category.",
+    ["category"],
+)
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Calls through a coalescer, by coalescer and whether they shared the result of another call.",
+    ["flight", "shared"],
+)
+
+TOKEN_CACHE_EVENTS = Counter(
+    "token_cache_events_total", "Verified-token cache lookups and removals, by TokenCacheStats counter.",
+    ["event"],
+)
+TOKEN_REJECTIONS = Counter(
+    "token_rejections_total", "Tokens rejected by the verifier, by the stage that rejected them.", ["stage"],
+)
+TOKEN_DENYLIST_EVENTS = Counter(
+    "token_denylist_events_total", "Token denylist checks and revocations, by RevocationStats counter.",
+    ["event"],
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records not written, by reason: 'queue_full' (logging queue full) or 'sampled' (discarded by sampling).",
+    ["reason"],
+)
+
+CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+UPSTREAM_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total", "Upstream HTTP calls, by upstream, operation and status ('error' if none).",
+    ["upstream", "operation", "status"],
+)
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds", "Upstream HTTP call latency including the body, by upstream and operation.",
+    ["upstream", "operation"], buckets=UPSTREAM_BUCKETS,
+)
+UPSTREAM_BYTES_SENT = Counter(
+    "upstream_bytes_sent_total", "Request body bytes sent upstream.", ["upstream", "operation"],
+)
+UPSTREAM_BYTES_RECEIVED = Counter(
+    "upstream_bytes_received_total", "Response body bytes received from upstream.", ["upstream", "operation"],
+)
+UPSTREAM_CONNECTIONS = Counter(
+    "upstream_connections_total", "Connections used for upstream calls, by whether they were reused from the pool.",
+    ["upstream", "reused"],
+)
+UPSTREAM_POOL_WAIT = Histogram(
+    "upstream_pool_wait_seconds",
+    "Time upstream calls waited for the connection pool, until connecting a new connection or reusing one.",
+    ["upstream"], buckets=UPSTREAM_BUCKETS,
+)
+UPSTREAM_TLS_HANDSHAKE = Histogram(
+    "upstream_tls_handshake_seconds", "TLS handshake time of new upstream connections.",
+    ["upstream"], buckets=UPSTREAM_BUCKETS,
+)
+
+
+def multiprocess_mode() -> bool:
+    """
+    Returns whether metrics are shared between worker processes.
+    """
+    return bool(os.environ.get(MULTIPROCESS_DIR_VARIABLE))
+
+
+def error_code(exception: BaseException) -> str:
+    """
+    Returns the ErrorDescriptor code an exception is reported with.
+
+    Args:
+        exception (BaseException): The exception returned to the client.
+
+    Returns:
+        str: The code of the exception's descriptor; for other exceptions the code of the closest descriptor.
+    """
+    if isinstance(exception, HTTPException):
+        if isinstance(exception.detail, dict) and "code" in exception.detail:
+            return str(exception.detail["code"])
+        if exception.status_code in (401, 403):
+            return ErrorCodes.UNAUTHORIZED.code
+        if exception.status_code < 500:
+            return ErrorCodes.INVALID_REQUEST.code
+    if isinstance(exception, RequestValidationError):
+        return ErrorCodes.INVALID_REQUEST.code
+    return ErrorCodes.INTERNAL_ERROR.code
+
+
+class MetricsRecorder:
+    """
+    Records request and error metrics through cached, labelled metric children.
+
+    Resolving a child with `labels()` validates the labels and takes the metric's lock on every call;
+    here each label combination is resolved once and kept in a dict, so recording an observation is
+    a dict lookup and the increments of the child's preallocated bucket and sum values.
+    """
+
+    def __init__(self):
+        self._requests: Dict[Tuple[str, str, str, int], Counter] = {}
+        self._durations: Dict[Tuple[str, str], Histogram] = {}
+        self._errors: Dict[str, Counter] = {}
+        self._upstream_calls: Dict[Tuple[str, str, Union[int, str]], Tuple[Counter, Histogram, Counter, Counter]] = {}
+        self._upstream_connections: Dict[Tuple[str, bool], Tuple[Counter, Histogram, Histogram]] = {}
+        self._shed: Dict[str, Counter] = {}
+        self._rate_limited: Dict[Tuple[str, str], Counter] = {}
+        self._events: Dict[Tuple[Counter, Tuple[str, ...]], Counter] = {}
+        self.in_flight = REQUESTS_IN_FLIGHT
+        self.concurrency_limit = CONCURRENCY_LIMIT
+
+    def observe_request(self, route: str, method: str, operation: str, status: int, duration: float):
+        """
+        Records a handled request.
+
+        Args:
+            route (str): The route template, e.g. '/graphql'.
+            method (str): The HTTP method.
+            operation (str): The GraphQL operation, or '' for other routes.
+            status (int): The response status code.
+            duration (float): The time until the response was sent, in seconds.
+        """
+        key = (route, method, operation, status)
+        counter = self._requests.get(key)
+        if counter is None:
+            counter = self._requests[key] = REQUESTS.labels(route, method, operation, str(status))
+        counter.inc()
+
+        duration_key = (route, operation)
+        histogram = self._durations.get(duration_key)
+        if histogram is None:
+            histogram = self._durations[duration_key] = REQUEST_DURATION.labels(route, operation)
+        histogram.observe(duration)
+
+    def observe_error(self, code: str):
+        """
+        Records an error returned to a client.
+
+        Args:
+            code (str): The ErrorDescriptor code of the error, see `error_code`.
+        """
+        counter = self._errors.get(code)
+        if counter is None:
+            counter = self._errors[code] = ERRORS.labels(code)
+        counter.inc()
+
+    def observe_shed(self, priority: str):
+        """
+        Records a request rejected by the concurrency limit.
+
+        Args:
+            priority (str): The request's priority.
+        """
+        counter = self._shed.get(priority)
+        if counter is None:
+            counter = self._shed[priority] = REQUESTS_SHED.labels(priority)
+        counter.inc()
+
+    def observe_rate_limited(self, operation: str, key_type: str):
+        """
+        Records a request rejected by a rate limit.
+
+        Args:
+            operation (str): The GraphQL operation.
+            key_type (str): The key type of the exceeded limit, e.g. 'ip'.
+        """
+        key = (operation, key_type)
+        counter = self._rate_limited.get(key)
+        if counter is None:
+            counter = self._rate_limited[key] = REQUESTS_RATE_LIMITED.labels(operation, key_type)
+        counter.inc()
+
+    def observe_retry_event(self, upstream: str, event: str):
+        """
+        Records a call through a retry policy or one of its outcomes.
+
+        Args:
+            upstream (str): The upstream name, e.g. 'cognito'.
+            event (str): The RetryStats counter, e.g. 'retries' or 'budget_exhausted'.
+        """
+        self._count(RETRY_EVENTS, upstream, event)
+
+    def observe_breaker_transition(self, breaker, previous, state):
+        """
+        Records a circuit breaker state transition; registered as a CircuitBreakerRegistry listener.
+
+        Args:
+            breaker (CircuitBreaker): The breaker.
+            previous (CircuitState): The state it left.
+            state (CircuitState): The state it entered.
+        """
+        CIRCUIT_BREAKER_STATE.labels(breaker.name).set(CIRCUIT_STATE_VALUES[state.value])
+        self._count(CIRCUIT_BREAKER_TRANSITIONS, breaker.name, state.value)
+
+    def observe_quota_rejection(self, category: str):
+        """
+        Records a Cognito call rejected by the client-side quota limiter.
+
+        Args:
+            category (str): The quota category, e.g. 'UserAuthentication'.
+        """
+        self._count(QUOTA_REJECTIONS, category)
+
+    def observe_singleflight(self, flight: str, shared: bool):
+        """
+        Records a call through a SingleFlight coalescer.
+
+        Args:
+            flight (str): The coalescer name, e.g. 'refresh'.
+            shared (bool): Whether the call shared the result of another call.
+        """
+        self._count(SINGLEFLIGHT_CALLS, flight, "true" if shared else "false")
+
+    def observe_token_cache(self, event: str):
+        """
+        Records a verified-token cache event.
+
+        Args:
+            event (str): The TokenCacheStats counter, e.g. 'hits' or 'evictions'.
+        """
+        self._count(TOKEN_CACHE_EVENTS, event)
+
+    def observe_token_rejection(self, stage: str):
+        """
+        Records a token rejected by the verifier.
+
+        Args:
+            stage (str): The TokenPreFilter stage, e.g. 'shape' or 'signature'.
+        """
+        self._count(TOKEN_REJECTIONS, stage)
+
+    def observe_denylist(self, event: str):
+        """
+        Records a token denylist event.
+
+        Args:
+            event (str): The RevocationStats counter, e.g. 'checks' or 'hits'.
+        """
+        self._count(TOKEN_DENYLIST_EVENTS, event)
+
+    def observe_log_dropped(self, reason: str):
+        """
+        Records a log record that was not written.
+
+        Args:
+            reason (str): 'queue_full' or 'sampled'.
+        """
+        self._count(LOG_RECORDS_DROPPED, reason)
+
+    def _count(self, metric: Counter, *labels: str):
+        key = (metric, labels)
+        counter = self._events.get(key)
+        if counter is None:
+            counter = self._events[key] = metric.labels(*labels)
+        counter.inc()
+
+    def observe_upstream_call(self, upstream: str, operation: str, status: Union[int, str], duration: float,
+                              bytes_sent: int, bytes_received: int):
+        """
+        Records a call to an upstream service.
+
+        Args:
+            upstream (str): The upstream name, e.g. 'cognito'.
+            operation (str): The operation, e.g. 'InitiateAuth'.
+            status (Union[int, str]): The response status code, or 'error' if the call failed without one.
+            duration (float): The time until the response body was read, in seconds.
+            bytes_sent (int): The size of the request body.
+            bytes_received (int): The size of the response body.
+        """
+        key = (upstream, operation, status)
+        children = self._upstream_calls.get(key)
+        if children is None:
+            children = self._upstream_calls[key] = (
+                UPSTREAM_REQUESTS.labels(upstream, operation, str(status)),
+                UPSTREAM_DURATION.labels(upstream, operation),
+                UPSTREAM_BYTES_SENT.labels(upstream, operation),
+                UPSTREAM_BYTES_RECEIVED.labels(upstream, operation),
+            )
+        requests, durations, sent, received = children
+        requests.inc()
+        durations.observe(duration)
+        if bytes_sent:
+            sent.inc(bytes_sent)
+        if bytes_received:
+            received.inc(bytes_received)
+
+    def observe_upstream_connection(self, upstream: str, reused: bool, pool_wait: float,
+                                    tls_handshake: Optional[float]):
+        """
+        Records how an upstream call got its connection.
+
+        Args:
+            upstream (str): The upstream name.
+            reused (bool): Whether the connection was reused from the pool rather than newly opened.
+            pool_wait (float): Seconds until the call started connecting or reusing a connection.
+            tls_handshake (Optional[float]): Seconds the TLS handshake of a new connection took.
+        """
+        key = (upstream, reused)
+        children = self._upstream_connections.get(key)
+        if children is None:
+            children = self._upstream_connections[key] = (
+                UPSTREAM_CONNECTIONS.labels(upstream, "true" if reused else "false"),
+                UPSTREAM_POOL_WAIT.labels(upstream),
+                UPSTREAM_TLS_HANDSHAKE.labels(upstream),
+            )
+        connections, pool_waits, tls_handshakes = children
+        connections.inc()
+        pool_waits.observe(pool_wait)
+        if tls_handshake is not None:
+            tls_handshakes.observe(tls_handshake)
+
+
+def render() -> bytes:
+    """
+    Returns the metrics in the Prometheus text format, aggregated over all workers in multiprocess mode.
+    """
+    if multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead():
+    """
+    Removes the live gauge values of this worker from the shared files, e.g. when it shuts down.
+    """
+    if multiprocess_mode():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+recorder = MetricsRecorder()
+
+
+def default_recorder() -> Optional[MetricsRecorder]:
+    """
+    Returns the recorder components record their counters with, or None if metrics are disabled.
+    """
+    return recorder if settings.metrics_enabled else None
@@ -0,0 +1,315 @@
+import time
+from typing import Any, Collection, Dict, Mapping, Optional, Tuple
+
+import orjson
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.concurrency_limit import AdaptiveConcurrencyLimiter, Priority, graphql_operation_field
+from app.core.config import settings
+from app.core.dependency_injector import DependencyInjector
+from app.core.error_codes import ErrorCodes, ServiceUnavailableSupportCodes
+from app.core.metrics import MetricsRecorder
+from app.core.request_context import (
+    REQUEST_ID_HEADER, accept_request_id, get_operation_name, reset_request_id, set_request_id
+)
+from app.core.timing import start_collecting, stop_collecting
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware assigning an id to every HTTP and WebSocket request.
+
+    The id is taken from the X-Request-ID header if the client sent a well-formed one, and generated
+    otherwise. It is stored in a context variable for the duration of the request, from where it is
+    stamped on log records and sent with outbound requests, and echoed in the X-Request-ID response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = accept_request_id(Headers(scope=scope).get(REQUEST_ID_HEADER))
+        token = set_request_id(request_id)
+
+        async def send_with_request_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            reset_request_id(token)
+
+
+class DependencyScopeMiddleware:
+    """
+    Pure ASGI middleware opening a dependency scope around every HTTP and WebSocket request.
+
+    SCOPED services resolved while handling the request are shared by all of its resolvers and
+    dependencies, and disposed once the response has been sent.
+    """
+
+    def __init__(self, app: ASGIApp, injector: DependencyInjector):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            injector (DependencyInjector): The injector whose scopes are opened.
+        """
+        self.app = app
+        self.injector = injector
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        async with self.injector.scope():
+            await self.app(scope, receive, send)
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware reporting the phases of every HTTP request in a Server-Timing response header.
+
+    A timing collector is opened for the request; code wrapped in `app.core.timing.timed` (token
+    verification, GraphQL parse, validation and execution, upstream calls) records its duration there.
+    The header lists each phase and the total time until the response started, in milliseconds.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        collector, token = start_collecting()
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", collector.header_value())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_collecting(token)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording the count, latency and status of every HTTP request.
+
+    Requests are labelled by route template rather than path, so that path parameters do not create a
+    metric per value, and by GraphQL operation for GraphQL requests. Requests matching no route are
+    labelled 'unmatched'.
+    """
+
+    def __init__(self, app: ASGIApp, recorder: MetricsRecorder):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            recorder (MetricsRecorder): The recorder of the metrics.
+        """
+        self.app = app
+        self.recorder = recorder
+        self._endpoint_routes: Dict[Any, str] = {}
+
+    def route(self, scope: Scope) -> str:
+        """
+        Returns the template of the route that handled the request.
+        """
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if not self._endpoint_routes and "app" in scope:
+            self._endpoint_routes = {
+                getattr(route, "endpoint", None): route.path for route in scope["app"].routes if hasattr(route, "path")
+            }
+        return self._endpoint_routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = self.recorder.in_flight
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            self.recorder.observe_request(
+                self.route(scope), scope["method"], get_operation_name() or "", status,
+                time.perf_counter() - started,
+            )
+
+
+class AdaptiveConcurrencyMiddleware:
+    """
+    Pure ASGI middleware shedding load beyond the worker's adaptive concurrency limit.
+
+    Each HTTP request gets a priority: GraphQL requests by their operation (their top-level field,
+    read from the buffered body), everything else NORMAL. Only bodies of up to `max_peek_bytes` are
+    buffered before admission; larger ones get NORMAL priority, so an oversized body cannot tie up
+    memory ahead of the limit. A request that the limiter does not admit
+    is answered at once with 503, the SERVICE_UNAVAILABLE error body and a Retry-After header, instead
+    of waiting in a queue. The latency of admitted requests adapts the limit. Health and metrics
+    endpoints are exempt, so that probes keep working under overload.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: AdaptiveConcurrencyLimiter,
+                 priorities: Optional[Mapping[str, str]] = None, recorder: Optional[MetricsRecorder] = None,
+                 graphql_path: str = "/graphql", exempt_paths: Collection[str] = ("/ready", "/metrics"),
+                 retry_after: Optional[int] = None, max_peek_bytes: Optional[int] = None):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            limiter (AdaptiveConcurrencyLimiter): The concurrency limiter.
+            priorities (Optional[Mapping[str, str]]): Priority by GraphQL operation; the
+                LOAD_SHEDDING_PRIORITIES setting if omitted.
+            recorder (Optional[MetricsRecorder]): Recorder of the shed requests and the limit, if any.
+            graphql_path (str): The path of the GraphQL endpoint.
+            exempt_paths (Collection[str]): Paths that are never limited.
+            retry_after (Optional[int]): Seconds clients are asked to wait before retrying.
+            max_peek_bytes (Optional[int]): Largest body read to find the GraphQL operation.
+        """
+        self.app = app
+        self.limiter = limiter
+        priorities = settings.load_shedding_priorities if priorities is None else priorities
+        self.priorities = {operation: Priority(priority) for operation, priority in priorities.items()}
+        self.recorder = recorder
+        self.graphql_path = graphql_path
+        self.exempt_paths = frozenset(exempt_paths)
+        self.max_peek_bytes = settings.load_shedding_max_peek_bytes if max_peek_bytes is None else max_peek_bytes
+        retry_after = settings.concurrency_retry_after if retry_after is None else retry_after
+        error = ErrorCodes.SERVICE_UNAVAILABLE
+        self._rejection_body = orjson.dumps({"detail": {
+            "code": error.code,
+            "message": error.message,
+            "support_code": ServiceUnavailableSupportCodes.SERVER_OVERLOADED,
+        }})
+        self._rejection_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._rejection_body)).encode("latin-1")),
+            (b"retry-after", str(retry_after).encode("latin-1")),
+        ]
+        self._reported_limit = None
+
+    @staticmethod
+    def content_length(scope: Scope) -> Optional[int]:
+        """
+        Returns the declared Content-Length of the request, if any.
+        """
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    @staticmethod
+    async def read_body(receive: Receive, max_size: int) -> Tuple[Optional[bytes], Receive]:
+        """
+        Reads the request body, stopping once more than `max_size` bytes have been read.
+
+        Returns:
+            Tuple[Optional[bytes], Receive]: The body, or None if it is larger than `max_size`, and a receive
+            callable replaying the part read to the application before passing the rest through.
+        """
+        chunks = []
+        size = 0
+        message: Message = {"type": "http.request", "more_body": True}
+        while message["type"] == "http.request" and message.get("more_body", False) and size <= max_size:
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                chunks.append(chunk)
+                size += len(chunk)
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                if message["type"] != "http.request":
+                    return message
+                return {"type": "http.request", "body": body, "more_body": message.get("more_body", False)}
+            return await receive()
+
+        return (body if size <= max_size else None), replay
+
+    async def reject(self, send: Send):
+        await send({"type": "http.response.start", "status": 503, "headers": self._rejection_headers})
+        await send({"type": "http.response.body", "body": self._rejection_body})
+
+    def report_limit(self):
+        limit = int(self.limiter.limit)
+        if self.recorder is not None and limit != self._reported_limit:
+            self._reported_limit = limit
+            self.recorder.concurrency_limit.set(limit)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        priority = Priority.NORMAL
+        if scope["path"] == self.graphql_path and scope["method"] == "POST" and self.priorities:
+            content_length = self.content_length(scope)
+            if content_length is None or content_length <= self.max_peek_bytes:
+                body, receive = await self.read_body(receive, self.max_peek_bytes)
+                if body is not None:
+                    priority = self.priorities.get(graphql_operation_field(body), Priority.NORMAL)
+
+        if not self.limiter.try_acquire(priority):
+            if self.recorder is not None:
+                self.recorder.observe_shed(priority.value)
+            await self.reject(send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(time.perf_counter() - started)
+            self.report_limit()
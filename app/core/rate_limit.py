@@ -0,0 +1,347 @@
+import hashlib
+import ipaddress
+import itertools
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.utils.redis_protocol import RedisClient, RedisError
+
+
+class KeyType(str, Enum):
+    """
+    What a rate limit counts requests by.
+    """
+    IP = "ip"
+    USERNAME = "username"
+
+
+class RateLimit(NamedTuple):
+    """
+    At most `limit` requests per `window` seconds.
+    """
+    limit: int
+    window: int
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """
+        Parses a limit written as 'requests/seconds', e.g. '5/60'.
+        """
+        limit, _, window = value.partition("/")
+        rate_limit = cls(int(limit), int(window))
+        if rate_limit.limit < 0 or rate_limit.window <= 0:
+            raise ValueError(f"Invalid rate limit {value!r}")
+        return rate_limit
+
+
+class WindowHit(NamedTuple):
+    """
+    A request counted against a key: the key, the index of the current fixed window (time // window)
+    and the window length in seconds.
+    """
+    key: bytes
+    window_index: int
+    window: int
+
+
+def parse_rate_limits(config: Mapping[str, Mapping[str, str]]) -> Dict[str, Dict[KeyType, RateLimit]]:
+    """
+    Parses the RATE_LIMITS setting, e.g. {"login": {"ip": "30/60", "username": "10/300"}}.
+
+    Returns:
+        Dict[str, Dict[KeyType, RateLimit]]: The limits of each GraphQL operation by key type.
+    """
+    return {
+        operation: {KeyType(key_type): RateLimit.parse(value) for key_type, value in limits.items()}
+        for operation, limits in config.items()
+    }
+
+
+def client_address(host: Optional[str], forwarded_for: Optional[str] = None, trusted_hops: int = 0) -> Optional[str]:
+    """
+    Returns the address requests of a client are counted by.
+
+    With `trusted_hops` proxies in front of the service, the client is the address that many entries
+    from the right of X-Forwarded-For; entries further left are set by the client and can be forged.
+    IPv6 clients are counted by their /64 network, since a single subscriber is usually assigned a whole
+    /64 and could otherwise rotate addresses freely.
+
+    Args:
+        host (Optional[str]): The peer address of the connection.
+        forwarded_for (Optional[str]): The X-Forwarded-For header, if any.
+        trusted_hops (int): The number of trusted proxies appending to X-Forwarded-For.
+
+    Returns:
+        Optional[str]: The address or network, or None if it is unknown.
+    """
+    if trusted_hops and forwarded_for:
+        addresses = [address.strip() for address in forwarded_for.split(",")]
+        host = addresses[-trusted_hops] if len(addresses) >= trusted_hops else addresses[0]
+    if not host:
+        return None
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return host
+    if address.version == 6:
+        if address.ipv4_mapped is not None:
+            return str(address.ipv4_mapped)
+        return str(ipaddress.IPv6Network((address, 64), strict=False))
+    return str(address)
+
+
+class RateLimitStore(ABC):
+    """
+    Counter store of the sliding-window rate limiter.
+
+    Each key has two counters: the requests of its current fixed window and of the window before.
+    """
+
+    @abstractmethod
+    async def hit(self, hits: Sequence[WindowHit]) -> List[Tuple[int, int]]:
+        """
+        Counts one request against each key.
+
+        Args:
+            hits (Sequence[WindowHit]): The keys and their current windows.
+
+        Returns:
+            List[Tuple[int, int]]: For each key, the requests counted in the previous window and in the
+            current one, including this request.
+        """
+        pass
+
+    async def close(self):
+        """
+        Releases the resources of the store.
+        """
+        pass
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Process-local counter store, suitable for a single instance.
+
+    Every key takes one small list [window_index, current, previous, expires_at], rolled over in place
+    when a new window starts. Keys are spread over shards by hash; when a shard grows beyond its share
+    of `max_entries`, only that shard is swept for expired keys, which bounds the pause of a sweep, and
+    if too few have expired its oldest keys are evicted, loosening the limits rather than growing
+    without bound.
+    """
+
+    def __init__(self, shards: Optional[int] = None, max_entries: Optional[int] = None):
+        """
+        Initializes the store.
+
+        Args:
+            shards (Optional[int]): The number of shards, rounded up to a power of two.
+            max_entries (Optional[int]): The maximum number of keys over all shards.
+        """
+        shards = shards or settings.rate_limit_memory_shards
+        size = 1
+        while size < shards:
+            size *= 2
+        self._mask = size - 1
+        self._shards: List[Dict[bytes, list]] = [{} for _ in range(size)]
+        self.max_shard_entries = max(1, (max_entries or settings.rate_limit_memory_max_entries) // size)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def _make_room(self, shard: Dict[bytes, list], now: float):
+        for key in [key for key, entry in shard.items() if entry[3] <= now]:
+            del shard[key]
+        # Evict an eighth of the shard at once, so that the next sweep is not due on the next new key
+        if len(shard) >= self.max_shard_entries:
+            for key in list(itertools.islice(shard, len(shard) - self.max_shard_entries * 7 // 8)):
+                del shard[key]
+
+    async def hit(self, hits: Sequence[WindowHit]) -> List[Tuple[int, int]]:
+        now = time.time()
+        counts = []
+        for key, window_index, window in hits:
+            shard = self._shards[hash(key) & self._mask]
+            entry = shard.get(key)
+            if entry is None:
+                if len(shard) >= self.max_shard_entries:
+                    self._make_room(shard, now)
+                entry = shard[key] = [window_index, 0, 0, 0.0]
+            elif entry[0] != window_index:
+                entry[2] = entry[1] if entry[0] == window_index - 1 else 0
+                entry[0] = window_index
+                entry[1] = 0
+            entry[1] += 1
+            # The counts are needed until the window after the current one has ended
+            entry[3] = (window_index + 2) * window
+            counts.append((entry[2], entry[1]))
+        return counts
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Counter store shared by all instances through a Redis-protocol server.
+
+    Each key and window is a Redis counter expiring after two windows. All requests of a call are
+    counted in one pipeline (INCR and EXPIRE of the current window, GET of the previous one), so a check
+    takes a single round trip however many keys it counts.
+    """
+
+    def __init__(self, client: Optional[RedisClient] = None):
+        """
+        Initializes the store.
+
+        Args:
+            client (Optional[RedisClient]): The client; one for the RATE_LIMIT_REDIS_* settings if omitted.
+        """
+        self.client = client or RedisClient(
+            settings.rate_limit_redis_url, pool_size=settings.rate_limit_redis_pool_size,
+            timeout=settings.rate_limit_redis_timeout,
+        )
+
+    async def hit(self, hits: Sequence[WindowHit]) -> List[Tuple[int, int]]:
+        commands = []
+        for key, window_index, window in hits:
+            current = b"%s:%d" % (key, window_index)
+            commands.append(("INCR", current))
+            commands.append(("EXPIRE", current, 2 * window))
+            commands.append(("GET", b"%s:%d" % (key, window_index - 1)))
+        replies = await self.client.execute(*commands)
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return [
+            (int(replies[index + 2] or 0), replies[index])
+            for index in range(0, len(replies), 3)
+        ]
+
+    async def close(self):
+        await self.client.close()
+
+
+class RateLimitExceeded(NamedTuple):
+    """
+    A limit a request exceeded.
+    """
+    key_type: KeyType
+    rate_limit: RateLimit
+    retry_after: int
+
+
+class SlidingWindowRateLimiter:
+    """
+    Limits requests per GraphQL operation and key (client address, username) over a sliding window.
+
+    The sliding window is approximated from two fixed windows: the requests of the previous window are
+    weighted by the part of it still covered by a window ending now, i.e. `previous * (1 - elapsed /
+    window) + current`, assuming they were spread evenly. This needs two counters per key instead of
+    a log of request times, and unlike a plain fixed window it does not allow twice the limit in a
+    burst around a window boundary.
+
+    Every request is counted, including rejected ones, so a client retrying without pause stays
+    limited. If the store fails, requests are let through: the limiter protects Cognito from abuse,
+    and an outage of the store should not lock every user out.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, store: Optional[RateLimitStore] = None,
+                 limits: Optional[Mapping[str, Mapping[KeyType, RateLimit]]] = None):
+        """
+        Initializes the limiter.
+
+        Args:
+            store (Optional[RateLimitStore]): The counter store; the configured one if omitted.
+            limits (Optional[Mapping[str, Mapping[KeyType, RateLimit]]]): The limits of each operation by
+                key type; the RATE_LIMITS setting if omitted.
+        """
+        if store is None:
+            store = RedisRateLimitStore() if settings.rate_limit_store == "redis" else InMemoryRateLimitStore()
+        self.store = store
+        self.limits = parse_rate_limits(settings.rate_limits) if limits is None else limits
+
+    @staticmethod
+    def key(operation: str, key_type: KeyType, value: str) -> bytes:
+        """
+        Returns the store key of a value: a digest, so keys have a fixed size and the store holds
+        no usernames or addresses.
+        """
+        digest = hashlib.blake2b(value.encode(), digest_size=12).hexdigest()
+        return f"rl:{operation}:{key_type.value}:{digest}".encode()
+
+    @staticmethod
+    def retry_after(previous: int, current: int, rate_limit: RateLimit, elapsed: float) -> float:
+        """
+        Returns the seconds until a key's estimate has decayed enough to allow one more request,
+        assuming no further requests are made until then.
+
+        Args:
+            previous (int): The requests of the previous window.
+            current (int): The requests of the current window.
+            rate_limit (RateLimit): The limit.
+            elapsed (float): Seconds elapsed in the current window.
+        """
+        window = rate_limit.window
+        allowed = rate_limit.limit - 1
+        if allowed < 0:
+            return float(window)
+        if current <= allowed:
+            # Allowed again within the current window, as the weight of the previous one decays
+            return max(0.0, window * (1 - (allowed - current) / previous) - elapsed)
+        # The current window becomes the previous one and has to decay in turn
+        return window - elapsed + window * (1 - allowed / current)
+
+    async def hit(self, operation: str, values: Mapping[KeyType, Optional[str]]) -> Optional[RateLimitExceeded]:
+        """
+        Counts a request of an operation against the limits of each of its keys.
+
+        Args:
+            operation (str): The GraphQL operation, e.g. 'login'.
+            values (Mapping[KeyType, Optional[str]]): The request's value of each key type; missing
+                values are not limited.
+
+        Returns:
+            Optional[RateLimitExceeded]: The limit the request exceeded with the longest wait, or None
+            if it is within all limits.
+        """
+        limits = self.limits.get(operation)
+        if not limits:
+            return None
+        now = time.time()
+        checks: List[Tuple[KeyType, RateLimit]] = []
+        hits: List[WindowHit] = []
+        for key_type, rate_limit in limits.items():
+            value = values.get(key_type)
+            if value:
+                checks.append((key_type, rate_limit))
+                hits.append(WindowHit(self.key(operation, key_type, value), int(now // rate_limit.window),
+                                      rate_limit.window))
+        if not hits:
+            return None
+
+        try:
+            counts = await self.store.hit(hits)
+        except Exception as e:
+            self.logger.warning("Rate limit store failed, not limiting %s: %r", operation, e)
+            return None
+
+        exceeded = None
+        for (key_type, rate_limit), (previous, current) in zip(checks, counts):
+            window = rate_limit.window
+            elapsed = now % window
+            if previous * (1 - elapsed / window) + current <= rate_limit.limit:
+                continue
+            retry_after = math.ceil(self.retry_after(previous, current, rate_limit, elapsed))
+            if exceeded is None or retry_after > exceeded.retry_after:
+                exceeded = RateLimitExceeded(key_type, rate_limit, retry_after)
+        return exceeded
+
+    async def close(self):
+        """
+        Releases the store.
+        """
+        await self.store.close()
@@ -0,0 +1,158 @@
+import re
+from typing import Any, Dict, Iterable, NamedTuple, Pattern
+
+MASK = '***'
+
+# Keys whose values are always masked; matched case-insensitively and ignoring '_' and '-'
+# (so 'refresh_token', 'RefreshToken' and 'REFRESH_TOKEN' are the same key)
+SENSITIVE_KEYS = (
+    'password', 'previous_password', 'proposed_password', 'secret_hash', 'client_secret',
+    'access_token', 'refresh_token', 'id_token', 'token', 'session', 'confirmation_code',
+)
+
+
+class ValueRule(NamedTuple):
+    """
+    Pattern masked in string values. The pattern is only searched in strings containing `marker`,
+    a substring of every match, which rules out most strings far faster than the regex engine.
+    """
+    marker: str
+    pattern: Pattern
+
+
+# Values masked wherever they appear, including inside otherwise harmless strings
+SENSITIVE_VALUE_RULES = (
+    ValueRule('eyJ', re.compile(r'eyJ[\w-]{2,}\.eyJ[\w-]{2,}\.[\w-]*')),  # JWT (header and payload start with '{"')
+    ValueRule('@', re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')),  # email address
+    ValueRule('+', re.compile(r'\+\d[\d ()-]{6,18}\d')),  # phone number in international format
+)
+
+_KEY_CACHE_SIZE = 4096
+
+
+def normalize_key(key: str) -> str:
+    """
+    Returns the form in which keys are compared: case-folded, without '_' and '-'.
+    """
+    return key.casefold().replace('_', '').replace('-', '')
+
+
+class Redactor:
+    """
+    Masks sensitive data in nested structures of dicts, lists and tuples before they are logged.
+
+    Values under a sensitive key are replaced with the mask, whatever their type; strings anywhere
+    else have the parts matching a value pattern replaced. Containers without anything to mask are
+    returned as they are, so only the branches leading to a masked value are copied and the input
+    is never modified.
+    """
+
+    def __init__(self, keys: Iterable[str] = SENSITIVE_KEYS,
+                 rules: Iterable[ValueRule] = SENSITIVE_VALUE_RULES, mask: str = MASK):
+        """
+        Initializes the redactor.
+
+        Args:
+            keys (Iterable[str]): The keys whose values are masked.
+            rules (Iterable[ValueRule]): The patterns masked in string values.
+            mask (str): The replacement for masked data.
+        """
+        self.keys = frozenset(normalize_key(key) for key in keys)
+        self.rules = tuple(rules)
+        self.mask = mask
+        self._key_cache: Dict[str, bool] = {}
+
+    def is_sensitive_key(self, key: Any) -> bool:
+        """
+        Returns whether values under `key` are masked.
+        """
+        try:
+            return self._key_cache[key]
+        except (KeyError, TypeError):
+            pass
+        sensitive = isinstance(key, str) and normalize_key(key) in self.keys
+        if len(self._key_cache) < _KEY_CACHE_SIZE:
+            try:
+                self._key_cache[key] = sensitive
+            except TypeError:
+                pass
+        return sensitive
+
+    def redact(self, value: Any) -> Any:
+        """
+        Returns `value` with its sensitive data masked.
+
+        Args:
+            value (Any): The data to redact, typically a request or response payload.
+
+        Returns:
+            Any: The redacted data; `value` itself if it contains nothing to mask.
+        """
+        if isinstance(value, str):
+            for marker, pattern in self.rules:
+                if marker in value:
+                    value = pattern.sub(self.mask, value)
+            return value
+        if isinstance(value, dict):
+            return self._redact_dict(value)
+        if isinstance(value, (list, tuple)):
+            return self._redact_sequence(value)
+        return value
+
+    def _redact_dict(self, data: dict) -> dict:
+        redacted = None
+        for key, value in data.items():
+            new_value = self.mask if self.is_sensitive_key(key) else self.redact(value)
+            if new_value is not value and new_value != value:
+                if redacted is None:
+                    redacted = dict(data)
+                redacted[key] = new_value
+        return data if redacted is None else redacted
+
+    def _redact_sequence(self, items):
+        redacted = None
+        for index, item in enumerate(items):
+            new_item = self.redact(item)
+            if new_item is not item and new_item != item:
+                if redacted is None:
+                    redacted = list(items)
+                redacted[index] = new_item
+        if redacted is None:
+            return items
+        return redacted if isinstance(items, list) else type(items)(redacted)
+
+    def lazy(self, value: Any) -> 'Redacted':
+        """
+        Wraps `value` for logging, deferring the redaction until the record is formatted.
+
+        Args:
+            value (Any): The data to log.
+
+        Returns:
+            Redacted: An object rendering as the redacted data.
+        """
+        return Redacted(value, self)
+
+
+class Redacted:
+    """
+    Log argument rendering as the redacted form of its value.
+
+    Passed as a %-style logging argument, the redaction only runs if and when the record is emitted,
+    which may be on the logging writer thread. The value must not be modified after it was logged.
+    """
+
+    __slots__ = ('value', 'redactor')
+
+    def __init__(self, value: Any, redactor: Redactor):
+        self.value = value
+        self.redactor = redactor
+
+    def __str__(self) -> str:
+        return str(self.redactor.redact(self.value))
+
+    def __repr__(self) -> str:
+        return repr(self.redactor.redact(self.value))
+
+
+redactor = Redactor()
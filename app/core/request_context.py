@@ -0,0 +1,158 @@
+import asyncio
+import contextvars
+import re
+import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Optional
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Accepted incoming request ids; anything else (too long, or characters that could forge log lines
+# or headers) is replaced by a generated id
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+
+class RequestState:
+    """
+    State of the request being handled, shared by the middlewares and hooks of the request.
+
+    Attributes:
+        request_id (str): The request id.
+        operation (Optional[str]): The GraphQL operation, named after its top-level field, once known.
+    """
+
+    __slots__ = ("request_id", "operation")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.operation: Optional[str] = None
+
+
+_request: ContextVar[Optional[RequestState]] = ContextVar("request", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """
+    Returns the id of the request being handled, or None outside a request.
+    """
+    state = _request.get()
+    return None if state is None else state.request_id
+
+
+def get_operation_name() -> Optional[str]:
+    """
+    Returns the GraphQL operation of the request being handled, or None if there is none (yet).
+    """
+    state = _request.get()
+    return None if state is None else state.operation
+
+
+def set_operation_name(operation: Optional[str]):
+    """
+    Records the GraphQL operation of the request being handled.
+
+    The state object is shared with the enclosing middlewares, so they see the operation once the
+    GraphQL app has returned.
+    """
+    state = _request.get()
+    if state is not None:
+        state.operation = operation
+
+
+def new_request_id() -> str:
+    """
+    Returns a new random request id.
+    """
+    return uuid.uuid4().hex
+
+
+def accept_request_id(value: Optional[str]) -> str:
+    """
+    Returns the request id sent by the client if it is well-formed, and a new one otherwise.
+
+    Args:
+        value (Optional[str]): The value of the request id header, if any.
+
+    Returns:
+        str: The request id to use.
+    """
+    if value and _VALID_REQUEST_ID.fullmatch(value):
+        return value
+    return new_request_id()
+
+
+def set_request_id(request_id: Optional[str]) -> contextvars.Token:
+    """
+    Starts the state of a request with the given id in the current context (None ends it).
+
+    Returns:
+        contextvars.Token: Token restoring the previous state with `reset_request_id`.
+    """
+    return _request.set(None if request_id is None else RequestState(request_id))
+
+
+def reset_request_id(token: contextvars.Token):
+    """
+    Restores the request state that was current before `set_request_id`.
+    """
+    _request.reset(token)
+
+
+def create_background_task(coro: Coroutine) -> asyncio.Task:
+    """
+    Starts a task outside the current request.
+
+    Tasks copy the context they are created in, so a long-lived task started lazily while handling a
+    request would otherwise attribute everything it logs to that request for its whole lifetime.
+
+    Args:
+        coro (Coroutine): The coroutine to run.
+
+    Returns:
+        asyncio.Task: The task.
+    """
+    context = contextvars.copy_context()
+    context.run(_request.set, None)
+    return asyncio.get_running_loop().create_task(coro, context=context)
+
+
+def run_in_executor(executor: Optional[Executor], func: Callable[..., Any], *args: Any) -> asyncio.Future:
+    """
+    Runs `func(*args)` in an executor, in a copy of the current context if it runs in a thread.
+
+    `loop.run_in_executor` does not propagate context variables, so the request id would be lost in
+    the worker thread. Process pools cannot receive a context and run `func` as it is.
+
+    Args:
+        executor (Optional[Executor]): The executor; the loop's default thread pool if None.
+        func (Callable[..., Any]): The function to run.
+        *args (Any): Its arguments.
+
+    Returns:
+        asyncio.Future: The future of the result.
+    """
+    loop = asyncio.get_running_loop()
+    if executor is None or isinstance(executor, ThreadPoolExecutor):
+        return loop.run_in_executor(executor, contextvars.copy_context().run, func, *args)
+    return loop.run_in_executor(executor, func, *args)
+
+
+async def propagate_request_id(request: Any):
+    """
+    httpx request event hook adding the current request id to outbound requests.
+    """
+    request_id = get_request_id()
+    if request_id is not None:
+        request.headers[REQUEST_ID_HEADER] = request_id
+
+
+def propagate_aws_request_id(request: Any, **kwargs: Any):
+    """
+    botocore 'before-sign' event handler adding the current request id to outbound AWS requests.
+
+    Register it on a client with `client.meta.events.register('before-sign.*.*', propagate_aws_request_id)`.
+    """
+    request_id = get_request_id()
+    if request_id is not None:
+        request.headers[REQUEST_ID_HEADER] = request_id
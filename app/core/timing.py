@@ -0,0 +1,103 @@
+import time
+from contextvars import ContextVar, Token
+from typing import List, Optional, Tuple
+
+# Upper bound on the entries of one request, so that a request fanning out to many upstream calls
+# cannot produce an oversized header
+MAX_ENTRIES = 32
+
+
+class TimingCollector:
+    """
+    Collects the durations of the phases of one request, rendered as a Server-Timing header value.
+    """
+
+    __slots__ = ("started", "entries")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries: List[Tuple[str, float]] = []
+
+    def add(self, name: str, duration: float):
+        """
+        Records a phase.
+
+        Args:
+            name (str): The metric name, an HTTP token such as 'gql-parse' or 'cognito.InitiateAuth'.
+            duration (float): The duration in seconds.
+        """
+        if len(self.entries) < MAX_ENTRIES:
+            self.entries.append((name, duration))
+
+    def header_value(self) -> str:
+        """
+        Returns the Server-Timing header value: the recorded phases and the total time so far, in milliseconds.
+        """
+        metrics = [f"{name};dur={duration * 1000:.1f}" for name, duration in self.entries]
+        metrics.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_collector: ContextVar[Optional[TimingCollector]] = ContextVar("timing_collector", default=None)
+
+
+class _Timer:
+    __slots__ = ("collector", "name", "started")
+
+    def __init__(self, collector: TimingCollector, name: str):
+        self.collector = collector
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.collector.add(self.name, time.perf_counter() - self.started)
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timed(name: str):
+    """
+    Context manager recording the duration of its block as phase `name` of the current request.
+
+    Outside a request collecting timings (i.e. when Server-Timing is disabled) it returns a shared
+    no-op context manager, so instrumented code only pays for one context variable lookup.
+
+    Args:
+        name (str): The metric name.
+    """
+    collector = _collector.get()
+    if collector is None:
+        return _NO_TIMER
+    return _Timer(collector, name)
+
+
+def start_collecting() -> Tuple[TimingCollector, Token]:
+    """
+    Starts collecting the timings of the current request.
+
+    Returns:
+        Tuple[TimingCollector, Token]: The collector, and a token ending the collection with `stop_collecting`.
+    """
+    collector = TimingCollector()
+    return collector, _collector.set(collector)
+
+
+def stop_collecting(token: Token):
+    """
+    Stops collecting the timings started with `start_collecting`.
+    """
+    _collector.reset(token)
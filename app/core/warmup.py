@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.api.graphql.asgi import LazyGraphQL
+from app.core.config import settings
+from app.core.dependency_injector import DependencyInjector
+from app.services.aws.cognito.client import CognitoHttpClient
+from app.services.aws.cognito.identity_provider import CognitoIdentityProviderClient
+
+WARM_UP_QUERY = "query WarmUp { _empty }"
+
+
+def upstream_hosts() -> Dict[str, str]:
+    """
+    Returns the hosts of the upstream services configured in the settings, by service name.
+    """
+    cognito_endpoint = settings.aws_cognito_endpoint or CognitoIdentityProviderClient.default_endpoint(
+        settings.aws_region
+    )
+    return {
+        "cognito": urlsplit(cognito_endpoint).hostname,
+        "dynamodb": urlsplit(settings.dynamodb_endpoint).hostname,
+        "s3": f"{settings.s3_bucket_name}.s3.{settings.aws_region}.amazonaws.com",
+    }
+
+
+class WarmUp:
+    """
+    Prepares a fresh worker before it reports itself ready.
+
+    The steps create every singleton (which loads the JWKS), resolve the DNS names of all upstreams,
+    open keep-alive connections in the Cognito HTTP pool, build the model validators and the GraphQL
+    schema and run one trivial operation through the executor.
+
+    The worker cannot serve requests without its singletons, models and schema, so those steps are
+    required: the worker becomes ready only once they have all succeeded, and failed ones are retried
+    every RETRY_DELAY seconds. Resolving hosts and opening connections only spare the first requests
+    some latency, so those steps are best-effort: a failure is logged and skipped, and together they
+    may take at most `budget` seconds, so a slow or unavailable upstream delays readiness by at most
+    that long instead of keeping every worker out of rotation.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    RETRY_DELAY = 5.0
+
+    def __init__(self, injector: DependencyInjector, graphql_app: LazyGraphQL, budget: Optional[float] = None,
+                 connections: Optional[int] = None):
+        """
+        Initializes the warm-up.
+
+        Args:
+            injector (DependencyInjector): The injector whose singletons are created.
+            graphql_app (LazyGraphQL): The GraphQL endpoint, whose schema is built and run against.
+            budget (Optional[float]): Maximum seconds spent on the best-effort steps.
+            connections (Optional[int]): Number of connections to open in the Cognito HTTP pool.
+        """
+        self.injector = injector
+        self.graphql_app = graphql_app
+        self.budget = budget or settings.warm_up_budget
+        self.connections = settings.warm_up_cognito_connections if connections is None else connections
+        self.ready = False
+        self.duration: Optional[float] = None
+        self.steps: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _step_functions(self) -> List[Tuple[str, Callable[[], Awaitable[None]], bool]]:
+        # (name, step, required)
+        return [
+            ("dependencies", self.injector.warm_up, True),
+            ("dns", self.resolve_hosts, False),
+            ("cognito_connections", self.open_cognito_connections, False),
+            ("models", self.build_models, True),
+            ("graphql", self.execute_graphql, True),
+        ]
+
+    async def resolve_hosts(self):
+        """
+        Resolves the upstream host names so that the first requests do not wait for DNS.
+        """
+        loop = asyncio.get_running_loop()
+        hosts = [host for host in upstream_hosts().values() if host]
+        results = await asyncio.gather(*[loop.getaddrinfo(host, 443) for host in hosts], return_exceptions=True)
+        failed = [host for host, result in zip(hosts, results) if isinstance(result, Exception)]
+        if failed:
+            raise OSError(f"Could not resolve {', '.join(failed)}")
+
+    async def open_cognito_connections(self):
+        """
+        Opens keep-alive connections (TCP and TLS) to the Cognito endpoint in the shared pool.
+
+        Any HTTP response, including an error status, leaves a warm connection in the pool.
+        """
+        client = CognitoHttpClient.get() or await CognitoHttpClient.open()
+        endpoint = settings.aws_cognito_endpoint or CognitoIdentityProviderClient.default_endpoint(
+            settings.aws_region
+        )
+        await asyncio.gather(*[client.get(endpoint) for _ in range(self.connections)])
+
+    async def build_models(self):
+        """
+        Builds the request and response model validators, which are deferred at import time.
+        """
+        from app.api.models.auth_models import build_models
+        build_models()
+
+    async def execute_graphql(self):
+        """
+        Builds the GraphQL schema and runs a trivial operation through the executor to warm its code paths.
+        """
+        from ariadne import graphql
+        data = {"query": WARM_UP_QUERY, "operationName": "WarmUp"}
+        success, result = await graphql(self.graphql_app.schema, data)
+        if not success or result.get("errors"):
+            raise RuntimeError(f"Warm-up operation failed: {result.get('errors')}")
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[None]]):
+        self.steps[name] = "running"
+        started = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            self.steps[name] = "failed"
+            self.logger.warning(f"Warm-up step '{name}' failed: {e}")
+        else:
+            self.steps[name] = "done"
+            self.logger.info(f"Warm-up step '{name}' finished in {time.perf_counter() - started:.3f}s")
+
+    async def run(self):
+        """
+        Runs the warm-up steps, the best-effort ones within the time budget, and marks the worker ready
+        once every required step has succeeded.
+        """
+        started = time.perf_counter()
+        deadline = started + self.budget
+        required = []
+        for name, step, is_required in self._step_functions():
+            if is_required:
+                required.append((name, step))
+                await self._run_step(name, step)
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self.steps[name] = "skipped"
+                continue
+            try:
+                await asyncio.wait_for(self._run_step(name, step), timeout=remaining)
+            except asyncio.TimeoutError:
+                self.steps[name] = "timed_out"
+                self.logger.warning(f"Warm-up step '{name}' did not finish within the {self.budget}s budget")
+
+        failed = [(name, step) for name, step in required if self.steps[name] != "done"]
+        while failed:
+            self.logger.error(
+                f"Worker not ready: required warm-up steps {[name for name, _ in failed]} failed; "
+                f"retrying in {self.RETRY_DELAY}s"
+            )
+            await asyncio.sleep(self.RETRY_DELAY)
+            for name, step in failed:
+                await self._run_step(name, step)
+            failed = [(name, step) for name, step in failed if self.steps[name] != "done"]
+
+        self.duration = time.perf_counter() - started
+        self.ready = True
+        self.logger.info(f"Worker ready after {self.duration:.3f}s of warm-up")
+
+    def start(self):
+        """
+        Starts the warm-up in the background, so that the server can answer readiness probes meanwhile.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        Cancels the warm-up if it is still running.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
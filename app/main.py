@@ -1,20 +1,83 @@
 import logging
-from fastapi import FastAPI
-from ariadne.asgi import GraphQL
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.exception_handlers import http_exception_handler, request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException
+from app.core import metrics
+from app.core.concurrency_limit import AdaptiveConcurrencyLimiter
 from app.core.config import settings
-from app.core.logging import configure_logging
-from app.api.graphql.schema.mutations import schema
+from app.core.logging import configure_logging, shutdown_logging
+from app.core.log_sampling import LogSamplingMiddleware, SamplingHandler
+from app.core.middlewares import (
+    AdaptiveConcurrencyMiddleware, DependencyScopeMiddleware, MetricsMiddleware, RequestIdMiddleware,
+    ServerTimingMiddleware
+)
+from app.core.warmup import WarmUp
+from app.api.graphql.asgi import LazyGraphQL
+from app.api.graphql.hooks import error_formatter, operation_root_value
+from app.api.dependencies.auth import injector
+from app.services.aws.cognito.client import CognitoHttpClient
+from app.services.utils.instrumented_transport import InstrumentedTransport
 
 
 # Configure logging with the level specified in settings
 logging_level = getattr(logging, settings.logging_level.upper(), logging.INFO)
-configure_logging(level=logging_level)
+sampling_handler = SamplingHandler(recorder=metrics.default_recorder())
+configure_logging(
+    level=logging_level, log_format=settings.log_format, queue_size=settings.log_queue_size,
+    sampling_handler=sampling_handler if sampling_handler.active else None, recorder=metrics.default_recorder()
+)
+logging.getLogger(__name__).info(
+    f"Running in {settings.environment} environment with logging level {settings.logging_level}"
+)
 
-app = FastAPI()
+graphql_app = LazyGraphQL(
+    server_timing=settings.server_timing_enabled,
+    root_value=operation_root_value,
+    error_formatter=error_formatter,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens process-wide resources on startup, warms the worker up in the background and releases
+    the resources on shutdown.
+    """
+    await CognitoHttpClient.open()
+    app.state.warm_up = WarmUp(injector, graphql_app)
+    app.state.warm_up.start()
+    try:
+        yield
+    finally:
+        await app.state.warm_up.stop()
+        await injector.dispose()
+        await CognitoHttpClient.close()
+        metrics.mark_process_dead()
+        shutdown_logging()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(DependencyScopeMiddleware, injector=injector)
+if sampling_handler.active:
+    app.add_middleware(LogSamplingMiddleware)
+if settings.concurrency_limit_enabled:
+    app.add_middleware(
+        AdaptiveConcurrencyMiddleware, limiter=AdaptiveConcurrencyLimiter(),
+        recorder=metrics.default_recorder(),
+    )
+if settings.server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, recorder=metrics.recorder)
+# Added last so that it is the outermost middleware and the request id is set for everything else
+app.add_middleware(RequestIdMiddleware)
 
 
 # GraphQL endpoint
-app.add_route("/graphql", GraphQL(schema))
+app.add_route("/graphql", graphql_app)
 
 
 @app.get("/")
@@ -27,3 +90,52 @@ async def read_root():
     else:
         logging.info(f"API root endpoint accessed in {settings.environment} mode.")
     return {"message": "Welcome to the FastAPI application!"}
+
+
+@app.get("/ready")
+async def read_ready():
+    """
+    Readiness endpoint; reports not ready (503) until the required steps of the startup warm-up have
+    succeeded, and again once shutdown has started releasing the singletons.
+    """
+    warm_up = getattr(app.state, "warm_up", None)
+    if warm_up is not None and warm_up.ready and not injector.ready:
+        return JSONResponse(status_code=503, content={"status": "shutting_down"})
+    if warm_up is None or not warm_up.ready:
+        steps = warm_up.steps if warm_up is not None else {}
+        return JSONResponse(status_code=503, content={"status": "warming_up", "steps": steps})
+    return {"status": "ready", "steps": warm_up.steps, "warm_up_seconds": round(warm_up.duration, 3)}
+
+
+if settings.metrics_enabled:
+    @app.exception_handler(HTTPException)
+    async def count_http_exception(request: Request, exc: HTTPException):
+        """
+        Counts the error by its code, then responds as FastAPI does by default.
+        """
+        metrics.recorder.observe_error(metrics.error_code(exc))
+        return await http_exception_handler(request, exc)
+
+    @app.exception_handler(RequestValidationError)
+    async def count_validation_error(request: Request, exc: RequestValidationError):
+        """
+        Counts the error as an invalid request, then responds as FastAPI does by default.
+        """
+        metrics.recorder.observe_error(metrics.error_code(exc))
+        return await request_validation_exception_handler(request, exc)
+
+    @app.get("/metrics")
+    def read_metrics():
+        """
+        Prometheus metrics endpoint; in multiprocess mode the metrics of all workers are aggregated.
+        """
+        return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+if settings.debug:
+    @app.get("/debug/http-pools")
+    async def read_http_pools():
+        """
+        Debug endpoint describing the live upstream HTTP connection pools (limits, connections, queued requests).
+        """
+        return InstrumentedTransport.pool_states()
@@ -0,0 +1,235 @@
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Awaitable, Dict, List, Optional, TypeVar, Deque, Tuple
+
+T = TypeVar('T')
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a call is rejected because the circuit breaker is open.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit breaker '{name}' is open")
+        self.name = name
+
+
+StateListener = Callable[['CircuitBreaker', CircuitState, CircuitState], None]
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker for calls to an upstream service.
+
+    Outcomes of the last `window_size` calls are kept in a count-based sliding window. Once at least
+    `minimum_calls` outcomes are recorded, the breaker opens when the failure rate or the rate of
+    calls slower than `slow_call_duration` reaches its threshold. While open, calls fail fast with
+    CircuitOpenError. After `open_duration` seconds the breaker lets `half_open_max_calls` trial calls
+    through; it closes if they all succeed and opens again otherwise.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, name: str, is_failure: Callable[[BaseException], bool] = None, window_size: int = 50,
+                 minimum_calls: int = 20, failure_rate_threshold: float = 0.5, slow_call_duration: float = 3.0,
+                 slow_call_rate_threshold: float = 0.5, open_duration: float = 15.0, half_open_max_calls: int = 3):
+        """
+        Initializes the circuit breaker.
+
+        Args:
+            name (str): Name of the breaker, used in logs and errors.
+            is_failure (Callable[[BaseException], bool]): Decides whether an error counts as a failure;
+                errors that do not count (e.g. invalid credentials) are recorded as successful calls.
+            window_size (int): Number of recent calls kept in the sliding window.
+            minimum_calls (int): Minimum number of recorded calls before the breaker can open.
+            failure_rate_threshold (float): Failure rate (0-1) at which the breaker opens.
+            slow_call_duration (float): Duration in seconds above which a call is slow.
+            slow_call_rate_threshold (float): Slow call rate (0-1) at which the breaker opens.
+            open_duration (float): Seconds to stay open before allowing trial calls.
+            half_open_max_calls (int): Number of trial calls allowed while half-open.
+        """
+        self.name = name
+        self.is_failure = is_failure or (lambda error: True)
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self.listeners: List[StateListener] = []
+        self.state = CircuitState.CLOSED
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._failures = 0
+        self._slow_calls = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._half_open_successes = 0
+        self._half_open_period = 0
+
+    @property
+    def failure_rate(self) -> float:
+        return self._failures / len(self._window) if self._window else 0.0
+
+    @property
+    def slow_call_rate(self) -> float:
+        return self._slow_calls / len(self._window) if self._window else 0.0
+
+    def _transition(self, state: CircuitState):
+        previous, self.state = self.state, state
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CircuitState.HALF_OPEN:
+            self._half_open_calls = 0
+            self._half_open_successes = 0
+            self._half_open_period += 1
+        elif state == CircuitState.CLOSED:
+            self._window.clear()
+            self._failures = 0
+            self._slow_calls = 0
+        for listener in self.listeners:
+            listener(self, previous, state)
+
+    def _acquire(self) -> Optional[int]:
+        """
+        Admits a call, returning the half-open period it is a trial call of, or None if the breaker is closed.
+        """
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.open_duration:
+                raise CircuitOpenError(self.name)
+            self._transition(CircuitState.HALF_OPEN)
+        if self.state == CircuitState.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                raise CircuitOpenError(self.name)
+            self._half_open_calls += 1
+            return self._half_open_period
+        return None
+
+    def _release(self, period: Optional[int]):
+        """
+        Gives back the trial call slot of a call that ended without an outcome (e.g. it was cancelled),
+        unless the half-open period it was taken in is over.
+        """
+        if period is not None and self.state == CircuitState.HALF_OPEN and period == self._half_open_period:
+            self._half_open_calls -= 1
+
+    def _record(self, failed: bool, duration: float):
+        slow = duration >= self.slow_call_duration
+        if self.state == CircuitState.HALF_OPEN:
+            if failed or slow:
+                self._transition(CircuitState.OPEN)
+                return
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.half_open_max_calls:
+                self._transition(CircuitState.CLOSED)
+            return
+        if self.state != CircuitState.CLOSED:
+            return
+
+        if len(self._window) == self._window.maxlen:
+            evicted_failed, evicted_slow = self._window[0]
+            self._failures -= evicted_failed
+            self._slow_calls -= evicted_slow
+        self._window.append((failed, slow))
+        self._failures += failed
+        self._slow_calls += slow
+
+        if len(self._window) >= self.minimum_calls and (
+                self.failure_rate >= self.failure_rate_threshold
+                or self.slow_call_rate >= self.slow_call_rate_threshold
+        ):
+            self._transition(CircuitState.OPEN)
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Calls `func` through the breaker.
+
+        Args:
+            func (Callable[[], Awaitable[T]]): Zero-argument coroutine function to call.
+
+        Returns:
+            T: The result of `func`.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+        """
+        period = self._acquire()
+        started = time.monotonic()
+        try:
+            result = await func()
+        except Exception as e:
+            self._record(self.is_failure(e), time.monotonic() - started)
+            raise
+        except BaseException:
+            # A cancelled call says nothing about the upstream; it must not hold a trial slot forever
+            self._release(period)
+            raise
+        self._record(False, time.monotonic() - started)
+        return result
+
+
+class CircuitBreakerRegistry:
+    """
+    Holds one circuit breaker per operation family of an upstream service.
+
+    Breakers are created on first use with the settings given to the registry, and every breaker
+    notifies the registry's listeners of state transitions. Transitions are logged by default.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, upstream: str, **breaker_settings):
+        """
+        Initializes the registry.
+
+        Args:
+            upstream (str): Name of the upstream service, e.g. 'cognito'.
+            **breaker_settings: Keyword arguments passed to every CircuitBreaker.
+        """
+        self.upstream = upstream
+        self.breaker_settings = breaker_settings
+        self.listeners: List[StateListener] = [self._log_transition]
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, family: str) -> CircuitBreaker:
+        """
+        Returns the breaker for an operation family, creating it if needed.
+
+        Args:
+            family (str): The operation family, e.g. 'auth'.
+
+        Returns:
+            CircuitBreaker: The breaker for the family.
+        """
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            breaker = CircuitBreaker(name=f"{self.upstream}.{family}", **self.breaker_settings)
+            breaker.listeners = self.listeners
+            self._breakers[family] = breaker
+        return breaker
+
+    def add_listener(self, listener: StateListener):
+        """
+        Registers a callback invoked as listener(breaker, previous_state, new_state) on transitions.
+        """
+        self.listeners.append(listener)
+
+    def states(self) -> Dict[str, CircuitState]:
+        """
+        Returns the current state of every breaker, keyed by breaker name.
+        """
+        return {breaker.name: breaker.state for breaker in self._breakers.values()}
+
+    def _log_transition(self, breaker: CircuitBreaker, previous: CircuitState, state: CircuitState):
+        self.logger.warning(
+            "Circuit breaker %s: %s -> %s (failure rate %.2f, slow call rate %.2f)",
+            breaker.name, previous.value, state.value, breaker.failure_rate, breaker.slow_call_rate
+        )
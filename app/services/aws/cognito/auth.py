@@ -1,17 +1,41 @@
+import hashlib
 import logging
 import httpx
 from abc import ABC, abstractmethod
-from functools import wraps
-from typing import Optional, Callable, Type, Any
+from enum import Enum
+from functools import lru_cache, wraps
+from typing import Optional, Callable, Type, Any, Dict, Tuple
 from dataclasses import dataclass, field
+from app.core.config import settings
+from app.core.error_codes import ServiceUnavailableSupportCodes
+from app.core.exceptions import (
+    AppException, AuthenticationFailedException, EmailNotConfirmedException, UserNotFoundException,
+    InvalidRequestException, CodeMismatchException, UserAlreadyExistsException,
+    ServiceUnavailableException, UnauthorizedException
+)
+from app.core.metrics import default_recorder
+from app.core.redaction import redactor
+from app.core.request_context import propagate_request_id
+from app.core.timing import timed
 from app.api.models.auth_models import (
     LoginRequest, LoginResponse, SignUpRequest, SignUpResponse,
     ConfirmSignUpRequest, ConfirmSignUpResponse, ResendConfirmationCodeRequest,
     ResendConfirmationCodeResponse, TokenRefreshRequest, TokenRefreshResponse,
     ChangePasswordRequest, ChangePasswordResponse, ForgotPasswordRequest,
     ForgotPasswordResponse, ConfirmForgotPasswordRequest, ConfirmForgotPasswordResponse,
-    UpdateUserAttributesRequest, UpdateUserAttributesResponse
+    UpdateUserAttributesRequest, UpdateUserAttributesResponse, GlobalSignOutResponse,
+    RevokeTokenRequest, RevokeTokenResponse
+)
+from app.services.aws.cognito.client import CognitoHttpClient
+from app.services.aws.cognito.identity_provider import (
+    CognitoIdentityProviderClient, CognitoIdentityProviderError, is_retryable_error, is_upstream_failure,
+    retry_classifier
 )
+from app.services.aws.retry import RetryPolicy, RetryBudget
+from app.services.aws.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from app.services.aws.cognito.rate_limiter import CognitoRateLimiter, QuotaCategory
+from app.services.aws.cognito.token_management import TokenVerifier, RevocationScope
+from app.services.utils.singleflight import SingleFlight
 
 
 class CognitoServiceInterface(ABC):
@@ -133,25 +157,194 @@ class CognitoServiceInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    async def global_sign_out(self) -> GlobalSignOutResponse:
+        """
+        Asynchronously signs the user out from all devices.
+
+        Returns:
+            GlobalSignOutResponse: The response confirming the sign-out.
+        """
+        pass
+
+    @abstractmethod
+    async def revoke_token(self, request: RevokeTokenRequest) -> RevokeTokenResponse:
+        """
+        Asynchronously revokes a refresh token and the tokens issued with it.
+
+        Args:
+            request (RevokeTokenRequest): The request object with the refresh token to revoke.
+
+        Returns:
+            RevokeTokenResponse: The response confirming the revocation.
+        """
+        pass
+
+
+class OperationFamily(str, Enum):
+    """
+    Groups Cognito operations that share a circuit breaker.
+    """
+    AUTH = "auth"
+    USER_MANAGEMENT = "user_management"
+    TOKEN_REFRESH = "token_refresh"
+
+
+COGNITO_ERROR_MAP: Dict[str, Tuple[Type[AppException], Optional[str]]] = {
+    "NotAuthorizedException": (AuthenticationFailedException, None),
+    "UserNotConfirmedException": (EmailNotConfirmedException, None),
+    "UserNotFoundException": (UserNotFoundException, None),
+    "CodeMismatchException": (CodeMismatchException, None),
+    "ExpiredCodeException": (CodeMismatchException, None),
+    "InvalidPasswordException": (InvalidRequestException, None),
+    "UsernameExistsException": (UserAlreadyExistsException, None),
+    "AliasExistsException": (UserAlreadyExistsException, None),
+    "TooManyRequestsException": (
+        ServiceUnavailableException, ServiceUnavailableSupportCodes.COGNITO_REQUEST_LIMIT_EXCEEDED
+    ),
+    "LimitExceededException": (ServiceUnavailableException, ServiceUnavailableSupportCodes.COGNITO_LIMIT_EXCEEDED),
+    "InvalidParameterException": (
+        ServiceUnavailableException, ServiceUnavailableSupportCodes.COGNITO_INVALID_PARAMETER
+    ),
+    "InternalErrorException": (ServiceUnavailableException, ServiceUnavailableSupportCodes.COGNITO_INTERNAL_ERROR),
+}
+"""
+Maps Cognito Identity Provider exception names to application exceptions and optional support codes.
+"""
+
+
+@lru_cache(maxsize=1)
+def get_retry_policy() -> RetryPolicy:
+    """
+    Returns the process-wide retry policy of Cognito calls, so that the retry budget is enforced per process.
+    """
+    return RetryPolicy(
+        name="cognito",
+        is_retryable=is_retryable_error,
+        max_attempts=settings.cognito_retry_max_attempts,
+        base_delay=settings.cognito_retry_base_delay,
+        max_delay=settings.cognito_retry_max_delay,
+        budget=RetryBudget(
+            ratio=settings.cognito_retry_budget_ratio,
+            min_retries_per_second=settings.cognito_retry_budget_min_per_second,
+        ),
+        recorder=default_recorder(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """
+    Returns the process-wide circuit breakers of Cognito calls, one per operation family.
+    """
+    registry = CircuitBreakerRegistry(
+        "cognito",
+        is_failure=is_upstream_failure,
+        window_size=settings.cognito_breaker_window_size,
+        minimum_calls=settings.cognito_breaker_minimum_calls,
+        failure_rate_threshold=settings.cognito_breaker_failure_rate_threshold,
+        slow_call_duration=settings.cognito_breaker_slow_call_duration,
+        slow_call_rate_threshold=settings.cognito_breaker_slow_call_rate_threshold,
+        open_duration=settings.cognito_breaker_open_duration,
+        half_open_max_calls=settings.cognito_breaker_half_open_max_calls,
+    )
+    recorder = default_recorder()
+    if recorder is not None:
+        registry.add_listener(recorder.observe_breaker_transition)
+    return registry
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> CognitoRateLimiter:
+    """
+    Returns the process-wide token buckets per Cognito quota category.
+    """
+    return CognitoRateLimiter(
+        rates={
+            QuotaCategory.USER_AUTHENTICATION: settings.cognito_quota_user_authentication_rps,
+            QuotaCategory.USER_CREATION: settings.cognito_quota_user_creation_rps,
+            QuotaCategory.USER_ACCOUNT_RECOVERY: settings.cognito_quota_user_account_recovery_rps,
+            QuotaCategory.USER_UPDATE: settings.cognito_quota_user_update_rps,
+        },
+        max_wait=settings.cognito_quota_max_wait,
+        recorder=default_recorder(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_refresh_flights() -> SingleFlight:
+    """
+    Returns the process-wide coalescer of concurrent refreshes of the same refresh token.
+    """
+    return SingleFlight(linger=settings.refresh_token_coalesce_window, name="refresh", recorder=default_recorder())
+
 
 @dataclass
 class CognitoService(CognitoServiceInterface):
     """
     Implements CognitoServiceInterface to interact with AWS Cognito asynchronously.
     Provides methods for authentication, user management, and attribute updates.
+
+    Requests are sent directly to the Cognito Identity Provider API using its JSON 1.1 protocol.
+    Each method builds the request body for its operation; the decorators add client and token
+    authorization, invoke the operation and convert the result into the response model.
+
+    Instances are cheap and per-request; they borrow the process-wide pooled HTTP client from
+    CognitoHttpClient and only own (and close) a client when none has been opened, e.g. outside
+    the application lifespan.
     """
 
     client: Optional[httpx.AsyncClient] = field(default=None)
     base_url: Optional[str] = field(default=None)
-    basic_credentials: Optional[str] = field(default=None)
+    client_id: Optional[str] = field(default=None)
+    client_secret: Optional[str] = field(default=None)
     access_token: Optional[str] = field(default=None)
     timeout: float = field(default=10.0)
+    identity_provider: Optional[CognitoIdentityProviderClient] = field(default=None, repr=False)
+    token_verifier: Optional[TokenVerifier] = field(default=None, repr=False)
+    _owns_client: bool = field(default=False, init=False, repr=False)
 
     logger = logging.getLogger(__name__)
 
+    # Shared by all instances so that budgets, breakers, quotas and coalescing apply per process; built
+    # from the settings on first use rather than when the module is imported
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        return get_retry_policy()
+
+    @property
+    def circuit_breakers(self) -> CircuitBreakerRegistry:
+        return get_circuit_breakers()
+
+    @property
+    def rate_limiter(self) -> CognitoRateLimiter:
+        return get_rate_limiter()
+
+    @property
+    def refresh_flights(self) -> SingleFlight:
+        return get_refresh_flights()
+
     def __post_init__(self):
         if self.client is None:
-            self.client = httpx.AsyncClient(timeout=httpx.Timeout(self.timeout))
+            self.client = CognitoHttpClient.get()
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout), event_hooks={"request": [propagate_request_id]}
+            )
+            self._owns_client = True
+        if self.base_url is None:
+            self.base_url = (
+                settings.aws_cognito_endpoint
+                or CognitoIdentityProviderClient.default_endpoint(settings.aws_region)
+            )
+        if self.client_id is None:
+            self.client_id = settings.aws_cognito_client_id
+        if self.client_secret is None:
+            self.client_secret = settings.aws_cognito_client_secret
+        if self.identity_provider is None:
+            self.identity_provider = CognitoIdentityProviderClient(
+                self.client, self.base_url, self.client_id, self.client_secret
+            )
 
     def set_access_token(self, access_token: str):
         """
@@ -162,10 +355,19 @@ class CognitoService(CognitoServiceInterface):
         """
         self.access_token = access_token
 
+    def set_token_verifier(self, token_verifier: TokenVerifier):
+        """
+        Sets the verifier whose denylist records the tokens revoked through this service.
+
+        Args:
+            token_verifier (TokenVerifier): The application's token verifier.
+        """
+        self.token_verifier = token_verifier
+
     @staticmethod
     def log_sensitive_data_remover(data: dict) -> dict:
         """
-        Masks sensitive information in the data dictionary.
+        Masks sensitive information in the data dictionary, including nested dictionaries and lists.
 
         Args:
             data (dict): The dictionary containing sensitive information.
@@ -173,157 +375,278 @@ class CognitoService(CognitoServiceInterface):
         Returns:
             dict: The dictionary with sensitive information masked.
         """
-        sensitive_keys = ['password', 'access_token', 'refresh_token', 'id_token']
-        return {key: '***' if key in sensitive_keys else value for key, value in data.items()}
+        return redactor.redact(data)
 
     @staticmethod
     def bearer_auth(func: Callable) -> Callable:
         """
-        Decorator for adding Bearer Authorization headers.
+        Decorator for adding the user's access token to the request body.
 
         Args:
-            func (Callable): The function to be decorated.
+            func (Callable): The function building the request body.
 
         Returns:
-            Callable: The decorated function with Bearer Authorization headers.
+            Callable: The decorated function returning the body with an 'AccessToken'.
         """
         @wraps(func)
         async def wrapper(cls: 'CognitoService', *args, **kwargs) -> Any:
-            headers = {
-                "Authorization": f"Bearer {cls.access_token}",
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            kwargs['headers'] = headers
-            return await func(cls, *args, **kwargs)
+            if not cls.access_token:
+                raise UnauthorizedException()
+            payload = await func(cls, *args, **kwargs)
+            payload["AccessToken"] = cls.access_token
+            return payload
         return wrapper
 
     @staticmethod
-    def basic_auth(func: Callable) -> Callable:
+    def client_auth(func: Callable) -> Callable:
         """
-        Decorator for adding Basic Authorization headers.
+        Decorator for adding the app client ID and, if the client has a secret, the SECRET_HASH.
+
+        The SECRET_HASH is placed in 'AuthParameters' for InitiateAuth and in 'SecretHash' for other
+        operations, and is computed for the username found in the request body.
 
         Args:
-            func (Callable): The function to be decorated.
+            func (Callable): The function building the request body.
 
         Returns:
-            Callable: The decorated function with Basic Authorization headers.
+            Callable: The decorated function returning the body with client authorization.
         """
         @wraps(func)
         async def wrapper(cls: 'CognitoService', *args, **kwargs) -> Any:
-            headers = {
-                "Authorization": f"Basic {cls.basic_credentials}",
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            kwargs['headers'] = headers
-            return await func(cls, *args, **kwargs)
+            payload = await func(cls, *args, **kwargs)
+            payload["ClientId"] = cls.client_id
+            auth_parameters = payload.get("AuthParameters")
+            if auth_parameters is not None:
+                username = auth_parameters.get("USERNAME")
+            else:
+                username = payload.get("Username")
+            secret_hash = cls.identity_provider.secret_hash(username) if username else None
+            if secret_hash is not None:
+                if auth_parameters is not None:
+                    auth_parameters["SECRET_HASH"] = secret_hash
+                else:
+                    payload["SecretHash"] = secret_hash
+            return payload
         return wrapper
 
     @staticmethod
-    def call_api(path: str, response_model: Type[Any]) -> Callable:
+    def coalesce_refresh(func: Callable) -> Callable:
         """
-        Decorator for making API calls and processing responses.
+        Decorator sharing one token refresh between concurrent calls with the same refresh token.
+
+        Calls are keyed by a SHA-256 digest of the refresh token (and username, if given), so raw
+        tokens are never kept as keys.
 
         Args:
-            path (str): The API endpoint path.
+            func (Callable): The token refresh function to be decorated.
+
+        Returns:
+            Callable: The decorated function.
+        """
+        @wraps(func)
+        async def wrapper(cls: 'CognitoService', request: TokenRefreshRequest, *args, **kwargs) -> Any:
+            key = hashlib.sha256(f"{request.username or ''}:{request.refresh_token}".encode("utf-8")).hexdigest()
+            return await cls.refresh_flights.do(key, lambda: func(cls, request, *args, **kwargs))
+        return wrapper
+
+    @staticmethod
+    def revoke_on_success(scope: RevocationScope) -> Callable:
+        """
+        Decorator revoking the caller's access token locally once the Cognito call has succeeded.
+
+        Cognito stops accepting revoked tokens itself, but tokens are verified locally, so without
+        this they would still be accepted here until they expire.
+
+        Args:
+            scope (RevocationScope): Whether to revoke the token, its session or all of the user's tokens.
+
+        Returns:
+            Callable: The decorator.
+        """
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            async def wrapper(cls: 'CognitoService', *args, **kwargs) -> Any:
+                response = await func(cls, *args, **kwargs)
+                if cls.token_verifier is not None and cls.access_token:
+                    try:
+                        await cls.token_verifier.revoke(cls.access_token, scope)
+                    except Exception as e:
+                        cls.logger.error(f"Could not revoke the access token locally: {e}")
+                return response
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def call_api(operation: str, response_model: Type[Any], family: OperationFamily = OperationFamily.AUTH) -> Callable:
+        """
+        Decorator for invoking a Cognito operation and processing the response.
+
+        The call first waits for a token of the operation's quota category, then goes through the
+        circuit breaker of the operation family; failed attempts are retried by the shared retry
+        policy while the breaker is closed.
+
+        Args:
+            operation (str): The Cognito Identity Provider operation name, e.g. 'InitiateAuth'.
             response_model (Type[Any]): The model to parse the response into.
+            family (OperationFamily): The operation family whose circuit breaker guards the call.
 
         Returns:
             Callable: The decorated function for API calls.
         """
+        timing_name = f"cognito.{operation}"
+        is_retryable = retry_classifier(operation)
+
         def decorator(func: Callable) -> Callable:
             @wraps(func)
             async def wrapper(cls: 'CognitoService', *args, **kwargs) -> Any:
-                url = f"{cls.base_url}/{path}"
-                payload = args[0].dict()
+                payload = await func(cls, *args, **kwargs)
+                await cls.rate_limiter.acquire(operation)
 
                 try:
-                    safe_payload = cls.log_sensitive_data_remover(payload)
-                    cls.logger.info(f"Request to {url} with payload: {safe_payload}")
-
-                    response = await cls.client.post(url, json=payload, headers=kwargs.get('headers'))
-
-                    return await cls._process_response(response, response_model)
-                except Exception as e:
-                    cls.logger.error(f"API call to {url} failed: {str(e)}")
-                    raise e
-                finally:
-                    await cls.client.aclose()
+                    if cls.logger.isEnabledFor(logging.INFO):
+                        cls.logger.info(
+                            "Request to Cognito %s with payload: %s",
+                            operation, redactor.lazy(payload)
+                        )
+
+                    with timed(timing_name):
+                        response_json = await cls.circuit_breakers.get(family.value).call(
+                            lambda: cls.retry_policy.run(
+                                lambda: cls.identity_provider.invoke(operation, payload), is_retryable
+                            )
+                        )
+
+                    if cls.logger.isEnabledFor(logging.INFO):
+                        cls.logger.info("Response: %s", redactor.lazy(response_json))
+                except CircuitOpenError as e:
+                    cls.logger.error("Cognito %s rejected: %s", operation, e)
+                    raise ServiceUnavailableException(
+                        support_code=ServiceUnavailableSupportCodes.COGNITO_CIRCUIT_OPEN
+                    ) from e
+                except CognitoIdentityProviderError as e:
+                    cls.logger.error("Cognito %s failed: %s", operation, e)
+                    raise cls._to_app_exception(e) from e
+                except httpx.HTTPError as e:
+                    cls.logger.error("Cognito %s failed: %s", operation, e)
+                    raise ServiceUnavailableException() from e
+
+                return response_model.from_cognito(response_json)
             return wrapper
         return decorator
 
-    async def close(self):
-        """
-        Closes the HTTP client and releases resources.
-        """
-        if self.client is not None:
-            await self.client.aclose()
-
-    async def _process_response(self, response: httpx.Response, response_model: Type[Any]) -> Any:
+    @staticmethod
+    def _to_app_exception(error: CognitoIdentityProviderError) -> AppException:
         """
-        Processes the API response, handling errors and converting to the response model.
+        Converts a Cognito error into the corresponding application exception.
 
         Args:
-            response (httpx.Response): The HTTP response object.
-            response_model (Type[Any]): The model to parse the response into.
+            error (CognitoIdentityProviderError): The Cognito error.
 
         Returns:
-            Any: The parsed response model instance.
+            AppException: The application exception to raise.
         """
-        try:
-            response_json = await response.json()
-        except ValueError as e:
-            self.logger.error(f"JSON decode error: {str(e)}")
-            self.logger.error(f"Response content: {response.text}")
-            response.raise_for_status()
-            raise e
+        if error.error_type in COGNITO_ERROR_MAP:
+            exception_class, support_code = COGNITO_ERROR_MAP[error.error_type]
+            return exception_class(support_code=support_code)
+        if error.status_code >= 500:
+            return ServiceUnavailableException(support_code=ServiceUnavailableSupportCodes.COGNITO_INTERNAL_ERROR)
+        return InvalidRequestException()
 
-        safe_response_data = CognitoService.log_sensitive_data_remover(response_json)
-        self.logger.info(f"Response: {safe_response_data}")
-
-        response.raise_for_status()
-        return response_model(**response_json)
+    async def close(self):
+        """
+        Closes the HTTP client and releases resources, unless it is the shared pooled client.
+        """
+        if self.client is not None and self._owns_client:
+            await self.client.aclose()
 
-    @basic_auth
-    @call_api(path="login", response_model=LoginResponse)
+    @call_api(operation="InitiateAuth", response_model=LoginResponse)
+    @client_auth
     async def login(self, request: LoginRequest) -> LoginResponse:
-        pass
+        return {
+            "AuthFlow": "USER_PASSWORD_AUTH",
+            "AuthParameters": {"USERNAME": request.username, "PASSWORD": request.password},
+        }
 
-    @basic_auth
-    @call_api(path="signUp", response_model=SignUpResponse)
+    @call_api(operation="SignUp", response_model=SignUpResponse)
+    @client_auth
     async def sign_up(self, request: SignUpRequest) -> SignUpResponse:
-        pass
-
-    @basic_auth
-    @call_api(path="confirmSignUp", response_model=ConfirmSignUpResponse)
+        attributes = {
+            "email": request.email,
+            "phone_number": request.phone_number,
+            "given_name": request.given_name,
+            "family_name": request.family_name,
+        }
+        return {
+            "Username": request.username,
+            "Password": request.password,
+            "UserAttributes": [
+                {"Name": name, "Value": value} for name, value in attributes.items() if value is not None
+            ],
+        }
+
+    @call_api(operation="ConfirmSignUp", response_model=ConfirmSignUpResponse)
+    @client_auth
     async def confirm_sign_up(self, request: ConfirmSignUpRequest) -> ConfirmSignUpResponse:
-        pass
+        return {"Username": request.username, "ConfirmationCode": request.confirmation_code}
 
-    @basic_auth
-    @call_api(path="resendConfirmationCode", response_model=ResendConfirmationCodeResponse)
+    @call_api(operation="ResendConfirmationCode", response_model=ResendConfirmationCodeResponse)
+    @client_auth
     async def resend_confirmation_code(self, request: ResendConfirmationCodeRequest) -> ResendConfirmationCodeResponse:
-        pass
+        return {"Username": request.username}
 
-    @basic_auth
-    @call_api(path="refreshToken", response_model=TokenRefreshResponse)
+    @coalesce_refresh
+    @call_api(operation="InitiateAuth", response_model=TokenRefreshResponse, family=OperationFamily.TOKEN_REFRESH)
+    @client_auth
     async def refresh_token(self, request: TokenRefreshRequest) -> TokenRefreshResponse:
-        pass
-
+        auth_parameters = {"REFRESH_TOKEN": request.refresh_token}
+        if request.username:
+            auth_parameters["USERNAME"] = request.username
+        return {"AuthFlow": "REFRESH_TOKEN_AUTH", "AuthParameters": auth_parameters}
+
+    @revoke_on_success(RevocationScope.USER)
+    @call_api(
+        operation="ChangePassword", response_model=ChangePasswordResponse, family=OperationFamily.USER_MANAGEMENT
+    )
     @bearer_auth
-    @call_api(path="changePassword", response_model=ChangePasswordResponse)
     async def change_password(self, request: ChangePasswordRequest) -> ChangePasswordResponse:
-        pass
+        return {"PreviousPassword": request.previous_password, "ProposedPassword": request.proposed_password}
 
-    @basic_auth
-    @call_api(path="forgotPassword", response_model=ForgotPasswordResponse)
+    @call_api(operation="ForgotPassword", response_model=ForgotPasswordResponse)
+    @client_auth
     async def forgot_password(self, request: ForgotPasswordRequest) -> ForgotPasswordResponse:
-        pass
+        return {"Username": request.username}
 
-    @basic_auth
-    @call_api(path="confirmForgotPassword", response_model=ConfirmForgotPasswordResponse)
+    @call_api(operation="ConfirmForgotPassword", response_model=ConfirmForgotPasswordResponse)
+    @client_auth
     async def confirm_forgot_password(self, request: ConfirmForgotPasswordRequest) -> ConfirmForgotPasswordResponse:
-        pass
-
+        return {
+            "Username": request.username,
+            "ConfirmationCode": request.confirmation_code,
+            "Password": request.new_password,
+        }
+
+    @call_api(
+        operation="UpdateUserAttributes", response_model=UpdateUserAttributesResponse,
+        family=OperationFamily.USER_MANAGEMENT
+    )
     @bearer_auth
-    @call_api(path="updateUserAttributes", response_model=UpdateUserAttributesResponse)
     async def update_user_attributes(self, request: UpdateUserAttributesRequest) -> UpdateUserAttributesResponse:
-        pass
+        return {
+            "UserAttributes": [{"Name": name, "Value": value} for name, value in request.attributes.items()]
+        }
+
+    @revoke_on_success(RevocationScope.USER)
+    @call_api(
+        operation="GlobalSignOut", response_model=GlobalSignOutResponse, family=OperationFamily.USER_MANAGEMENT
+    )
+    @bearer_auth
+    async def global_sign_out(self) -> GlobalSignOutResponse:
+        return {}
+
+    @revoke_on_success(RevocationScope.SESSION)
+    @call_api(operation="RevokeToken", response_model=RevokeTokenResponse, family=OperationFamily.USER_MANAGEMENT)
+    async def revoke_token(self, request: RevokeTokenRequest) -> RevokeTokenResponse:
+        payload = {"Token": request.refresh_token, "ClientId": self.client_id}
+        if self.client_secret:
+            payload["ClientSecret"] = self.client_secret
+        return payload
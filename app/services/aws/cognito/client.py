@@ -0,0 +1,71 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import recorder
+from app.core.request_context import propagate_request_id
+from app.services.utils.instrumented_transport import InstrumentedTransport
+
+
+class CognitoHttpClient:
+    """
+    Holds the process-wide pooled HTTP client used to talk to AWS Cognito.
+
+    The client is opened once per worker during the FastAPI lifespan startup and closed on shutdown,
+    so that TCP connections and TLS sessions are kept alive and reused across requests instead of
+    being re-established for every call. Its transport records pool and per-call metrics under the
+    upstream name 'cognito'.
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+
+    logger = logging.getLogger(__name__)
+
+    @classmethod
+    async def open(cls) -> httpx.AsyncClient:
+        """
+        Opens the shared HTTP client if it is not already open.
+
+        Returns:
+            httpx.AsyncClient: The shared HTTP client.
+        """
+        if cls._client is None or cls._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=settings.cognito_http_max_connections,
+                max_keepalive_connections=settings.cognito_http_max_keepalive_connections,
+                keepalive_expiry=settings.cognito_http_keepalive_expiry,
+            )
+            cls._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.cognito_http_timeout),
+                transport=InstrumentedTransport("cognito", recorder, limits=limits),
+                event_hooks={"request": [propagate_request_id]},
+            )
+            cls.logger.info(
+                "Opened Cognito HTTP client pool (max_connections=%s, keepalive_expiry=%ss)",
+                settings.cognito_http_max_connections, settings.cognito_http_keepalive_expiry
+            )
+        return cls._client
+
+    @classmethod
+    def get(cls) -> Optional[httpx.AsyncClient]:
+        """
+        Returns the shared HTTP client, or None if it has not been opened.
+
+        Returns:
+            Optional[httpx.AsyncClient]: The shared HTTP client.
+        """
+        if cls._client is None or cls._client.is_closed:
+            return None
+        return cls._client
+
+    @classmethod
+    async def close(cls):
+        """
+        Closes the shared HTTP client and releases pooled connections.
+        """
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+            cls.logger.info("Closed Cognito HTTP client pool")
@@ -0,0 +1,270 @@
+import base64
+import hashlib
+import hmac
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+class CognitoIdentityProviderError(Exception):
+    """
+    Raised when the Cognito Identity Provider API returns an error response.
+
+    Attributes:
+        error_type (str): The Cognito exception name, e.g. 'NotAuthorizedException'.
+        message (str): The error message returned by Cognito.
+        status_code (int): The HTTP status code of the response.
+
+    Reference: https://docs.aws.amazon.com/cognitoidentityprovider/latest/APIReference/CommonErrors.html
+    """
+
+    def __init__(self, error_type: str, message: str, status_code: int):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+        self.message = message
+        self.status_code = status_code
+
+
+RETRYABLE_ERROR_TYPES = frozenset({
+    "TooManyRequestsException",
+    "InternalErrorException",
+    "ThrottlingException",
+    "ServiceUnavailableException",
+})
+"""
+Cognito error types that are transient and safe to retry. Client errors such as NotAuthorizedException or
+CodeMismatchException are never retried.
+"""
+
+THROTTLING_ERROR_TYPES = frozenset({
+    "TooManyRequestsException",
+    "ThrottlingException",
+})
+"""
+Retryable Cognito error types meaning that the request was rejected without being applied.
+"""
+
+RETRYABLE_TRANSPORT_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError,
+)
+"""
+Transport errors caused by failed connects or connections reset by the peer.
+"""
+
+
+NON_IDEMPOTENT_OPERATIONS = frozenset({
+    "SignUp",
+    "ConfirmSignUp",
+    "ResendConfirmationCode",
+    "ForgotPassword",
+    "ConfirmForgotPassword",
+    "ChangePassword",
+    "UpdateUserAttributes",
+})
+"""
+Operations that must not be repeated once Cognito may have received them: repeating them creates or
+confirms twice, sends another code or fails because the first attempt already took effect.
+"""
+
+CONNECT_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+)
+"""
+Transport errors raised before the request was sent.
+"""
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Classifies an error raised while calling Cognito as retryable or not.
+
+    Throttling errors, 5xx responses and connection failures or resets are retryable.
+
+    Args:
+        error (BaseException): The raised error.
+
+    Returns:
+        bool: True if the call may be retried.
+    """
+    if isinstance(error, CognitoIdentityProviderError):
+        return error.error_type in RETRYABLE_ERROR_TYPES or error.status_code >= 500
+    return isinstance(error, RETRYABLE_TRANSPORT_ERRORS)
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Decides whether an error indicates that Cognito itself is unhealthy.
+
+    Retryable errors and any transport error, including timeouts, count as upstream failures;
+    client errors such as NotAuthorizedException mean Cognito is answering normally.
+
+    Args:
+        error (BaseException): The raised error.
+
+    Returns:
+        bool: True if the error should count against the circuit breaker.
+    """
+    return is_retryable_error(error) or isinstance(error, httpx.TransportError)
+
+
+def is_retryable_unsent_error(error: BaseException) -> bool:
+    """
+    Classifies an error as retryable only if the request was certainly not applied by Cognito, i.e. the
+    connection could not be established or the request was throttled.
+
+    Args:
+        error (BaseException): The raised error.
+
+    Returns:
+        bool: True if the call may be retried.
+    """
+    if isinstance(error, CognitoIdentityProviderError):
+        return error.error_type in THROTTLING_ERROR_TYPES
+    return isinstance(error, CONNECT_ERRORS)
+
+
+def retry_classifier(operation: str) -> Callable[[BaseException], bool]:
+    """
+    Returns the retryable-error classifier of an operation: connect errors and throttling only for
+    operations in NON_IDEMPOTENT_OPERATIONS, since a read error or 5xx response leaves it unknown whether Cognito
+    applied them, and `is_retryable_error` for the others.
+    """
+    return is_retryable_unsent_error if operation in NON_IDEMPOTENT_OPERATIONS else is_retryable_error
+
+
+def compute_secret_hash(username: str, client_id: str, client_secret: str) -> str:
+    """
+    Computes the SECRET_HASH for a username, caching results in a bounded LRU cache of
+    COGNITO_SECRET_HASH_CACHE_SIZE entries, created on first use.
+
+    Args:
+        username (str): The username the request is made for.
+        client_id (str): The app client ID.
+        client_secret (str): The app client secret.
+
+    Returns:
+        str: Base64-encoded HMAC-SHA256 of username + client_id keyed with the client secret.
+
+    Reference: https://docs.aws.amazon.com/cognito/latest/developerguide/signing-up-users-in-your-app.html#cognito-user-pools-computing-secret-hash
+    """
+    global _cached_secret_hash
+    if _cached_secret_hash is None:
+        _cached_secret_hash = lru_cache(maxsize=settings.cognito_secret_hash_cache_size)(_secret_hash)
+    return _cached_secret_hash(username, client_id, client_secret)
+
+
+def _secret_hash(username: str, client_id: str, client_secret: str) -> str:
+    digest = hmac.new(
+        client_secret.encode("utf-8"), (username + client_id).encode("utf-8"), hashlib.sha256
+    ).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+_cached_secret_hash: Optional[Callable[[str, str, str], str]] = None
+
+
+class CognitoIdentityProviderClient:
+    """
+    Minimal client for the AWS Cognito Identity Provider JSON 1.1 protocol.
+
+    Operations are invoked by POSTing a JSON document to the service endpoint with the
+    'X-Amz-Target: AWSCognitoIdentityProviderService.<Operation>' header. The public (non-admin)
+    operations used here are authorized by the app client ID, tokens or SECRET_HASH in the body,
+    so no SigV4 signing is required. The endpoint can be pointed at a local stand-in for tests.
+
+    Reference: https://docs.aws.amazon.com/cognitoidentityprovider/latest/APIReference/Welcome.html
+    """
+
+    TARGET_PREFIX = "AWSCognitoIdentityProviderService."
+    CONTENT_TYPE = "application/x-amz-json-1.1"
+
+    def __init__(self, http_client: httpx.AsyncClient, endpoint: str, client_id: str,
+                 client_secret: Optional[str] = None):
+        """
+        Initializes the client.
+
+        Args:
+            http_client (httpx.AsyncClient): The (usually shared) HTTP client used for requests.
+            endpoint (str): The Cognito Identity Provider endpoint URL.
+            client_id (str): The app client ID.
+            client_secret (Optional[str]): The app client secret, if the app client has one.
+        """
+        self.http_client = http_client
+        self.endpoint = endpoint
+        self.client_id = client_id
+        self.client_secret = client_secret
+
+    @staticmethod
+    def default_endpoint(region: str) -> str:
+        """
+        Returns the public Cognito Identity Provider endpoint for a region.
+        """
+        return f"https://cognito-idp.{region}.amazonaws.com/"
+
+    def secret_hash(self, username: str) -> Optional[str]:
+        """
+        Returns the SECRET_HASH for a username, or None if the app client has no secret.
+
+        Args:
+            username (str): The username the request is made for.
+
+        Returns:
+            Optional[str]: The SECRET_HASH value.
+        """
+        if not self.client_secret:
+            return None
+        return compute_secret_hash(username, self.client_id, self.client_secret)
+
+    async def invoke(self, operation: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Invokes a Cognito Identity Provider operation.
+
+        Args:
+            operation (str): The operation name, e.g. 'InitiateAuth'.
+            payload (Dict[str, Any]): The request body.
+
+        Returns:
+            Dict[str, Any]: The decoded response body.
+
+        Raises:
+            CognitoIdentityProviderError: If Cognito returns an error response.
+            httpx.HTTPError: On transport failures.
+        """
+        headers = {
+            "X-Amz-Target": self.TARGET_PREFIX + operation,
+            "Content-Type": self.CONTENT_TYPE,
+        }
+        response = await self.http_client.post(self.endpoint, json=payload, headers=headers)
+        if response.is_success:
+            return response.json() if response.content else {}
+        raise self._error_from_response(response)
+
+    @staticmethod
+    def _error_from_response(response: httpx.Response) -> CognitoIdentityProviderError:
+        """
+        Builds a CognitoIdentityProviderError from an error response.
+
+        The error type is read from the '__type' field of the body, falling back to the
+        'x-amzn-ErrorType' header, and is stripped of any namespace prefix.
+        """
+        error_type, message = "", response.reason_phrase
+        try:
+            body = response.json()
+            error_type = body.get("__type", "")
+            message = body.get("message") or body.get("Message") or message
+        except ValueError:
+            pass
+        if not error_type:
+            error_type = response.headers.get("x-amzn-ErrorType", "").split(":", 1)[0]
+        error_type = error_type.rsplit("#", 1)[-1] or (
+            "InternalErrorException" if response.status_code >= 500 else "UnknownError"
+        )
+        return CognitoIdentityProviderError(error_type, message, response.status_code)
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from enum import Enum
+from typing import Dict, Optional
+
+from app.core.exceptions import TooManyRequestsException
+from app.core.metrics import MetricsRecorder
+
+
+class QuotaCategory(str, Enum):
+    """
+    Cognito request rate quota categories.
+
+    Reference: https://docs.aws.amazon.com/cognito/latest/developerguide/quotas.html#category_operations
+    """
+    USER_AUTHENTICATION = "UserAuthentication"
+    USER_CREATION = "UserCreation"
+    USER_ACCOUNT_RECOVERY = "UserAccountRecovery"
+    USER_UPDATE = "UserUpdate"
+
+
+OPERATION_CATEGORIES: Dict[str, QuotaCategory] = {
+    "InitiateAuth": QuotaCategory.USER_AUTHENTICATION,
+    "GlobalSignOut": QuotaCategory.USER_AUTHENTICATION,
+    "RevokeToken": QuotaCategory.USER_AUTHENTICATION,
+    "SignUp": QuotaCategory.USER_CREATION,
+    "ConfirmSignUp": QuotaCategory.USER_CREATION,
+    "ResendConfirmationCode": QuotaCategory.USER_CREATION,
+    "ChangePassword": QuotaCategory.USER_ACCOUNT_RECOVERY,
+    "ForgotPassword": QuotaCategory.USER_ACCOUNT_RECOVERY,
+    "ConfirmForgotPassword": QuotaCategory.USER_ACCOUNT_RECOVERY,
+    "UpdateUserAttributes": QuotaCategory.USER_UPDATE,
+}
+"""
+Maps the Cognito operations used by CognitoService to the quota category they count against.
+"""
+
+
+class TokenBucket:
+    """
+    A token bucket that hands out reservations instead of blocking.
+
+    The bucket refills at `rate` tokens per second up to `capacity`. A reservation may take the
+    balance below zero, in which case the caller must wait until its token has been refilled; this
+    keeps callers in FIFO order without locks on the event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initializes the bucket, full.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum number of stored tokens (burst size).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Reserves one token if it becomes available within `max_wait` seconds.
+
+        Args:
+            max_wait (float): Maximum time in seconds the caller is willing to wait.
+
+        Returns:
+            Optional[float]: Seconds to wait before using the token, or None if the token would not
+            be available in time (nothing is reserved in that case).
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        wait = (1.0 - self._tokens) / self.rate if self._tokens < 1.0 else 0.0
+        if wait > max_wait:
+            return None
+        self._tokens -= 1.0
+        return wait
+
+
+class CognitoRateLimiter:
+    """
+    Client-side rate limiter keeping Cognito requests under their per-category quotas.
+
+    Each quota category has its own token bucket, so bursts in one category (e.g. sign-ups) cannot
+    use up the headroom of another (e.g. logins). Callers wait up to `max_wait` seconds for a token;
+    beyond that, the request is rejected locally with TooManyRequestsException.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, rates: Dict[QuotaCategory, float], max_wait: float, burst_seconds: float = 1.0,
+                 recorder: Optional[MetricsRecorder] = None):
+        """
+        Initializes the limiter.
+
+        Args:
+            rates (Dict[QuotaCategory, float]): Allowed requests per second for each category.
+            max_wait (float): Maximum time in seconds a request may wait for a token.
+            burst_seconds (float): Bucket capacity expressed in seconds of the category's rate.
+            recorder (Optional[MetricsRecorder]): Records the rejections as metrics, if given.
+        """
+        self.max_wait = max_wait
+        self.buckets: Dict[QuotaCategory, TokenBucket] = {
+            category: TokenBucket(rate, max(1.0, rate * burst_seconds)) for category, rate in rates.items()
+        }
+        self.rejected: Dict[QuotaCategory, int] = {category: 0 for category in rates}
+        self.recorder = recorder
+
+    async def acquire(self, operation: str):
+        """
+        Waits for a token of the quota category of `operation`.
+
+        Args:
+            operation (str): The Cognito operation name, e.g. 'InitiateAuth'.
+
+        Raises:
+            TooManyRequestsException: If no token becomes available within `max_wait` seconds.
+        """
+        category = OPERATION_CATEGORIES.get(operation)
+        bucket = self.buckets.get(category)
+        if bucket is None:
+            return
+        wait = bucket.reserve(self.max_wait)
+        if wait is None:
+            self.rejected[category] += 1
+            if self.recorder is not None:
+                self.recorder.observe_quota_rejection(category.value)
+            self.logger.warning("Cognito %s quota exhausted locally; rejecting %s", category.value, operation)
+            raise TooManyRequestsException()
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Optional, List, Tuple, Union
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPublicNumbers
+
+from app.core.config import settings
+from app.core.request_context import run_in_executor
+from app.services.utils.event_loop_monitor import EventLoopLagMonitor
+
+KeyOrNumbers = Union[RSAPublicKey, Tuple[int, int]]
+SignatureItem = Tuple[KeyOrNumbers, bytes, bytes]
+
+
+class VerificationMode(str, Enum):
+    """
+    Where RS256 signatures are verified.
+
+    INLINE verifies on the event loop, POOL always dispatches to a worker pool, and ADAPTIVE
+    verifies inline while the loop is responsive and switches to the pool when its lag crosses
+    a threshold.
+    """
+    INLINE = "inline"
+    POOL = "pool"
+    ADAPTIVE = "adaptive"
+
+
+class PoolKind(str, Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+@lru_cache(maxsize=32)
+def _rsa_public_key(n: int, e: int) -> RSAPublicKey:
+    return RSAPublicNumbers(e, n).public_key()
+
+
+def verify_rs256(key: KeyOrNumbers, signing_input: bytes, signature: bytes) -> bool:
+    """
+    Verifies an RS256 (RSASSA-PKCS1-v1_5 with SHA-256) signature.
+
+    Args:
+        key (KeyOrNumbers): The public key, or its (n, e) numbers when called in another process.
+        signing_input (bytes): The signed data ('<header>.<payload>').
+        signature (bytes): The decoded signature.
+
+    Returns:
+        bool: True if the signature is valid.
+    """
+    if not isinstance(key, RSAPublicKey):
+        key = _rsa_public_key(*key)
+    try:
+        key.verify(signature, signing_input, padding.PKCS1v15(), hashes.SHA256())
+    except InvalidSignature:
+        return False
+    return True
+
+
+def verify_rs256_batch(items: List[SignatureItem]) -> List[bool]:
+    """
+    Verifies a batch of RS256 signatures in one worker pool job.
+    """
+    return [verify_rs256(*item) for item in items]
+
+
+@dataclass
+class SignatureVerificationStats:
+    """
+    Counters describing where signatures were verified.
+
+    Attributes:
+        inline (int): Signatures verified on the event loop.
+        pooled (int): Signatures verified in the worker pool.
+        batches (int): Worker pool jobs dispatched.
+    """
+    inline: int = 0
+    pooled: int = 0
+    batches: int = 0
+
+
+class SignatureVerifier:
+    """
+    Verifies RS256 signatures inline or in a worker pool, depending on event loop pressure.
+
+    In pooled mode, verifications requested within `batch_window` seconds (or until `batch_size`
+    are pending) are sent to the pool as a single job, which amortizes the dispatch cost and keeps
+    the event loop free to serve other requests while RSA work runs elsewhere.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, mode: Optional[VerificationMode] = None, pool_kind: Optional[PoolKind] = None,
+                 workers: Optional[int] = None, lag_threshold: Optional[float] = None,
+                 batch_size: Optional[int] = None, batch_window: Optional[float] = None,
+                 monitor: Optional[EventLoopLagMonitor] = None):
+        """
+        Initializes the verifier.
+
+        Args:
+            mode (Optional[VerificationMode]): Verification mode.
+            pool_kind (Optional[PoolKind]): Thread or process pool.
+            workers (Optional[int]): Number of pool workers.
+            lag_threshold (Optional[float]): Event loop lag in seconds above which ADAPTIVE mode offloads.
+            batch_size (Optional[int]): Maximum number of signatures per pool job.
+            batch_window (Optional[float]): Seconds to wait for a batch to fill before dispatching it.
+            monitor (Optional[EventLoopLagMonitor]): Lag monitor used in ADAPTIVE mode.
+        """
+        self.mode = VerificationMode(mode or settings.token_verification_mode)
+        self.pool_kind = PoolKind(pool_kind or settings.token_verification_pool)
+        self.workers = workers or settings.token_verification_workers
+        self.lag_threshold = settings.token_verification_lag_threshold if lag_threshold is None else lag_threshold
+        self.batch_size = batch_size or settings.token_verification_batch_size
+        self.batch_window = settings.token_verification_batch_window if batch_window is None else batch_window
+        self.monitor = monitor or EventLoopLagMonitor()
+        self.stats = SignatureVerificationStats()
+        self._executor: Optional[Executor] = None
+        self._batch: List[Tuple[SignatureItem, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self):
+        """
+        Creates the worker pool and starts the lag monitor, unless running in INLINE mode.
+        """
+        if self.mode == VerificationMode.INLINE or self._executor is not None:
+            return
+        if self.pool_kind == PoolKind.PROCESS:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="jwt-verify")
+        if self.mode == VerificationMode.ADAPTIVE:
+            self.monitor.start()
+
+    async def close(self):
+        """
+        Stops the lag monitor and shuts the worker pool down.
+        """
+        await self.monitor.stop()
+        self._flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @property
+    def offloading(self) -> bool:
+        """
+        Whether verifications are currently sent to the worker pool.
+        """
+        if self._executor is None or self.mode == VerificationMode.INLINE:
+            return False
+        return self.mode == VerificationMode.POOL or self.monitor.lag >= self.lag_threshold
+
+    async def verify(self, key: RSAPublicKey, signing_input: bytes, signature: bytes) -> bool:
+        """
+        Verifies an RS256 signature.
+
+        Args:
+            key (RSAPublicKey): The public key.
+            signing_input (bytes): The signed data ('<header>.<payload>').
+            signature (bytes): The decoded signature.
+
+        Returns:
+            bool: True if the signature is valid.
+        """
+        if not self.offloading:
+            self.stats.inline += 1
+            return verify_rs256(key, signing_input, signature)
+
+        self.stats.pooled += 1
+        if self.pool_kind == PoolKind.PROCESS:
+            numbers = key.public_numbers()
+            key = (numbers.n, numbers.e)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append(((key, signing_input, signature), future))
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        if self._executor is None:
+            for item, future in batch:
+                if not future.done():
+                    future.set_result(verify_rs256(*item))
+            return
+        self.stats.batches += 1
+        job = run_in_executor(self._executor, verify_rs256_batch, [item for item, _ in batch])
+        job.add_done_callback(lambda done: self._resolve(batch, done))
+
+    def _resolve(self, batch: List[Tuple[SignatureItem, asyncio.Future]], job: asyncio.Future):
+        if job.cancelled() or job.exception() is not None:
+            error = asyncio.CancelledError() if job.cancelled() else job.exception()
+            self.logger.error("Signature verification batch failed: %s", error)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), valid in zip(batch, job.result()):
+            if not future.done():
+                future.set_result(valid)
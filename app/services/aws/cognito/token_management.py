@@ -0,0 +1,908 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Dict, Any, Tuple, FrozenSet, List
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPublicNumbers
+
+from app.core.config import settings
+from app.core.exceptions import UnauthorizedException, TokenExpiredException
+from app.core.metrics import MetricsRecorder, default_recorder
+from app.core.request_context import create_background_task, propagate_aws_request_id
+from app.core.timing import timed
+from app.services.aws.cognito.client import CognitoHttpClient
+from app.services.aws.cognito.signature_verification import SignatureVerifier
+from app.services.utils.singleflight import SingleFlight
+
+
+class TokenUse(str, Enum):
+    """
+    The 'token_use' claim of Cognito JWTs.
+    """
+    ACCESS = "access"
+    ID = "id"
+
+
+def b64url_decode(segment: str) -> bytes:
+    """
+    Decodes an unpadded base64url JWT segment.
+    """
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def default_issuer() -> str:
+    """
+    Returns the expected 'iss' claim of the configured user pool's tokens: AWS_COGNITO_ISSUER if set,
+    otherwise the canonical issuer. Cognito always issues tokens with the canonical issuer, whichever
+    endpoint its API is reached through, so the endpoint override does not change it.
+    """
+    if settings.aws_cognito_issuer:
+        return settings.aws_cognito_issuer.rstrip("/")
+    return f"https://cognito-idp.{settings.aws_region}.amazonaws.com/{settings.aws_cognito_user_pool_id}"
+
+
+def default_jwks_url() -> str:
+    """
+    Returns the URL of the user pool's JWKS document, fetched through the endpoint override if one is set.
+    """
+    if settings.aws_cognito_endpoint:
+        return f"{settings.aws_cognito_endpoint.rstrip('/')}/{settings.aws_cognito_user_pool_id}/.well-known/jwks.json"
+    return f"{default_issuer()}/.well-known/jwks.json"
+
+
+class JWKSCache:
+    """
+    In-memory cache of the user pool's JSON Web Key Set, indexed by key ID.
+
+    The key set is fetched once and then refreshed in the background before it is considered stale,
+    so verification never waits on the network. A token with an unknown 'kid' triggers a refetch
+    (to pick up key rotation), but such refetches are coalesced and limited to one per
+    `min_refetch_interval` seconds, so forged key IDs cannot stampede the JWKS endpoint.
+
+    Reference: https://docs.aws.amazon.com/cognito/latest/developerguide/amazon-cognito-user-pools-using-tokens-verifying-a-jwt.html
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, jwks_url: Optional[str] = None, refresh_interval: Optional[float] = None,
+                 min_refetch_interval: Optional[float] = None, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initializes the cache.
+
+        Args:
+            jwks_url (Optional[str]): URL of the JWKS document; derived from the user pool if omitted.
+            refresh_interval (Optional[float]): Seconds between background refreshes.
+            min_refetch_interval (Optional[float]): Minimum seconds between refetches for unknown key IDs.
+            http_client (Optional[httpx.AsyncClient]): HTTP client; the shared Cognito client if omitted.
+        """
+        self.jwks_url = jwks_url or default_jwks_url()
+        self.refresh_interval = refresh_interval or settings.jwks_refresh_interval
+        self.min_refetch_interval = min_refetch_interval or settings.jwks_min_refetch_interval
+        self.http_client = http_client
+        self.keys: Dict[str, RSAPublicKey] = {}
+        self.loaded_at = 0.0
+        self._last_refetch = 0.0
+        self._fetches = SingleFlight(name="jwks", recorder=default_recorder())
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _load_key(jwk: Dict[str, Any]) -> RSAPublicKey:
+        e = int.from_bytes(b64url_decode(jwk["e"]), "big")
+        n = int.from_bytes(b64url_decode(jwk["n"]), "big")
+        return RSAPublicNumbers(e, n).public_key()
+
+    async def _fetch(self):
+        client = self.http_client or CognitoHttpClient.get() or await CognitoHttpClient.open()
+        with timed("jwks"):
+            response = await client.get(self.jwks_url, extensions={"operation": "GetJWKS"})
+        response.raise_for_status()
+        self.keys = {
+            jwk["kid"]: self._load_key(jwk)
+            for jwk in response.json().get("keys", [])
+            if jwk.get("kty") == "RSA" and "kid" in jwk
+        }
+        self.loaded_at = self._last_refetch = time.monotonic()
+        self.logger.info("Loaded %d signing keys from %s", len(self.keys), self.jwks_url)
+
+    async def load(self):
+        """
+        Fetches the key set, sharing the fetch with concurrent callers.
+        """
+        await self._fetches.do("jwks", self._fetch)
+
+    def get(self, kid: str) -> Optional[RSAPublicKey]:
+        """
+        Returns the cached key for a key ID without any network access.
+        """
+        return self.keys.get(kid)
+
+    async def get_or_refetch(self, kid: str) -> Optional[RSAPublicKey]:
+        """
+        Returns the key for a key ID, refetching the key set if it is unknown and a refetch is allowed.
+
+        Args:
+            kid (str): The key ID from the token header.
+
+        Returns:
+            Optional[RSAPublicKey]: The public key, or None if the key ID is unknown.
+        """
+        key = self.keys.get(kid)
+        if key is not None:
+            return key
+        now = time.monotonic()
+        if now - self._last_refetch < self.min_refetch_interval and not self._fetches.in_flight("jwks"):
+            return None
+        if not self._fetches.in_flight("jwks"):
+            self._last_refetch = now
+        try:
+            await self.load()
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            self.logger.error("Failed to fetch JWKS from %s: %s", self.jwks_url, e)
+        return self.keys.get(kid)
+
+    async def _refresh_loop(self):
+        while True:
+            delay = self.refresh_interval if self.keys else min(self.refresh_interval, self.min_refetch_interval)
+            await asyncio.sleep(delay)
+            try:
+                await self.load()
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                self.logger.error("Background JWKS refresh from %s failed: %s", self.jwks_url, e)
+
+    async def start(self):
+        """
+        Loads the key set and starts the background refresh task.
+        """
+        try:
+            await self.load()
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            self.logger.error("Initial JWKS fetch from %s failed: %s", self.jwks_url, e)
+        if self._refresh_task is None:
+            self._refresh_task = create_background_task(self._refresh_loop())
+
+    async def stop(self):
+        """
+        Stops the background refresh task.
+        """
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+@dataclass
+class TokenCacheStats:
+    """
+    Counters describing the behaviour of the verified-token cache.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups not found in the cache, or found expired.
+        evictions (int): Entries evicted to stay within the entry and memory limits.
+        invalidations (int): Entries removed because their token was revoked.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified token claims, keyed by a digest of the raw token.
+
+    An entry lives for min(exp - now, max_ttl) seconds, so a token is never served from the cache
+    after it expires. A hit skips both signature verification and JSON decoding. The cache holds at
+    most `max_entries` entries and approximately `max_bytes` bytes of claims; least recently used
+    entries are evicted first.
+    """
+
+    ENTRY_OVERHEAD = 256
+    """
+    Approximate fixed memory cost of an entry (digest, tuple, dict and OrderedDict node), in bytes.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 max_ttl: Optional[float] = None, recorder: Optional[MetricsRecorder] = None):
+        """
+        Initializes the cache.
+
+        Args:
+            max_entries (Optional[int]): Maximum number of cached tokens.
+            max_bytes (Optional[int]): Approximate memory cap in bytes.
+            max_ttl (Optional[float]): Maximum time in seconds an entry is kept.
+            recorder (Optional[MetricsRecorder]): Records the counters of `stats` as metrics, if given.
+        """
+        self.max_entries = max_entries or settings.token_cache_max_entries
+        self.max_bytes = max_bytes or settings.token_cache_max_bytes
+        self.max_ttl = max_ttl or settings.token_cache_max_ttl
+        self.stats = TokenCacheStats()
+        self.recorder = recorder
+        self.size_bytes = 0
+        self._entries: OrderedDict[bytes, Tuple[float, Dict[str, Any], int]] = OrderedDict()
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        """
+        Returns the cache key for a raw token.
+        """
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _count(self, event: str):
+        setattr(self.stats, event, getattr(self.stats, event) + 1)
+        if self.recorder is not None:
+            self.recorder.observe_token_cache(event)
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached claims for a token digest, or None if absent or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._count("misses")
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            self._count("misses")
+            return None
+        self._entries.move_to_end(key)
+        self._count("hits")
+        return entry[1]
+
+    def put(self, key: bytes, claims: Dict[str, Any], size: int):
+        """
+        Caches verified claims for a token digest.
+
+        Args:
+            key (bytes): The token digest.
+            claims (Dict[str, Any]): The verified claims; must contain a numeric 'exp'.
+            size (int): Approximate size of the claims in bytes.
+        """
+        ttl = min(claims["exp"] - time.time(), self.max_ttl)
+        if ttl <= 0:
+            return
+        if key in self._entries:
+            self._remove(key)
+        size += self.ENTRY_OVERHEAD
+        self._entries[key] = (time.monotonic() + ttl, claims, size)
+        self.size_bytes += size
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._count("evictions")
+
+    def invalidate(self, token: str):
+        """
+        Removes a token from the cache, e.g. after it has been revoked.
+        """
+        if self._remove(self.digest(token)):
+            self._count("invalidations")
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _remove(self, key: bytes) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size_bytes -= entry[2]
+        return True
+
+
+class RevocationScope(str, Enum):
+    """
+    What a revocation applies to.
+
+    TOKEN revokes a single token by its 'jti', SESSION revokes every token of an authentication
+    session by its 'origin_jti' (what Cognito's RevokeToken does), and USER revokes every token of
+    the user issued up to now (what GlobalSignOut and a password change do).
+    """
+    TOKEN = "jti"
+    SESSION = "origin_jti"
+    USER = "sub"
+
+
+class RevocationStore(ABC):
+    """
+    Exact store of revoked keys, shared by all instances and read by the denylist on start and sync.
+
+    Entries are (key, revoked_at, expires_at) triples; they are dropped by the store once they expire.
+    """
+
+    @abstractmethod
+    async def add(self, key: str, revoked_at: float, expires_at: float):
+        """
+        Records a revoked key until `expires_at`.
+        """
+        pass
+
+    @abstractmethod
+    async def entries(self, since: Optional[float] = None) -> List[Tuple[str, float, float]]:
+        """
+        Returns the (key, revoked_at, expires_at) triples of the unexpired entries revoked at or after
+        `since`, or of all unexpired entries if it is None. Stores may return older entries too.
+        """
+        pass
+
+
+class InMemoryRevocationStore(RevocationStore):
+    """
+    Process-local revocation store, suitable for a single instance and for development.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, float]] = {}
+
+    async def add(self, key: str, revoked_at: float, expires_at: float):
+        self._entries[key] = (revoked_at, expires_at)
+
+    async def entries(self, since: Optional[float] = None) -> List[Tuple[str, float, float]]:
+        now = time.time()
+        for key in [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        return [
+            (key, revoked_at, expires_at) for key, (revoked_at, expires_at) in self._entries.items()
+            if since is None or revoked_at >= since
+        ]
+
+
+class DynamoDBRevocationStore(RevocationStore):
+    """
+    Revocation store backed by a DynamoDB table shared by all instances.
+
+    The table has a string partition key 'key' and DynamoDB TTL enabled on the numeric 'expires_at'
+    attribute. Since TTL deletion is lazy, expired items are also filtered out on read. boto3 is
+    imported on first use and its blocking calls run in a worker thread.
+
+    Reading all entries is a Scan, which reads (and bills) the whole table; every worker does it once
+    on start. Later syncs only need the entries revoked since the previous one: with `index_name` set
+    to a global secondary index with partition key 'revoked_hour' (N), sort key 'revoked_at' (N) and
+    'expires_at' projected, they query the hours since then instead. Without the index every sync is
+    a full Scan. Revocations are rare, so the hourly index partitions stay small.
+    """
+
+    def __init__(self, table_name: Optional[str] = None, region: Optional[str] = None,
+                 index_name: Optional[str] = None, endpoint_url: Optional[str] = None):
+        """
+        Initializes the store.
+
+        Args:
+            table_name (Optional[str]): The DynamoDB table name; the configured one if omitted.
+            region (Optional[str]): The AWS region; the configured one if omitted.
+            index_name (Optional[str]): The index of entries by revocation time; the configured one if
+                omitted, and none if that is empty.
+            endpoint_url (Optional[str]): The DynamoDB endpoint; the configured one if omitted.
+        """
+        self.table_name = table_name or settings.token_revocation_table
+        self.region = region or settings.aws_region
+        self.index_name = settings.token_revocation_index if index_name is None else index_name
+        self.endpoint_url = endpoint_url or settings.dynamodb_endpoint
+        self._client = None
+
+    def _dynamodb(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client("dynamodb", region_name=self.region, endpoint_url=self.endpoint_url)
+            self._client.meta.events.register("before-sign.*.*", propagate_aws_request_id)
+        return self._client
+
+    async def add(self, key: str, revoked_at: float, expires_at: float):
+        with timed("dynamodb.PutItem"):
+            await asyncio.to_thread(
+                self._dynamodb().put_item,
+                TableName=self.table_name,
+                Item={
+                    "key": {"S": key},
+                    "revoked_at": {"N": repr(revoked_at)},
+                    "revoked_hour": {"N": str(int(revoked_at // 3600))},
+                    "expires_at": {"N": str(math.ceil(expires_at))},
+                },
+            )
+
+    async def entries(self, since: Optional[float] = None) -> List[Tuple[str, float, float]]:
+        now = str(int(time.time()))
+        attributes = {
+            "ProjectionExpression": "#k, revoked_at, expires_at",
+            "FilterExpression": "expires_at > :now",
+            "ExpressionAttributeNames": {"#k": "key"},
+        }
+
+        def read() -> List[Tuple[str, float, float]]:
+            client = self._dynamodb()
+            if since is None or not self.index_name:
+                pages = client.get_paginator("scan").paginate(
+                    TableName=self.table_name, ExpressionAttributeValues={":now": {"N": now}}, **attributes
+                )
+            else:
+                paginator = client.get_paginator("query")
+                pages = (
+                    page
+                    for hour in range(int(since // 3600), int(time.time() // 3600) + 1)
+                    for page in paginator.paginate(
+                        TableName=self.table_name, IndexName=self.index_name,
+                        KeyConditionExpression="revoked_hour = :hour AND revoked_at >= :since",
+                        ExpressionAttributeValues={
+                            ":now": {"N": now}, ":hour": {"N": str(hour)}, ":since": {"N": repr(since)},
+                        },
+                        **attributes,
+                    )
+                )
+            return [
+                (item["key"]["S"], float(item["revoked_at"]["N"]), float(item["expires_at"]["N"]))
+                for page in pages for item in page.get("Items", [])
+            ]
+
+        with timed("dynamodb.Scan" if since is None or not self.index_name else "dynamodb.Query"):
+            return await asyncio.to_thread(read)
+
+
+@dataclass
+class RevocationStats:
+    """
+    Counters describing the behaviour of the token denylist.
+
+    Attributes:
+        checks (int): Tokens checked against the denylist.
+        hits (int): Checks that found the token, its session or its user revoked.
+        revocations (int): Keys added to the denylist.
+    """
+    checks: int = 0
+    hits: int = 0
+    revocations: int = 0
+
+
+class TokenDenylist:
+    """
+    Denylist of revoked tokens, sessions and users, checked on every verified request.
+
+    The unexpired entries of the store are kept in memory, in one dict per scope keyed by the claim
+    value, so a check is at most three dict lookups on claim values and never waits for the store.
+    Token and session revocations name exactly what they revoke; a user revocation applies to tokens
+    issued ('iat', in whole seconds) before the second it was made in, so that logging in again right
+    after a sign-out or password change works.
+
+    Everything is loaded from the store on start; every `sync_interval` seconds the entries revoked
+    since the last sync are merged in, which picks up revocations made by other instances, and expired
+    entries are dropped, so the memory used tracks the number of live revocations.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    # Entries are read again from this many seconds before the previous sync, covering clock skew
+    # between instances and the eventual consistency of the store's index
+    SYNC_OVERLAP = 60.0
+
+    def __init__(self, store: Optional[RevocationStore] = None, sync_interval: Optional[float] = None,
+                 recorder: Optional[MetricsRecorder] = None):
+        """
+        Initializes the denylist.
+
+        Args:
+            store (Optional[RevocationStore]): The exact store; the configured one if omitted.
+            sync_interval (Optional[float]): Seconds between syncs with the store; 0 disables them.
+            recorder (Optional[MetricsRecorder]): Records the counters of `stats` as metrics, if given.
+        """
+        if store is None:
+            store = (
+                DynamoDBRevocationStore() if settings.token_revocation_store == "dynamodb"
+                else InMemoryRevocationStore()
+            )
+        self.store = store
+        self.sync_interval = settings.token_revocation_sync_interval if sync_interval is None else sync_interval
+        self.stats = RevocationStats()
+        self.recorder = recorder
+        self._revoked: Dict[RevocationScope, Dict[str, Tuple[float, float]]] = {scope: {} for scope in RevocationScope}
+        self._pending: Optional[List[Tuple[str, float, float]]] = None
+        self._synced_at: Optional[float] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def key(scope: RevocationScope, value: str) -> str:
+        return f"{scope.value}:{value}"
+
+    def _count(self, event: str):
+        setattr(self.stats, event, getattr(self.stats, event) + 1)
+        if self.recorder is not None:
+            self.recorder.observe_denylist(event)
+
+    @staticmethod
+    def _add(revoked: Dict[RevocationScope, Dict[str, Tuple[float, float]]], key: str, revoked_at: float,
+             expires_at: float):
+        if expires_at <= time.time():
+            return
+        scope, _, value = key.partition(":")
+        entries = revoked[RevocationScope(scope)]
+        previous = entries.get(value)
+        if previous is None or previous[0] < revoked_at:
+            entries[value] = (revoked_at, expires_at)
+
+    async def revoke(self, scope: RevocationScope, value: str, expires_at: float):
+        """
+        Revokes the tokens matching a key until `expires_at`.
+
+        Args:
+            scope (RevocationScope): Which claim the value identifies.
+            value (str): The 'jti', 'origin_jti' or 'sub' value.
+            expires_at (float): When the revocation can be forgotten, i.e. when every matching
+                token has expired.
+        """
+        key = self.key(scope, value)
+        revoked_at = time.time()
+        await self.store.add(key, revoked_at, expires_at)
+        self._add(self._revoked, key, revoked_at, expires_at)
+        if self._pending is not None:
+            self._pending.append((key, revoked_at, expires_at))
+        self._count("revocations")
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        """
+        Checks verified token claims against the denylist.
+
+        Args:
+            claims (Dict[str, Any]): The verified claims.
+
+        Returns:
+            bool: True if the token or its session has been revoked, or its user has been since it was issued.
+        """
+        self._count("checks")
+        for scope, entries in self._revoked.items():
+            if not entries:
+                continue
+            value = claims.get(scope.value)
+            entry = entries.get(value) if isinstance(value, str) else None
+            if entry is None:
+                continue
+            if scope != RevocationScope.USER or claims.get("iat", 0) < math.floor(entry[0]):
+                self._count("hits")
+                return True
+        return False
+
+    async def load(self):
+        """
+        Rebuilds the in-memory entries from all unexpired entries of the store.
+
+        The current entries keep answering until the new ones are complete; keys revoked locally while
+        the store is being read are carried over.
+        """
+        self._pending = []
+        started = time.time()
+        try:
+            entries = await self.store.entries()
+            revoked: Dict[RevocationScope, Dict[str, Tuple[float, float]]] = {scope: {} for scope in RevocationScope}
+            for key, revoked_at, expires_at in entries + self._pending:
+                self._add(revoked, key, revoked_at, expires_at)
+            self._revoked = revoked
+            self._synced_at = started
+        finally:
+            self._pending = None
+
+    async def sync(self):
+        """
+        Merges the entries revoked since the last sync into the in-memory entries, and drops the expired ones.
+        """
+        if self._synced_at is None:
+            await self.load()
+            return
+        started = time.time()
+        for key, revoked_at, expires_at in await self.store.entries(self._synced_at - self.SYNC_OVERLAP):
+            self._add(self._revoked, key, revoked_at, expires_at)
+        self._synced_at = started
+
+        for entries in self._revoked.values():
+            for value in [value for value, (_, expires_at) in entries.items() if expires_at <= started]:
+                del entries[value]
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                self.logger.warning(f"Failed to sync revoked tokens: {e}")
+
+    async def start(self):
+        """
+        Loads the revoked keys and starts syncing them in the background.
+        """
+        await self.load()
+        if self.sync_interval > 0 and self._sync_task is None:
+            self._sync_task = create_background_task(self._sync_loop())
+
+    async def stop(self):
+        """
+        Stops the background sync.
+        """
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+
+class TokenPreFilter:
+    """
+    Cheap staged checks that reject malformed bearer tokens before any cryptographic work.
+
+    Stages run in order of increasing cost, and each failure raises immediately and is counted
+    under its stage name, which makes junk and attack traffic visible without verifying signatures:
+
+    - 'size': the token length is within `max_length`;
+    - 'shape': the token consists of three non-empty base64url segments;
+    - 'header': only the header is decoded, and 'alg' and 'kid' must be allowed and well-formed;
+    - 'expiry': the payload is decoded and 'exp' must be a number in the future.
+
+    The verifier records its own later rejections ('kid', 'signature', 'claims', 'revoked') in the
+    same counters.
+    """
+
+    SHAPE = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
+    KEY_ID = re.compile(r"[A-Za-z0-9+/=_-]{1,128}")
+    STAGES = ("size", "shape", "header", "expiry", "kid", "signature", "claims", "revoked")
+
+    def __init__(self, max_length: Optional[int] = None, algorithms: FrozenSet[str] = frozenset({"RS256"}),
+                 leeway: Optional[float] = None, recorder: Optional[MetricsRecorder] = None):
+        """
+        Initializes the pre-filter.
+
+        Args:
+            max_length (Optional[int]): Maximum accepted token length in characters.
+            algorithms (FrozenSet[str]): Accepted 'alg' header values.
+            leeway (Optional[float]): Allowed clock skew in seconds for 'exp'.
+            recorder (Optional[MetricsRecorder]): Records the rejections as metrics, if given.
+        """
+        self.max_length = max_length or settings.jwt_max_length
+        self.algorithms = algorithms
+        self.leeway = settings.jwt_leeway if leeway is None else leeway
+        self.rejects: Dict[str, int] = {stage: 0 for stage in self.STAGES}
+        self.recorder = recorder
+
+    def count_reject(self, stage: str):
+        """
+        Counts a rejection at `stage`.
+        """
+        self.rejects[stage] += 1
+        if self.recorder is not None:
+            self.recorder.observe_token_rejection(stage)
+
+    def reject(self, stage: str, exception_class=UnauthorizedException):
+        """
+        Counts a rejection at `stage` and returns the exception to raise.
+        """
+        self.count_reject(stage)
+        return exception_class()
+
+    def check_shape(self, token: str) -> Tuple[str, str, str]:
+        """
+        Runs the 'size' and 'shape' stages.
+
+        Returns:
+            Tuple[str, str, str]: The encoded header, payload and signature segments.
+        """
+        if not token or len(token) > self.max_length:
+            raise self.reject("size")
+        if self.SHAPE.fullmatch(token) is None:
+            raise self.reject("shape")
+        encoded_header, encoded_payload, encoded_signature = token.split(".")
+        return encoded_header, encoded_payload, encoded_signature
+
+    def check_header(self, encoded_header: str) -> Dict[str, Any]:
+        """
+        Runs the 'header' stage.
+
+        Returns:
+            Dict[str, Any]: The decoded header.
+        """
+        try:
+            header = json.loads(b64url_decode(encoded_header))
+        except (ValueError, UnicodeError):
+            raise self.reject("header")
+        if not isinstance(header, dict) or header.get("alg") not in self.algorithms:
+            raise self.reject("header")
+        kid = header.get("kid")
+        if not isinstance(kid, str) or self.KEY_ID.fullmatch(kid) is None:
+            raise self.reject("header")
+        return header
+
+    def check_expiry(self, encoded_payload: str) -> Dict[str, Any]:
+        """
+        Runs the 'expiry' stage.
+
+        Returns:
+            Dict[str, Any]: The decoded, not yet verified, claims.
+        """
+        try:
+            claims = json.loads(b64url_decode(encoded_payload))
+        except (ValueError, UnicodeError):
+            raise self.reject("expiry")
+        exp = claims.get("exp") if isinstance(claims, dict) else None
+        if not isinstance(exp, (int, float)):
+            raise self.reject("expiry")
+        if exp + self.leeway < time.time():
+            raise self.reject("expiry", TokenExpiredException)
+        return claims
+
+
+class TokenVerifier:
+    """
+    Verifies Cognito access and ID tokens locally.
+
+    Tokens are checked against the cached JWKS (RS256 signature) and their 'iss', 'token_use', 'exp'
+    and 'client_id' (access tokens) or 'aud' (ID tokens) claims, without any network call on the
+    request path once the key set is loaded. Malformed and expired tokens are rejected by a
+    TokenPreFilter before any cryptographic work. Verified claims are kept in a VerifiedTokenCache so that
+    tokens presented again skip the signature check, and signatures of cache misses are checked by a
+    SignatureVerifier that moves RSA work off the event loop when it is under pressure. Every verified
+    token, cached or not, is finally checked against a TokenDenylist of revoked tokens, sessions
+    and users.
+    """
+
+    ALGORITHM = "RS256"
+
+    def __init__(self, jwks: Optional[JWKSCache] = None, issuer: Optional[str] = None,
+                 client_id: Optional[str] = None, leeway: Optional[float] = None,
+                 cache: Optional[VerifiedTokenCache] = None, signatures: Optional[SignatureVerifier] = None,
+                 prefilter: Optional[TokenPreFilter] = None, denylist: Optional[TokenDenylist] = None):
+        """
+        Initializes the verifier.
+
+        Args:
+            jwks (Optional[JWKSCache]): The key cache; one for the configured user pool if omitted.
+            issuer (Optional[str]): Expected 'iss' claim; derived from the user pool if omitted.
+            client_id (Optional[str]): Expected app client ID; the configured one if omitted.
+            leeway (Optional[float]): Allowed clock skew in seconds for 'exp'.
+            cache (Optional[VerifiedTokenCache]): Cache of verified claims; a new one if omitted.
+            signatures (Optional[SignatureVerifier]): Signature verifier; a configured one if omitted.
+            prefilter (Optional[TokenPreFilter]): Structural pre-filter; a configured one if omitted.
+            denylist (Optional[TokenDenylist]): Revoked tokens; a configured one if omitted.
+        """
+        self.jwks = jwks or JWKSCache()
+        self.cache = cache if cache is not None else VerifiedTokenCache(recorder=default_recorder())
+        self.signatures = signatures or SignatureVerifier()
+        self.issuer = issuer or default_issuer()
+        self.client_id = client_id or settings.aws_cognito_client_id
+        self.leeway = settings.jwt_leeway if leeway is None else leeway
+        self.prefilter = prefilter or TokenPreFilter(leeway=self.leeway, recorder=default_recorder())
+        self.denylist = denylist or TokenDenylist(recorder=default_recorder())
+
+    async def start(self):
+        """
+        Loads the signing keys and revoked tokens, starts refreshing them in the background and starts
+        the signature verification pool.
+        """
+        self.signatures.start()
+        await self.jwks.start()
+        await self.denylist.start()
+
+    async def close(self):
+        """
+        Stops the background key and revocation refresh and the signature verification pool.
+        """
+        await self.denylist.stop()
+        await self.jwks.stop()
+        await self.signatures.close()
+
+    async def verify(self, token: str, token_use: TokenUse = TokenUse.ACCESS) -> Dict[str, Any]:
+        """
+        Verifies a token and returns its claims.
+
+        Args:
+            token (str): The encoded JWT.
+            token_use (TokenUse): The expected kind of token.
+
+        Returns:
+            Dict[str, Any]: The verified claims.
+
+        Raises:
+            UnauthorizedException: If the token is malformed, not signed by the user pool, not valid
+                for this app client or revoked.
+            TokenExpiredException: If the token has expired.
+        """
+        encoded_header, encoded_payload, encoded_signature = self.prefilter.check_shape(token)
+
+        cache_key = self.cache.digest(token)
+        claims = self.cache.get(cache_key)
+        if claims is not None:
+            self.validate_claims(claims, token_use)
+            self.check_revoked(claims)
+            return claims
+
+        header = self.prefilter.check_header(encoded_header)
+        claims = self.prefilter.check_expiry(encoded_payload)
+
+        key = await self.jwks.get_or_refetch(header["kid"])
+        if key is None:
+            raise self.prefilter.reject("kid")
+        try:
+            signature = b64url_decode(encoded_signature)
+        except ValueError:
+            raise self.prefilter.reject("signature")
+        valid = await self.signatures.verify(key, f"{encoded_header}.{encoded_payload}".encode("ascii"), signature)
+        if not valid:
+            raise self.prefilter.reject("signature")
+
+        try:
+            self.validate_claims(claims, token_use)
+        except UnauthorizedException:
+            self.prefilter.count_reject("claims")
+            raise
+        self.cache.put(cache_key, claims, len(encoded_payload))
+        self.check_revoked(claims)
+        return claims
+
+    def check_revoked(self, claims: Dict[str, Any]):
+        """
+        Raises UnauthorizedException if the token, its session or its user has been revoked.
+        """
+        if self.denylist.is_revoked(claims):
+            raise self.prefilter.reject("revoked")
+
+    async def revoke(self, token: str, scope: RevocationScope = RevocationScope.TOKEN,
+                     token_use: TokenUse = TokenUse.ACCESS):
+        """
+        Stops accepting a token, every token of its session or every token of its user issued so far.
+
+        Args:
+            token (str): The encoded JWT; it must still be valid.
+            scope (RevocationScope): What to revoke.
+            token_use (TokenUse): The kind of token.
+
+        Raises:
+            UnauthorizedException: If the token is not valid.
+            TokenExpiredException: If the token has expired.
+        """
+        claims = await self.verify(token, token_use)
+        if scope == RevocationScope.SESSION and claims.get(scope.value) is None:
+            # Without an 'origin_jti' the token cannot be matched to its session, so only it is revoked
+            scope = RevocationScope.TOKEN
+        value = claims.get(scope.value)
+        if not value:
+            raise UnauthorizedException()
+        if scope == RevocationScope.TOKEN:
+            expires_at = claims["exp"] + self.leeway
+        else:
+            # Tokens issued before now that share the session or user expire within the maximum lifetime
+            expires_at = time.time() + settings.token_revocation_max_lifetime + self.leeway
+        await self.denylist.revoke(scope, value, expires_at)
+        self.cache.invalidate(token)
+
+    def validate_claims(self, claims: Dict[str, Any], token_use: TokenUse):
+        """
+        Validates the registered and Cognito-specific claims of a token.
+
+        Raises:
+            UnauthorizedException: If a claim does not match.
+            TokenExpiredException: If the token has expired.
+        """
+        if not isinstance(claims, dict):
+            raise UnauthorizedException()
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            raise UnauthorizedException()
+        if exp + self.leeway < time.time():
+            raise TokenExpiredException()
+        if claims.get("iss") != self.issuer or claims.get("token_use") != token_use.value:
+            raise UnauthorizedException()
+        audience = claims.get("client_id") if token_use == TokenUse.ACCESS else claims.get("aud")
+        if audience != self.client_id:
+            raise UnauthorizedException()
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Awaitable, Optional, TypeVar
+
+from app.core.metrics import MetricsRecorder
+
+T = TypeVar('T')
+
+
+@dataclass
+class RetryStats:
+    """
+    Counters describing the behaviour of a retry policy.
+
+    Attributes:
+        calls (int): Number of logical calls made through the policy.
+        retries (int): Number of retry attempts performed.
+        recovered (int): Number of calls that succeeded after at least one retry.
+        non_retryable_failures (int): Number of calls that failed with a non-retryable error.
+        attempts_exhausted (int): Number of calls that failed after using all attempts.
+        budget_exhausted (int): Number of retries skipped because the retry budget was empty.
+    """
+    calls: int = 0
+    retries: int = 0
+    recovered: int = 0
+    non_retryable_failures: int = 0
+    attempts_exhausted: int = 0
+    budget_exhausted: int = 0
+
+
+class RetryBudget:
+    """
+    A per-process retry budget that caps retries to a fraction of regular traffic.
+
+    Every call deposits `ratio` tokens and every retry withdraws one, so retries can never exceed
+    roughly `ratio` times the request rate, no matter how many callers fail at once. A small
+    time-based allowance of `min_retries_per_second` keeps retries possible at low traffic.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_retries_per_second: float = 1.0, max_balance: float = 100.0):
+        """
+        Initializes the retry budget.
+
+        Args:
+            ratio (float): Tokens deposited per call, i.e. the allowed retry-to-call ratio.
+            min_retries_per_second (float): Tokens added per second regardless of traffic.
+            max_balance (float): Upper bound on the number of saved tokens.
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_balance = max_balance
+        self._balance = min_retries_per_second
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._balance = min(
+            self.max_balance, self._balance + (now - self._updated_at) * self.min_retries_per_second
+        )
+        self._updated_at = now
+
+    def deposit(self):
+        """
+        Records a call, adding `ratio` tokens to the budget.
+        """
+        self._refill()
+        self._balance = min(self.max_balance, self._balance + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """
+        Attempts to take one token for a retry.
+
+        Returns:
+            bool: True if the retry is allowed.
+        """
+        self._refill()
+        if self._balance >= 1.0:
+            self._balance -= 1.0
+            return True
+        return False
+
+
+class RetryPolicy:
+    """
+    Retries failed asynchronous calls with decorrelated-jitter exponential backoff.
+
+    Only errors accepted by `is_retryable` are retried, and every retry must be paid for by the
+    shared RetryBudget, so that retries cannot amplify an upstream outage into a retry storm.
+
+    Reference: https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, name: str, is_retryable: Callable[[BaseException], bool], max_attempts: int = 3,
+                 base_delay: float = 0.05, max_delay: float = 1.0, budget: RetryBudget = None,
+                 recorder: Optional[MetricsRecorder] = None):
+        """
+        Initializes the retry policy.
+
+        Args:
+            name (str): Name of the upstream, used in logs.
+            is_retryable (Callable[[BaseException], bool]): Classifies errors as retryable.
+            max_attempts (int): Maximum number of attempts, including the first one.
+            base_delay (float): Minimum backoff delay in seconds.
+            max_delay (float): Maximum backoff delay in seconds.
+            budget (RetryBudget): The retry budget shared by all calls of this policy.
+            recorder (Optional[MetricsRecorder]): Records the counters of `stats` as metrics, if given.
+        """
+        self.name = name
+        self.is_retryable = is_retryable
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.stats = RetryStats()
+        self.recorder = recorder
+
+    def _count(self, event: str):
+        setattr(self.stats, event, getattr(self.stats, event) + 1)
+        if self.recorder is not None:
+            self.recorder.observe_retry_event(self.name, event)
+
+    def next_delay(self, previous_delay: float) -> float:
+        """
+        Computes the next decorrelated-jitter backoff delay.
+
+        Args:
+            previous_delay (float): The previous delay in seconds.
+
+        Returns:
+            float: The next delay in seconds.
+        """
+        return min(self.max_delay, random.uniform(self.base_delay, previous_delay * 3))
+
+    async def run(self, func: Callable[[], Awaitable[T]],
+                  is_retryable: Optional[Callable[[BaseException], bool]] = None) -> T:
+        """
+        Runs `func`, retrying retryable failures while attempts and budget remain.
+
+        Args:
+            func (Callable[[], Awaitable[T]]): Zero-argument coroutine function to call.
+            is_retryable (Optional[Callable[[BaseException], bool]]): Classifies the errors of this call,
+                e.g. stricter for non-idempotent operations; the policy's classifier if omitted.
+
+        Returns:
+            T: The result of the first successful attempt.
+        """
+        is_retryable = is_retryable or self.is_retryable
+        self._count("calls")
+        self.budget.deposit()
+        delay = self.base_delay
+        attempt = 1
+        while True:
+            try:
+                result = await func()
+            except Exception as e:
+                if not is_retryable(e):
+                    self._count("non_retryable_failures")
+                    raise
+                if attempt >= self.max_attempts:
+                    self._count("attempts_exhausted")
+                    raise
+                if not self.budget.try_withdraw():
+                    self._count("budget_exhausted")
+                    self.logger.warning("%s retry budget exhausted; not retrying: %s", self.name, e)
+                    raise
+                delay = self.next_delay(delay)
+                self._count("retries")
+                self.logger.warning(
+                    "%s call failed (attempt %d/%d), retrying in %.3fs: %s",
+                    self.name, attempt, self.max_attempts, delay, e
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if attempt > 1:
+                self._count("recovered")
+            return result
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.core.request_context import create_background_task
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop runs scheduled callbacks.
+
+    A background task repeatedly sleeps for `interval` seconds and records how much later than
+    requested it woke up. The lag is smoothed with an exponential moving average so that a single
+    slow callback does not flip decisions based on it.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, interval: float = 0.05, smoothing: float = 0.3):
+        """
+        Initializes the monitor.
+
+        Args:
+            interval (float): Seconds between measurements.
+            smoothing (float): Weight (0-1) of the newest measurement in the moving average.
+        """
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.lag += self.smoothing * (lag - self.lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def start(self):
+        """
+        Starts measuring in the running event loop.
+        """
+        if self._task is None:
+            self._task = create_background_task(self._run())
+
+    async def stop(self):
+        """
+        Stops measuring.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
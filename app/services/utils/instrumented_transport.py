@@ -0,0 +1,163 @@
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.core.metrics import MetricsRecorder
+
+
+def upstream_operation(request: httpx.Request) -> str:
+    """
+    Returns the operation a request performs, used to label its metrics.
+
+    That is the 'operation' request extension if the caller set one, the operation of an AWS JSON
+    protocol request (the part of its X-Amz-Target header after the dot), or the HTTP method.
+    """
+    operation = request.extensions.get("operation")
+    if operation:
+        return operation
+    target = request.headers.get("x-amz-target")
+    if target:
+        return target.rpartition(".")[2]
+    return request.method
+
+
+class _CallTrace:
+    """
+    httpcore trace callback of one request, noting how the connection was made and when the request got it:
+    when it started connecting a new connection, or started sending on a reused one.
+    """
+
+    __slots__ = ("started", "connected", "new_connection", "tls_started", "tls_handshake")
+
+    def __init__(self, started: float):
+        self.started = started
+        self.connected: Optional[float] = None
+        self.new_connection = False
+        self.tls_started: Optional[float] = None
+        self.tls_handshake: Optional[float] = None
+
+    async def __call__(self, event: str, info: Dict[str, Any]):
+        if event == "connection.connect_tcp.started":
+            self.new_connection = True
+            if self.connected is None:
+                self.connected = time.perf_counter()
+        elif event == "connection.start_tls.started":
+            self.tls_started = time.perf_counter()
+        elif event == "connection.start_tls.complete" and self.tls_started is not None:
+            self.tls_handshake = time.perf_counter() - self.tls_started
+        elif event.endswith(".send_request_headers.started") and self.connected is None:
+            self.connected = time.perf_counter()
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """
+    Response body stream counting the bytes received, which records the call once the body is closed.
+    """
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close):
+        self.stream = stream
+        self.on_close = on_close
+        self.received = 0
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            self.received += len(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self.stream.aclose()
+        finally:
+            if self.on_close is not None:
+                self.on_close(self.received)
+                self.on_close = None
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport recording metrics for every upstream call made through a connection pool.
+
+    Per call it records the latency, status code and bytes sent and received, labelled by upstream
+    and operation. Per connection it records the time spent waiting for the pool (until the request
+    started connecting a new connection or sending on a reused one; connecting itself is not
+    included), whether it was newly opened or reused from the pool, and the TLS handshake time. Connection events come from httpcore's
+    request tracing. Transports register under their upstream name so that `pool_states` can
+    describe the live pools.
+    """
+
+    _instances: "weakref.WeakValueDictionary[str, InstrumentedTransport]" = weakref.WeakValueDictionary()
+
+    def __init__(self, upstream: str, recorder: MetricsRecorder, limits: httpx.Limits = httpx.Limits(),
+                 **transport_options: Any):
+        """
+        Initializes the transport.
+
+        Args:
+            upstream (str): The upstream name the metrics are labelled with, e.g. 'cognito'.
+            recorder (MetricsRecorder): The recorder of the metrics.
+            limits (httpx.Limits): The connection pool limits.
+            **transport_options (Any): Further keyword arguments for httpx.AsyncHTTPTransport.
+        """
+        self.upstream = upstream
+        self.recorder = recorder
+        self.limits = limits
+        self.transport = httpx.AsyncHTTPTransport(limits=limits, **transport_options)
+        self._instances[upstream] = self
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        trace = _CallTrace(started)
+        request.extensions["trace"] = trace
+        operation = upstream_operation(request)
+        bytes_sent = int(request.headers.get("content-length", 0))
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            self.recorder.observe_upstream_call(
+                self.upstream, operation, "error", time.perf_counter() - started, bytes_sent, 0
+            )
+            raise
+
+        connected = trace.connected if trace.connected is not None else time.perf_counter()
+        self.recorder.observe_upstream_connection(
+            self.upstream, not trace.new_connection, connected - started, trace.tls_handshake
+        )
+
+        def record(bytes_received: int):
+            self.recorder.observe_upstream_call(
+                self.upstream, operation, response.status_code, time.perf_counter() - started,
+                bytes_sent, bytes_received,
+            )
+
+        response.stream = _CountingStream(response.stream, record)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    def pool_state(self) -> Dict[str, Any]:
+        """
+        Describes the live connection pool: its limits, its connections and the requests waiting for one.
+        """
+        pool = self.transport._pool
+        connections = list(pool.connections)
+        return {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "connections": len(connections),
+            "idle": sum(1 for connection in connections if connection.is_idle()),
+            "available": sum(1 for connection in connections if connection.is_available()),
+            "queued_requests": sum(1 for request in getattr(pool, "_requests", []) if request.is_queued()),
+            "connection_info": [connection.info() for connection in connections],
+        }
+
+    @classmethod
+    def pool_states(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Describes the live connection pools of all instrumented transports, by upstream name.
+        """
+        return {upstream: transport.pool_state() for upstream, transport in list(cls._instances.items())}
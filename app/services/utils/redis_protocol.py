@@ -0,0 +1,176 @@
+import asyncio
+import ssl
+from typing import Any, List, Sequence, Union
+from urllib.parse import unquote, urlsplit
+
+Command = Sequence[Union[bytes, str, int]]
+
+
+class RedisError(Exception):
+    """
+    Error reply of a Redis-protocol server, or a malformed reply.
+    """
+
+
+def encode_command(command: Command) -> bytes:
+    """
+    Encodes a command as a RESP array of bulk strings.
+
+    Args:
+        command (Command): The command name and its arguments.
+
+    Returns:
+        bytes: The encoded command.
+    """
+    parts = [b"*%d\r\n" % len(command)]
+    for argument in command:
+        if isinstance(argument, str):
+            argument = argument.encode()
+        elif isinstance(argument, int):
+            argument = b"%d" % argument
+        parts.append(b"$%d\r\n%s\r\n" % (len(argument), argument))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """
+    Reads one RESP2 reply.
+
+    Returns:
+        Any: The reply: bytes for simple and bulk strings, int, None for null replies, or a list.
+
+    Raises:
+        RedisError: If the reply is an error reply or malformed.
+    """
+    line = await reader.readuntil(b"\r\n")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    if kind == b"-":
+        raise RedisError(payload.decode(errors="replace"))
+    raise RedisError(f"Malformed reply {line[:32]!r}")
+
+
+class RedisConnection:
+    """
+    One connection to a Redis-protocol server, executing pipelines of commands.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def execute(self, commands: Sequence[Command]) -> List[Any]:
+        """
+        Sends the commands in one write and reads their replies (a pipeline: one round trip).
+
+        Error replies are returned in place as RedisError instances, so that the connection stays in
+        sync with the server; failing to read a reply raises and leaves the connection unusable.
+        """
+        self.writer.write(b"".join(encode_command(command) for command in commands))
+        await self.writer.drain()
+        replies = []
+        for _ in commands:
+            try:
+                replies.append(await read_reply(self.reader))
+            except RedisError as error:
+                replies.append(error)
+        return replies
+
+    def close(self):
+        self.writer.close()
+
+
+class RedisClient:
+    """
+    Minimal asyncio client of the Redis protocol (RESP2), without dependencies.
+
+    It supports pipelines of plain commands, which is all the rate limiter needs, and works with Redis,
+    Valkey, KeyDB or any local stand-in speaking the protocol. Connections are opened on demand up to
+    `pool_size` and reused; a connection on which a call fails or times out is discarded, since the
+    state of its replies is unknown.
+    """
+
+    def __init__(self, url: str, pool_size: int = 10, timeout: float = 1.0):
+        """
+        Initializes the client; no connection is opened until the first call.
+
+        Args:
+            url (str): 'redis://[[user]:password@]host[:port][/db]', or 'rediss://...' for TLS.
+            pool_size (int): Maximum number of open connections.
+            timeout (float): Seconds a call (including connecting) may take.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("redis", "rediss"):
+            raise ValueError(f"Unsupported Redis URL scheme: {parts.scheme!r}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.ssl = ssl.create_default_context() if parts.scheme == "rediss" else None
+        self.username = unquote(parts.username) if parts.username else None
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._idle: List[RedisConnection] = []
+        self._slots = asyncio.Semaphore(pool_size)
+
+    async def _connect(self) -> RedisConnection:
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        connection = RedisConnection(reader, writer)
+        setup: List[Command] = []
+        if self.password is not None:
+            setup.append(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            for reply in await connection.execute(setup):
+                if isinstance(reply, RedisError):
+                    connection.close()
+                    raise reply
+        return connection
+
+    async def _execute(self, commands: Sequence[Command]) -> List[Any]:
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            try:
+                replies = await connection.execute(commands)
+            except BaseException:
+                connection.close()
+                raise
+            self._idle.append(connection)
+            return replies
+
+    async def execute(self, *commands: Command) -> List[Any]:
+        """
+        Executes the commands as one pipeline.
+
+        Args:
+            *commands (Command): The commands, e.g. ('INCR', 'key').
+
+        Returns:
+            List[Any]: The reply of each command; error replies as RedisError instances.
+
+        Raises:
+            OSError: If the server cannot be reached or the connection breaks.
+            asyncio.TimeoutError: If the call takes longer than the timeout.
+        """
+        return await asyncio.wait_for(self._execute(commands), self.timeout)
+
+    async def close(self):
+        """
+        Closes the idle connections.
+        """
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.core.metrics import MetricsRecorder
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    The first caller for a key starts the call in its own task; callers arriving while it is in
+    flight await the same task and receive the same result or exception. Successful results are
+    kept for `linger` seconds after completion so that late arrivals can reuse them as well.
+    Cancelling one caller does not cancel the shared call for the others.
+    """
+
+    def __init__(self, linger: float = 0.0, max_results: int = 10000, name: str = "default",
+                 recorder: Optional[MetricsRecorder] = None):
+        """
+        Initializes the coalescer.
+
+        Args:
+            linger (float): Seconds a successful result is reused after the call completes.
+            max_results (int): Maximum number of lingering results kept in memory.
+            name (str): Name of the coalescer in metrics.
+            recorder (Optional[MetricsRecorder]): Records `calls` and `shared` as metrics, if given.
+        """
+        self.linger = linger
+        self.max_results = max_results
+        self.calls = 0
+        self.shared = 0
+        self.name = name
+        self.recorder = recorder
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._results: Dict[str, Tuple[float, Any]] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `func` unless a call with the same key is in flight or has just completed.
+
+        Args:
+            key (str): The coalescing key.
+            func (Callable[[], Awaitable[T]]): Zero-argument coroutine function to call.
+
+        Returns:
+            T: The result of the (possibly shared) call.
+        """
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._count(shared=True)
+                return cached[1]
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        self._count(shared=task is not None)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._complete(key, done))
+        return await asyncio.shield(task)
+
+    def _count(self, shared: bool):
+        self.calls += 1
+        if shared:
+            self.shared += 1
+        if self.recorder is not None:
+            self.recorder.observe_singleflight(self.name, shared)
+
+    def in_flight(self, key: str) -> bool:
+        """
+        Returns True if a call with the given key is currently in flight.
+        """
+        return key in self._inflight
+
+    def _complete(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None or self.linger <= 0:
+            return
+        if len(self._results) >= self.max_results:
+            self._prune()
+        self._results[key] = (time.monotonic() + self.linger, task.result())
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._results.items() if expires_at <= now]:
+            del self._results[key]
+        while len(self._results) >= self.max_results:
+            del self._results[next(iter(self._results))]
@@ -0,0 +1,44 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+import httpx
+import pytest
+
+from app.api.dependencies import auth
+from app.services.aws.cognito.signature_verification import PoolKind, SignatureVerifier, VerificationMode
+from app.services.aws.cognito.token_management import JWKSCache, RevocationStore, TokenDenylist, TokenVerifier
+
+
+class UnavailableRevocationStore(RevocationStore):
+    """
+    Revocation store whose reads always fail.
+    """
+
+    async def add(self, key: str, revoked_at: float, expires_at: float):
+        pass
+
+    async def entries(self, since: Optional[float] = None) -> List[Tuple[str, float, float]]:
+        raise RuntimeError("store unavailable")
+
+
+def new_verifier() -> TokenVerifier:
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+    return TokenVerifier(
+        jwks=JWKSCache(jwks_url="https://cognito-idp.test/.well-known/jwks.json", http_client=http_client),
+        issuer="https://cognito-idp.test", client_id="client-id",
+        signatures=SignatureVerifier(mode=VerificationMode.ADAPTIVE, pool_kind=PoolKind.THREAD, workers=1),
+        denylist=TokenDenylist(store=UnavailableRevocationStore(), sync_interval=0),
+    )
+
+
+def test_failed_start_stops_started_background_tasks(monkeypatch):
+    monkeypatch.setattr(auth, "TokenVerifier", new_verifier)
+
+    async def scenario():
+        tasks = asyncio.all_tasks()
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await auth.create_token_verifier()
+        assert asyncio.all_tasks() == tasks
+
+    asyncio.run(scenario())
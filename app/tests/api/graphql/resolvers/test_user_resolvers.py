@@ -0,0 +1,69 @@
+from app.core.config import get_settings
+from app.services.aws.cognito.identity_provider import compute_secret_hash
+from app.tests.conftest import VALID_ACCESS_TOKEN
+
+
+def test_change_password_uses_access_token_argument(graphql, fake_cognito):
+    result = graphql(
+        'mutation { changePassword(access_token: "%s", previous_password: "old-password", '
+        'proposed_password: "new-password") { message } }' % VALID_ACCESS_TOKEN
+    )
+
+    assert "errors" not in result
+    assert result["data"]["changePassword"]["message"]
+    assert fake_cognito.calls == [("ChangePassword", {
+        "PreviousPassword": "old-password", "ProposedPassword": "new-password", "AccessToken": VALID_ACCESS_TOKEN,
+    })]
+
+
+def test_change_password_rejects_invalid_access_token(graphql, fake_cognito):
+    result = graphql(
+        'mutation { changePassword(access_token: "forged", previous_password: "old-password", '
+        'proposed_password: "new-password") { message } }'
+    )
+
+    assert result["data"] is None
+    assert "2007" in result["errors"][0]["message"]
+    assert fake_cognito.calls == []
+
+
+def test_update_user_attributes_maps_attribute_list(graphql, fake_cognito):
+    result = graphql(
+        'mutation { updateUserAttributes(access_token: "%s", attributes: ['
+        '{name: "given_name", value: "Ada"}, {name: "family_name", value: "Lovelace"}]) { message } }'
+        % VALID_ACCESS_TOKEN
+    )
+
+    assert "errors" not in result
+    operation, payload = fake_cognito.calls[0]
+    assert operation == "UpdateUserAttributes"
+    assert payload == {
+        "UserAttributes": [{"Name": "given_name", "Value": "Ada"}, {"Name": "family_name", "Value": "Lovelace"}],
+        "AccessToken": VALID_ACCESS_TOKEN,
+    }
+
+
+def test_login_challenge_is_reported_as_typed_error(graphql, fake_cognito):
+    fake_cognito.responses["InitiateAuth"] = {"ChallengeName": "NEW_PASSWORD_REQUIRED", "Session": "session"}
+
+    result = graphql('mutation { login(username: "challenged", password: "password") { access_token } }')
+
+    assert result["data"] is None
+    assert "2009" in result["errors"][0]["message"]
+    assert "NEW_PASSWORD_REQUIRED" in result["errors"][0]["message"]
+
+
+def test_refresh_token_passes_username_for_secret_hash(graphql, fake_cognito, monkeypatch):
+    config = get_settings()
+    monkeypatch.setattr(config, "aws_cognito_client_secret", "client-secret")
+    fake_cognito.responses["InitiateAuth"] = {"AuthenticationResult": {"AccessToken": "access"}}
+
+    result = graphql('mutation { refreshToken(refresh_token: "resolver-refresh", username: "alice") { access_token } }')
+
+    assert "errors" not in result
+    operation, payload = fake_cognito.calls[0]
+    assert operation == "InitiateAuth"
+    assert payload["AuthParameters"] == {
+        "REFRESH_TOKEN": "resolver-refresh", "USERNAME": "alice",
+        "SECRET_HASH": compute_secret_hash("alice", config.aws_cognito_client_id, "client-secret"),
+    }
@@ -0,0 +1,75 @@
+import time
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.exceptions import UnauthorizedException
+from app.services.aws.cognito.identity_provider import CognitoIdentityProviderClient
+from app.services.aws.cognito.token_management import TokenUse, TokenVerifier
+
+VALID_ACCESS_TOKEN = "valid-access-token"
+
+
+class FakeCognito:
+    """
+    Stand-in for the Cognito Identity Provider API, recording the operations called and answering
+    with canned responses.
+    """
+
+    def __init__(self):
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self.responses: Dict[str, Dict[str, Any]] = {}
+
+    async def invoke(self, operation: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls.append((operation, payload))
+        return self.responses.get(operation, {})
+
+
+@pytest.fixture
+def fake_cognito(monkeypatch) -> FakeCognito:
+    """
+    Routes every Cognito call of the application to a FakeCognito.
+    """
+    cognito = FakeCognito()
+
+    async def invoke(self, operation: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await cognito.invoke(operation, payload)
+
+    monkeypatch.setattr(CognitoIdentityProviderClient, "invoke", invoke)
+    return cognito
+
+
+@pytest.fixture
+def fake_token_verifier(monkeypatch):
+    """
+    Accepts VALID_ACCESS_TOKEN as the access token of 'user-1' without fetching signing keys.
+    """
+    async def start(self):
+        pass
+
+    async def verify(self, token: str, token_use: TokenUse = TokenUse.ACCESS) -> Dict[str, Any]:
+        if token != VALID_ACCESS_TOKEN:
+            raise UnauthorizedException()
+        now = int(time.time())
+        return {"sub": "user-1", "jti": "jti-1", "iat": now, "exp": now + 3600, "token_use": token_use.value}
+
+    monkeypatch.setattr(TokenVerifier, "start", start)
+    monkeypatch.setattr(TokenVerifier, "verify", verify)
+
+
+@pytest.fixture
+def graphql(fake_cognito, fake_token_verifier):
+    """
+    Returns a function posting a GraphQL query to the application and returning the response body.
+    """
+    from app.main import app
+
+    client = TestClient(app)
+
+    def execute(query: str, headers: Dict[str, str] = None) -> Dict[str, Any]:
+        response = client.post("/graphql", json={"query": query}, headers=headers or {})
+        assert response.status_code == 200
+        return response.json()
+
+    return execute
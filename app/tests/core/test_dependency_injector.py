@@ -0,0 +1,89 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from app.core.dependency_injector import DependencyInjector, ScopeNotActiveError, ServiceScope
+
+
+class Connection:
+    def __init__(self):
+        self.closed: List[str] = []
+
+    def close(self):
+        self.closed.append("connection")
+
+
+class Repository:
+    def __init__(self, connection: Connection):
+        self.connection = connection
+
+    async def aclose(self):
+        self.connection.closed.append("repository")
+
+
+def new_injector() -> DependencyInjector:
+    injector = DependencyInjector()
+    injector.register(Connection, Connection, scope=ServiceScope.SCOPED)
+    injector.register(Repository, Repository, scope=ServiceScope.SCOPED)
+    return injector
+
+
+def test_scoped_service_is_shared_within_a_scope():
+    async def scenario():
+        injector = new_injector()
+        async with injector.scope():
+            repository = injector.resolve(Repository)
+
+            assert injector.resolve(Repository) is repository
+            assert await injector.resolve_async(Connection) is repository.connection
+
+    asyncio.run(scenario())
+
+
+def test_scopes_get_their_own_instances():
+    async def scenario():
+        injector = new_injector()
+        async with injector.scope():
+            first = injector.resolve(Repository)
+            # A nested scope, e.g. of a background task, is independent of the request's scope
+            async with injector.scope():
+                nested = injector.resolve(Repository)
+            assert injector.resolve(Repository) is first
+        async with injector.scope():
+            second = injector.resolve(Repository)
+
+        assert nested is not first and second is not first
+        assert second.connection is not first.connection
+
+    asyncio.run(scenario())
+
+
+def test_scoped_instances_are_disposed_on_exit_in_reverse_order():
+    async def scenario():
+        injector = new_injector()
+        async with injector.scope() as scope:
+            connection = injector.resolve(Repository).connection
+            assert connection.closed == []
+
+        assert connection.closed == ["repository", "connection"]
+        assert scope.instances == {}
+
+    asyncio.run(scenario())
+
+
+def test_scoped_service_cannot_be_resolved_outside_a_scope():
+    async def scenario():
+        injector = new_injector()
+        with pytest.raises(ScopeNotActiveError):
+            injector.resolve(Repository)
+        with pytest.raises(ScopeNotActiveError):
+            await injector.resolve_async(Connection)
+
+        async with injector.scope():
+            injector.resolve(Repository)
+        # The scope is reset on exit
+        with pytest.raises(ScopeNotActiveError):
+            injector.resolve(Repository)
+
+    asyncio.run(scenario())
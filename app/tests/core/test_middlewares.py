@@ -0,0 +1,34 @@
+import asyncio
+
+from app.core.dependency_injector import DependencyInjector, ServiceScope
+from app.core.middlewares import DependencyScopeMiddleware
+
+
+class RequestContext:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_dependency_scope_middleware_opens_a_scope_per_request():
+    injector = DependencyInjector()
+    injector.register(RequestContext, RequestContext, scope=ServiceScope.SCOPED)
+    contexts = []
+
+    async def app(scope, receive, send):
+        context = injector.resolve(RequestContext)
+        assert injector.resolve(RequestContext) is context
+        contexts.append(context)
+
+    async def scenario():
+        middleware = DependencyScopeMiddleware(app, injector=injector)
+        for _ in range(2):
+            await middleware({"type": "http"}, None, None)
+
+    asyncio.run(scenario())
+
+    first, second = contexts
+    assert first is not second
+    assert first.closed and second.closed
@@ -0,0 +1,91 @@
+import asyncio
+
+from app.core import rate_limit
+from app.core.rate_limit import (
+    InMemoryRateLimitStore, KeyType, RateLimit, RedisRateLimitStore, SlidingWindowRateLimiter, WindowHit
+)
+from app.services.utils.redis_protocol import RedisClient
+from app.tests.services.utils.test_redis_protocol import RespStandIn
+
+
+LOGIN_LIMITS = {"login": {KeyType.IP: RateLimit(10, 60), KeyType.USERNAME: RateLimit(3, 60)}}
+
+
+async def hit_login(limiter: SlidingWindowRateLimiter, username: str, ip: str = "192.0.2.1"):
+    return await limiter.hit("login", {KeyType.IP: ip, KeyType.USERNAME: username})
+
+
+async def check_limits(store):
+    limiter = SlidingWindowRateLimiter(store=store, limits=LOGIN_LIMITS)
+
+    assert [await hit_login(limiter, "alice") for _ in range(3)] == [None, None, None]
+    exceeded = await hit_login(limiter, "alice")
+    assert exceeded.key_type == KeyType.USERNAME and exceeded.retry_after > 0
+    # Other usernames are limited separately, but still count against the address
+    assert await hit_login(limiter, "bob") is None
+    assert [await hit_login(limiter, f"user-{index}") for index in range(6)][-1].key_type == KeyType.IP
+    assert await limiter.hit("signUp", {KeyType.IP: "192.0.2.1"}) is None
+
+
+def test_rate_limiter_with_memory_store():
+    asyncio.run(check_limits(InMemoryRateLimitStore(shards=4, max_entries=1000)))
+
+
+def test_rate_limiter_with_resp_store():
+    async def scenario():
+        server = RespStandIn()
+        port = await server.start()
+        store = RedisRateLimitStore(RedisClient(f"redis://:secret@127.0.0.1:{port}/2", pool_size=2, timeout=1.0))
+        try:
+            await check_limits(store)
+        finally:
+            await store.close()
+            await server.stop()
+        assert server.ttls and all(ttl == 120 for ttl in server.ttls.values())
+
+    asyncio.run(scenario())
+
+
+def test_rate_limiter_lets_requests_through_when_store_fails():
+    async def scenario():
+        server = RespStandIn()
+        port = await server.start()
+        store = RedisRateLimitStore(RedisClient(f"redis://:wrong@127.0.0.1:{port}", timeout=1.0))
+        limiter = SlidingWindowRateLimiter(store=store, limits={"login": {KeyType.USERNAME: RateLimit(0, 60)}})
+        try:
+            assert await limiter.hit("login", {KeyType.USERNAME: "alice"}) is None
+        finally:
+            await store.close()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_rate_limiter_weights_previous_window(monkeypatch):
+    async def scenario():
+        now = [600.0]
+        monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+        limiter = SlidingWindowRateLimiter(store=InMemoryRateLimitStore(shards=1, max_entries=100),
+                                           limits={"login": {KeyType.USERNAME: RateLimit(4, 60)}})
+        for _ in range(4):
+            assert await limiter.hit("login", {KeyType.USERNAME: "alice"}) is None
+
+        # A quarter into the next window, three quarters of the previous window still count: 3 + 1
+        now[0] = 675.0
+        assert await limiter.hit("login", {KeyType.USERNAME: "alice"}) is None
+        assert await limiter.hit("login", {KeyType.USERNAME: "alice"}) is not None
+        # Once the previous window has decayed enough, requests are allowed again
+        now[0] = 705.0
+        assert await limiter.hit("login", {KeyType.USERNAME: "alice"}) is None
+
+    asyncio.run(scenario())
+
+
+def test_memory_store_stays_within_max_entries():
+    async def scenario():
+        store = InMemoryRateLimitStore(shards=1, max_entries=64)
+        for index in range(1000):
+            await store.hit([WindowHit(b"key-%d" % index, 10, 60)])
+        assert len(store) <= 64
+
+    asyncio.run(scenario())
@@ -0,0 +1,196 @@
+import asyncio
+import json
+from typing import Any, Callable, Dict, List
+
+import httpx
+import pytest
+
+from app.api.models.auth_models import LoginRequest, SignUpRequest, TokenRefreshRequest
+from app.core.exceptions import AuthChallengeRequiredException, AuthenticationFailedException
+from app.services.aws.cognito.auth import CognitoService
+from app.services.aws.cognito.identity_provider import (
+    CognitoIdentityProviderClient, CognitoIdentityProviderError, compute_secret_hash
+)
+
+ENDPOINT = "https://cognito-idp.test/"
+
+
+class FakeCognitoEndpoint:
+    """
+    Fake Cognito Identity Provider endpoint for an httpx.MockTransport, recording the requests and
+    answering each operation through a handler.
+    """
+
+    def __init__(self):
+        self.requests: List[httpx.Request] = []
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], httpx.Response]] = {}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        operation = request.headers["X-Amz-Target"].rsplit(".", 1)[-1]
+        handler = self.handlers.get(operation)
+        if handler is None:
+            return httpx.Response(200, json={})
+        return handler(json.loads(request.content))
+
+    def operations(self) -> List[str]:
+        return [request.headers["X-Amz-Target"].rsplit(".", 1)[-1] for request in self.requests]
+
+
+@pytest.fixture
+def endpoint() -> FakeCognitoEndpoint:
+    return FakeCognitoEndpoint()
+
+
+def new_service(endpoint: FakeCognitoEndpoint) -> CognitoService:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(endpoint))
+    return CognitoService(client=client, base_url=ENDPOINT, client_id="client-id", client_secret="client-secret")
+
+
+def test_invoke_sends_json_1_1_request(endpoint):
+    async def scenario():
+        endpoint.handlers["GetUser"] = lambda body: httpx.Response(200, json={"Username": "alice"})
+        client = CognitoIdentityProviderClient(
+            httpx.AsyncClient(transport=httpx.MockTransport(endpoint)), ENDPOINT, "client-id"
+        )
+
+        response = await client.invoke("GetUser", {"AccessToken": "token"})
+
+        request = endpoint.requests[0]
+        assert response == {"Username": "alice"}
+        assert request.method == "POST" and str(request.url) == ENDPOINT
+        assert request.headers["X-Amz-Target"] == "AWSCognitoIdentityProviderService.GetUser"
+        assert request.headers["Content-Type"] == "application/x-amz-json-1.1"
+        assert json.loads(request.content) == {"AccessToken": "token"}
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("response, error_type", [
+    (httpx.Response(400, json={"__type": "com.amazonaws#NotAuthorizedException", "message": "No"}),
+     "NotAuthorizedException"),
+    (httpx.Response(400, headers={"x-amzn-ErrorType": "UserNotFoundException:http://internal"}, content=b""),
+     "UserNotFoundException"),
+    (httpx.Response(503, content=b"unavailable"), "InternalErrorException"),
+])
+def test_invoke_raises_typed_errors(endpoint, response, error_type):
+    async def scenario():
+        endpoint.handlers["GetUser"] = lambda body: response
+        client = CognitoIdentityProviderClient(
+            httpx.AsyncClient(transport=httpx.MockTransport(endpoint)), ENDPOINT, "client-id"
+        )
+
+        with pytest.raises(CognitoIdentityProviderError) as raised:
+            await client.invoke("GetUser", {})
+        assert raised.value.error_type == error_type
+        assert raised.value.status_code == response.status_code
+
+    asyncio.run(scenario())
+
+
+def test_login_sends_secret_hash_and_returns_tokens(endpoint):
+    async def scenario():
+        endpoint.handlers["InitiateAuth"] = lambda body: httpx.Response(200, json={
+            "AuthenticationResult": {"AccessToken": "access", "RefreshToken": "refresh", "IdToken": "id"}
+        })
+
+        response = await new_service(endpoint).login(LoginRequest(username="alice", password="password"))
+
+        body = json.loads(endpoint.requests[0].content)
+        assert response.access_token == "access" and response.refresh_token == "refresh"
+        assert body["ClientId"] == "client-id"
+        assert body["AuthFlow"] == "USER_PASSWORD_AUTH"
+        assert body["AuthParameters"]["USERNAME"] == "alice"
+        assert body["AuthParameters"]["SECRET_HASH"] == compute_secret_hash("alice", "client-id", "client-secret")
+
+    asyncio.run(scenario())
+
+
+def test_refresh_sends_secret_hash_of_given_username(endpoint):
+    async def scenario():
+        endpoint.handlers["InitiateAuth"] = lambda body: httpx.Response(200, json={
+            "AuthenticationResult": {"AccessToken": "access", "IdToken": "id"}
+        })
+
+        request = TokenRefreshRequest(refresh_token="client-refresh", username="alice")
+        response = await new_service(endpoint).refresh_token(request)
+
+        body = json.loads(endpoint.requests[0].content)
+        assert response.access_token == "access"
+        assert body["AuthFlow"] == "REFRESH_TOKEN_AUTH"
+        assert body["AuthParameters"] == {
+            "REFRESH_TOKEN": "client-refresh", "USERNAME": "alice",
+            "SECRET_HASH": compute_secret_hash("alice", "client-id", "client-secret"),
+        }
+
+    asyncio.run(scenario())
+
+
+def test_login_challenge_raises_typed_error(endpoint):
+    async def scenario():
+        endpoint.handlers["InitiateAuth"] = lambda body: httpx.Response(200, json={
+            "ChallengeName": "NEW_PASSWORD_REQUIRED", "Session": "session", "ChallengeParameters": {}
+        })
+
+        with pytest.raises(AuthChallengeRequiredException) as raised:
+            await new_service(endpoint).login(LoginRequest(username="alice", password="password"))
+        assert raised.value.detail["code"] == "2009"
+        assert raised.value.detail["support_code"] == "NEW_PASSWORD_REQUIRED"
+
+    asyncio.run(scenario())
+
+
+def test_cognito_errors_map_to_app_exceptions(endpoint):
+    async def scenario():
+        endpoint.handlers["InitiateAuth"] = lambda body: httpx.Response(
+            400, json={"__type": "NotAuthorizedException", "message": "Incorrect username or password."}
+        )
+
+        with pytest.raises(AuthenticationFailedException):
+            await new_service(endpoint).login(LoginRequest(username="alice", password="wrong-password"))
+        assert endpoint.operations() == ["InitiateAuth"]
+
+    asyncio.run(scenario())
+
+
+def test_read_errors_are_retried_for_idempotent_operations_only(endpoint):
+    async def scenario():
+        attempts = {"InitiateAuth": 0}
+
+        def flaky_login(body):
+            attempts["InitiateAuth"] += 1
+            if attempts["InitiateAuth"] == 1:
+                raise httpx.ReadError("connection reset")
+            return httpx.Response(200, json={"AuthenticationResult": {"AccessToken": "access"}})
+
+        def failing_sign_up(body):
+            raise httpx.ReadError("connection reset")
+
+        endpoint.handlers["InitiateAuth"] = flaky_login
+        endpoint.handlers["SignUp"] = failing_sign_up
+        service = new_service(endpoint)
+
+        assert (await service.login(LoginRequest(username="alice", password="password"))).access_token == "access"
+        with pytest.raises(Exception):
+            await service.sign_up(SignUpRequest(username="bob", password="password", email="bob@example.com"))
+
+        # The sign-up may have been applied before the connection broke, so it is not sent again
+        assert endpoint.operations() == ["InitiateAuth", "InitiateAuth", "SignUp"]
+
+    asyncio.run(scenario())
+
+
+def test_throttled_non_idempotent_operations_are_retried(endpoint):
+    async def scenario():
+        responses = [
+            httpx.Response(400, json={"__type": "TooManyRequestsException", "message": "Too many requests"}),
+            httpx.Response(200, json={"UserConfirmed": False, "UserSub": "sub-1"}),
+        ]
+        endpoint.handlers["SignUp"] = lambda body: responses.pop(0)
+
+        await new_service(endpoint).sign_up(SignUpRequest(username="bob", password="password", email="bob@example.com"))
+
+        # A throttled request was not applied, so sending it again cannot apply it twice
+        assert endpoint.operations() == ["SignUp", "SignUp"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,234 @@
+import asyncio
+import base64
+import json
+import time
+from typing import Any, Dict
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from app.core.config import get_settings
+from app.core.exceptions import TokenExpiredException, UnauthorizedException
+from app.services.aws.cognito.signature_verification import SignatureVerifier, VerificationMode
+from app.services.aws.cognito.token_management import (
+    InMemoryRevocationStore, JWKSCache, RevocationScope, TokenDenylist, TokenUse, TokenVerifier, default_issuer,
+    default_jwks_url
+)
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_pool"
+CLIENT_ID = "client-id"
+KID = "key-1"
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+@pytest.fixture(scope="module")
+def signing_key() -> rsa.RSAPrivateKey:
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def encode_token(key: rsa.RSAPrivateKey, claims: Dict[str, Any], kid: str = KID) -> str:
+    header = b64url(json.dumps({"alg": "RS256", "kid": kid}).encode())
+    payload = b64url(json.dumps(claims).encode())
+    signature = key.sign(f"{header}.{payload}".encode("ascii"), padding.PKCS1v15(), hashes.SHA256())
+    return f"{header}.{payload}.{b64url(signature)}"
+
+
+def access_claims(**overrides) -> Dict[str, Any]:
+    now = int(time.time())
+    claims = {
+        "sub": "user-1", "jti": "jti-1", "origin_jti": "origin-1", "iss": ISSUER, "client_id": CLIENT_ID,
+        "token_use": "access", "iat": now, "exp": now + 3600,
+    }
+    claims.update(overrides)
+    return claims
+
+
+def new_denylist(store: InMemoryRevocationStore = None) -> TokenDenylist:
+    return TokenDenylist(store=store or InMemoryRevocationStore(), sync_interval=0)
+
+
+def new_verifier(signing_key: rsa.RSAPrivateKey, denylist: TokenDenylist = None) -> TokenVerifier:
+    numbers = signing_key.public_key().public_numbers()
+    jwks = {"keys": [{
+        "kty": "RSA", "kid": KID, "alg": "RS256", "use": "sig",
+        "n": b64url(numbers.n.to_bytes((numbers.n.bit_length() + 7) // 8, "big")),
+        "e": b64url(numbers.e.to_bytes(3, "big")),
+    }]}
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=jwks)))
+    return TokenVerifier(
+        jwks=JWKSCache(jwks_url=f"{ISSUER}/.well-known/jwks.json", http_client=http_client),
+        issuer=ISSUER, client_id=CLIENT_ID, leeway=0,
+        signatures=SignatureVerifier(mode=VerificationMode.INLINE),
+        denylist=denylist or new_denylist(),
+    )
+
+
+def test_verify_accepts_valid_token_and_caches_claims(signing_key):
+    async def scenario():
+        verifier = new_verifier(signing_key)
+        await verifier.jwks.load()
+        token = encode_token(signing_key, access_claims())
+
+        claims = await verifier.verify(token)
+        cached = await verifier.verify(token)
+
+        assert claims["sub"] == "user-1"
+        assert cached == claims
+        assert verifier.cache.stats.hits == 1
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("claims, stage", [
+    (access_claims(iss="https://cognito-idp.us-east-1.amazonaws.com/other"), "claims"),
+    (access_claims(client_id="other-client"), "claims"),
+    (access_claims(token_use="id"), "claims"),
+])
+def test_verify_rejects_foreign_claims(signing_key, claims, stage):
+    async def scenario():
+        verifier = new_verifier(signing_key)
+        await verifier.jwks.load()
+        with pytest.raises(UnauthorizedException):
+            await verifier.verify(encode_token(signing_key, claims))
+        assert verifier.prefilter.rejects[stage] == 1
+
+    asyncio.run(scenario())
+
+
+def test_verify_rejects_malformed_expired_and_forged_tokens(signing_key):
+    async def scenario():
+        verifier = new_verifier(signing_key)
+        await verifier.jwks.load()
+        other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+        with pytest.raises(UnauthorizedException):
+            await verifier.verify("not-a-jwt")
+        with pytest.raises(TokenExpiredException):
+            await verifier.verify(encode_token(signing_key, access_claims(exp=int(time.time()) - 10)))
+        with pytest.raises(UnauthorizedException):
+            await verifier.verify(encode_token(other_key, access_claims()))
+        with pytest.raises(UnauthorizedException):
+            await verifier.verify(encode_token(signing_key, access_claims(), kid="unknown"))
+
+        rejects = verifier.prefilter.rejects
+        assert (rejects["shape"], rejects["expiry"], rejects["signature"], rejects["kid"]) == (1, 1, 1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_id_tokens_are_checked_against_audience(signing_key):
+    async def scenario():
+        verifier = new_verifier(signing_key)
+        await verifier.jwks.load()
+        claims = access_claims(token_use="id", aud=CLIENT_ID)
+        del claims["client_id"]
+
+        assert (await verifier.verify(encode_token(signing_key, claims), TokenUse.ID))["aud"] == CLIENT_ID
+
+    asyncio.run(scenario())
+
+
+def test_revoked_token_is_rejected_even_when_cached(signing_key):
+    async def scenario():
+        verifier = new_verifier(signing_key)
+        await verifier.jwks.load()
+        token = encode_token(signing_key, access_claims())
+        other = encode_token(signing_key, access_claims(jti="jti-2", origin_jti="origin-2"))
+        await verifier.verify(token)
+
+        await verifier.revoke(token, RevocationScope.TOKEN)
+
+        with pytest.raises(UnauthorizedException):
+            await verifier.verify(token)
+        assert (await verifier.verify(other))["jti"] == "jti-2"
+
+    asyncio.run(scenario())
+
+
+def test_session_revocation_of_token_without_origin_jti_revokes_the_token(signing_key):
+    async def scenario():
+        verifier = new_verifier(signing_key)
+        await verifier.jwks.load()
+        claims = access_claims()
+        del claims["origin_jti"]
+        token = encode_token(signing_key, claims)
+
+        await verifier.revoke(token, RevocationScope.SESSION)
+
+        with pytest.raises(UnauthorizedException):
+            await verifier.verify(token)
+
+    asyncio.run(scenario())
+
+
+def test_user_revocation_applies_to_tokens_issued_before_its_second():
+    async def scenario():
+        denylist = new_denylist()
+        await denylist.revoke(RevocationScope.USER, "user-1", time.time() + 3600)
+        [(_, revoked_at, _)] = await denylist.store.entries()
+        revoked_at = int(revoked_at)
+
+        assert denylist.is_revoked(access_claims(iat=revoked_at - 1))
+        # Logging in again within the same second must work: 'iat' has whole-second precision
+        assert not denylist.is_revoked(access_claims(iat=revoked_at))
+        assert not denylist.is_revoked(access_claims(sub="user-2", iat=revoked_at - 1))
+
+    asyncio.run(scenario())
+
+
+def test_session_revocation_applies_to_every_token_of_the_session():
+    async def scenario():
+        denylist = new_denylist()
+        await denylist.revoke(RevocationScope.SESSION, "origin-1", time.time() + 3600)
+
+        assert denylist.is_revoked(access_claims(jti="refreshed", iat=int(time.time()) + 60))
+        assert not denylist.is_revoked(access_claims(origin_jti="origin-2"))
+        assert denylist.stats.hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_sync_picks_up_revocations_of_other_instances():
+    async def scenario():
+        store = InMemoryRevocationStore()
+        local, remote = new_denylist(store), new_denylist(store)
+        await local.load()
+        await remote.revoke(RevocationScope.TOKEN, "jti-1", time.time() + 3600)
+
+        assert not local.is_revoked(access_claims())
+        await local.sync()
+        assert local.is_revoked(access_claims())
+
+    asyncio.run(scenario())
+
+
+def test_expired_revocations_are_dropped_on_load():
+    async def scenario():
+        store = InMemoryRevocationStore()
+        await store.add("jti:old", time.time() - 7200, time.time() - 3600)
+        denylist = new_denylist(store)
+        await denylist.load()
+
+        assert not denylist.is_revoked(access_claims(jti="old"))
+
+    asyncio.run(scenario())
+
+
+def test_issuer_is_canonical_unless_configured(monkeypatch):
+    config = get_settings()
+    monkeypatch.setattr(config, "aws_region", "us-east-1")
+    monkeypatch.setattr(config, "aws_cognito_user_pool_id", "us-east-1_pool")
+    monkeypatch.setattr(config, "aws_cognito_endpoint", "http://localhost:9229/")
+    monkeypatch.setattr(config, "aws_cognito_issuer", None)
+
+    # The endpoint override only changes where the keys are fetched from
+    assert default_issuer() == ISSUER
+    assert default_jwks_url() == "http://localhost:9229/us-east-1_pool/.well-known/jwks.json"
+
+    monkeypatch.setattr(config, "aws_cognito_issuer", "http://localhost:9229/us-east-1_pool/")
+    assert default_issuer() == "http://localhost:9229/us-east-1_pool"
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.services.aws.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+def new_breaker(**overrides) -> CircuitBreaker:
+    breaker_settings = dict(window_size=4, minimum_calls=4, failure_rate_threshold=0.5, slow_call_duration=10.0,
+                            open_duration=0.05, half_open_max_calls=2)
+    breaker_settings.update(overrides)
+    return CircuitBreaker("test", **breaker_settings)
+
+
+async def succeed():
+    return "ok"
+
+
+async def fail():
+    raise RuntimeError("upstream failed")
+
+
+async def record(breaker: CircuitBreaker, *calls):
+    for call in calls:
+        try:
+            await breaker.call(call)
+        except RuntimeError:
+            pass
+
+
+def test_breaker_opens_at_failure_rate_and_fails_fast():
+    async def scenario():
+        breaker = new_breaker()
+        transitions = []
+        breaker.listeners.append(lambda _, previous, state: transitions.append((previous, state)))
+
+        await record(breaker, succeed, fail, succeed)
+        assert breaker.state == CircuitState.CLOSED
+        await record(breaker, fail)
+
+        assert breaker.state == CircuitState.OPEN
+        assert transitions == [(CircuitState.CLOSED, CircuitState.OPEN)]
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeed)
+
+    asyncio.run(scenario())
+
+
+def test_breaker_closes_after_successful_trial_calls():
+    async def scenario():
+        breaker = new_breaker()
+        await record(breaker, fail, fail, fail, fail)
+        await asyncio.sleep(0.06)
+
+        assert await breaker.call(succeed) == "ok"
+        assert breaker.state == CircuitState.HALF_OPEN
+        await breaker.call(succeed)
+
+        assert breaker.state == CircuitState.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_breaker_reopens_on_failed_trial_call():
+    async def scenario():
+        breaker = new_breaker()
+        await record(breaker, fail, fail, fail, fail)
+        await asyncio.sleep(0.06)
+
+        await record(breaker, fail)
+
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeed)
+
+    asyncio.run(scenario())
+
+
+def test_breaker_releases_trial_slot_of_cancelled_call():
+    async def scenario():
+        breaker = new_breaker(half_open_max_calls=1)
+        await record(breaker, fail, fail, fail, fail)
+        await asyncio.sleep(0.06)
+
+        trial = asyncio.ensure_future(breaker.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        assert await breaker.call(succeed) == "ok"
+        assert breaker.state == CircuitState.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_breaker_ignores_errors_that_are_not_failures():
+    async def scenario():
+        breaker = new_breaker(is_failure=lambda error: not isinstance(error, RuntimeError))
+        await record(breaker, fail, fail, fail, fail)
+
+        assert breaker.state == CircuitState.CLOSED
+
+    asyncio.run(scenario())
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from app.services.utils.redis_protocol import RedisClient, RedisError, encode_command, read_reply
+
+
+class RespStandIn:
+    """
+    Local stand-in for a Redis-protocol server implementing the commands of RedisRateLimitStore
+    (INCR, EXPIRE, GET) and the connection setup (AUTH, SELECT).
+    """
+
+    def __init__(self, password: str = "secret"):
+        self.password = password.encode()
+        self.data: Dict[bytes, int] = {}
+        self.ttls: Dict[bytes, int] = {}
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def reply(self, command: List[bytes]) -> bytes:
+        name = command[0].upper()
+        if name == b"INCR":
+            self.data[command[1]] = self.data.get(command[1], 0) + 1
+            return b":%d\r\n" % self.data[command[1]]
+        if name == b"EXPIRE":
+            self.ttls[command[1]] = int(command[2])
+            return b":1\r\n"
+        if name == b"GET":
+            value = self.data.get(command[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%d\r\n" % (len(str(value)), value)
+        if name == b"AUTH":
+            return b"+OK\r\n" if command[-1] == self.password else b"-WRONGPASS invalid password\r\n"
+        if name == b"SELECT":
+            return b"+OK\r\n"
+        return b"-ERR unknown command\r\n"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                writer.write(self.reply(await read_reply(reader)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            writer.close()
+
+
+def test_encode_command_sends_bulk_strings():
+    assert encode_command(("EXPIRE", "key", 120)) == b"*3\r\n$6\r\nEXPIRE\r\n$3\r\nkey\r\n$3\r\n120\r\n"
+
+
+def test_client_pipelines_commands_over_one_connection():
+    async def scenario():
+        server = RespStandIn()
+        port = await server.start()
+        client = RedisClient(f"redis://:secret@127.0.0.1:{port}/2", pool_size=2, timeout=1.0)
+        try:
+            replies = await client.execute(("INCR", "key"), ("INCR", "key"), ("PING",), ("GET", "key"))
+            assert replies[:2] == [1, 2] and replies[3] == b"2"
+            # Error replies are returned in place, keeping the connection usable
+            assert isinstance(replies[2], RedisError)
+            assert await client.execute(("GET", "missing")) == [None]
+            assert len(client._idle) == 1
+        finally:
+            await client.close()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_client_raises_when_authentication_fails():
+    async def scenario():
+        server = RespStandIn()
+        port = await server.start()
+        client = RedisClient(f"redis://:wrong@127.0.0.1:{port}", timeout=1.0)
+        try:
+            with pytest.raises(RedisError):
+                await client.execute(("GET", "key"))
+            assert client._idle == []
+        finally:
+            await client.close()
+            await server.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,108 @@
+"""
+Cold-start benchmark: import time breakdown and time to first response of a fresh worker.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and reports the total import
+time and the top-level packages that contribute most to it. Then starts uvicorn in a subprocess
+several times and measures the time from spawning the process to the first successful response
+from `/` and from `/ready` (i.e. until the startup warm-up has finished).
+
+Usage:
+    python -m benchmarks.bench_cold_start [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+
+def import_times() -> Tuple[float, Dict[str, float]]:
+    """
+    Returns the total import time of app.main and the self time per top-level package, in seconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=os.environ, check=True,
+    )
+    total = 0.0
+    by_package: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        package = module.strip().split(".")[0]
+        by_package[package] += int(self_us) / 1e6
+        if module.strip() == "app.main":
+            total = int(cumulative_us) / 1e6
+    return total, by_package
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, started: float, timeout: float) -> Optional[float]:
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(url, timeout=0.5).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.005)
+    return None
+
+
+def first_response() -> Tuple[Optional[float], Optional[float]]:
+    """
+    Starts a worker and returns the seconds until `/` and `/ready` first answer with 200.
+    """
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        root = wait_for(f"http://127.0.0.1:{port}/", started, timeout=30)
+        ready = wait_for(f"http://127.0.0.1:{port}/ready", started, timeout=60)
+        return root, ready
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(args):
+    total, by_package = import_times()
+    print(f"import app.main: {total * 1000:.1f} ms")
+    for package, seconds in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {package:<28} {seconds * 1000:>8.1f} ms self")
+
+    samples = [first_response() for _ in range(args.runs)]
+    roots = [root for root, _ in samples if root is not None]
+    readies = [ready for _, ready in samples if ready is not None]
+    print(f"\n{args.runs} worker starts")
+    if roots:
+        print(f"first response (/)      median {statistics.median(roots) * 1000:>8.1f} ms   "
+              f"max {max(roots) * 1000:>8.1f} ms")
+    if readies:
+        print(f"ready (/ready)          median {statistics.median(readies) * 1000:>8.1f} ms   "
+              f"max {max(readies) * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    main(parser.parse_args())
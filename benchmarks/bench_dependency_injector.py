@@ -0,0 +1,84 @@
+"""
+Microbenchmark of DependencyInjector.resolve() for each service scope.
+
+Resolves a small service graph (a service with two injected dependencies, one of which has a
+dependency of its own) and reports the cost per resolve() call for singleton, transient, scoped
+(inside an open scope) and factory registrations.
+
+Usage:
+    python -m benchmarks.bench_dependency_injector [--iterations 200000]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+from app.core.dependency_injector import DependencyInjector, ServiceScope  # noqa: E402
+
+
+class Settings:
+    pass
+
+
+class Cache:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+
+class Client:
+    def __init__(self, settings: Settings, timeout: float = 10.0):
+        self.settings = settings
+        self.timeout = timeout
+
+
+class Service:
+    def __init__(self, client: Client, cache: Cache):
+        self.client = client
+        self.cache = cache
+
+
+def make_injector(scope: ServiceScope) -> DependencyInjector:
+    injector = DependencyInjector()
+    injector.register(Settings, Settings, scope=ServiceScope.SINGLETON)
+    injector.register(Cache, Cache, scope=ServiceScope.SINGLETON)
+    injector.register(Client, Client, scope=ServiceScope.SINGLETON)
+    injector.register(Service, Service, scope=scope)
+    return injector
+
+
+def measure(injector: DependencyInjector, iterations: int) -> float:
+    resolve = injector.resolve
+    resolve(Service)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        resolve(Service)
+    return (time.perf_counter() - started) / iterations
+
+
+async def measure_in_scope(injector: DependencyInjector, iterations: int) -> float:
+    async with injector.scope():
+        return measure(injector, iterations)
+
+
+def main(args):
+    factory_injector = make_injector(ServiceScope.SINGLETON)
+    factory_injector.register_factory(Service, lambda client=None: Service(Client(Settings()), Cache(Settings())))
+
+    results = [
+        ("singleton", measure(make_injector(ServiceScope.SINGLETON), args.iterations)),
+        ("transient", measure(make_injector(ServiceScope.TRANSIENT), args.iterations)),
+        ("scoped", asyncio.run(measure_in_scope(make_injector(ServiceScope.SCOPED), args.iterations))),
+        ("factory", measure(factory_injector, args.iterations)),
+    ]
+    print(f"{args.iterations} resolve() calls per scope")
+    for label, seconds in results:
+        print(f"{label:<20} {seconds * 1e9:>8.0f} ns/resolve")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    main(parser.parse_args())
@@ -0,0 +1,101 @@
+"""
+Microbenchmark of log payload redaction against the previous top-level key masking.
+
+Redacts typical Cognito request and response payloads (an InitiateAuth request, an authentication
+result with nested tokens, an attribute update) with the previous `log_sensitive_data_remover`
+implementation and with `Redactor.redact()`, and reports the cost per payload. It also reports the
+cost of logging a payload with INFO disabled, where the lazy wrapper skips the redaction entirely.
+
+Usage:
+    python -m benchmarks.bench_redaction [--iterations 100000]
+"""
+import argparse
+import logging
+import time
+from typing import Callable
+
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+from app.core.redaction import redactor  # noqa: E402
+
+ACCESS_TOKEN = "eyJraWQiOiJrMSIsImFsZyI6IlJTMjU2In0.eyJzdWIiOiJ1c2VyIiwiZXhwIjo0MTAyNDQ0ODAwfQ." + "s" * 342
+
+PAYLOADS = {
+    "login request": {
+        "AuthFlow": "USER_PASSWORD_AUTH",
+        "ClientId": "benchmark-client",
+        "AuthParameters": {"USERNAME": "user@example.com", "PASSWORD": "Secret123!", "SECRET_HASH": "abc="},
+    },
+    "login response": {
+        "AuthenticationResult": {
+            "AccessToken": ACCESS_TOKEN, "IdToken": ACCESS_TOKEN, "RefreshToken": "r" * 1700,
+            "ExpiresIn": 3600, "TokenType": "Bearer",
+        },
+        "ChallengeParameters": {},
+    },
+    "attribute update": {
+        "AccessToken": ACCESS_TOKEN,
+        "UserAttributes": [
+            {"Name": "email", "Value": "user@example.com"},
+            {"Name": "phone_number", "Value": "+4915112345678"},
+            {"Name": "given_name", "Value": "Alex"},
+        ],
+    },
+}
+
+
+def legacy_remover(data: dict) -> dict:
+    """
+    The previous implementation: masks known top-level (and nested dict) keys, copying every dict.
+    """
+    sensitive_keys = [
+        'password', 'access_token', 'refresh_token', 'id_token',
+        'Password', 'PreviousPassword', 'ProposedPassword', 'PASSWORD', 'SECRET_HASH', 'SecretHash',
+        'REFRESH_TOKEN', 'AccessToken', 'RefreshToken', 'IdToken', 'Token', 'ClientSecret'
+    ]
+    return {
+        key: '***' if key in sensitive_keys else (
+            legacy_remover(value) if isinstance(value, dict) else value
+        )
+        for key, value in data.items()
+    }
+
+
+def measure(function: Callable, payload: dict, iterations: int) -> float:
+    function(payload)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function(payload)
+    return (time.perf_counter() - started) / iterations
+
+
+def measure_disabled_logging(payload: dict, iterations: int) -> float:
+    logger = logging.getLogger("benchmarks.redaction")
+    logger.setLevel(logging.WARNING)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        logger.info("Response: %s", redactor.lazy(payload))
+    return (time.perf_counter() - started) / iterations
+
+
+def main(args):
+    print(f"{args.iterations} redactions per payload")
+    print(f"{'payload':<18} {'legacy':>10} {'redactor':>10} {'INFO off':>10}")
+    for name, payload in PAYLOADS.items():
+        legacy = measure(legacy_remover, payload, args.iterations)
+        redacted = measure(redactor.redact, payload, args.iterations)
+        disabled = measure_disabled_logging(payload, args.iterations)
+        print(f"{name:<18} {legacy * 1e9:>7.0f} ns {redacted * 1e9:>7.0f} ns {disabled * 1e9:>7.0f} ns")
+
+    print("\nlegacy output leaves:", [
+        name for name, payload in PAYLOADS.items()
+        if any(secret in str(legacy_remover(payload)) for secret in (ACCESS_TOKEN, "user@example.com"))
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=100000)
+    main(parser.parse_args())
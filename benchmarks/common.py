@@ -0,0 +1,36 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+import os
+import statistics
+from typing import List
+
+BENCHMARK_ENVIRONMENT = {
+    "PROJECT_NAME": "benchmark",
+    "AWS_REGION": "us-east-1",
+    "AWS_COGNITO_USER_POOL_ID": "us-east-1_benchmark",
+    "AWS_COGNITO_CLIENT_ID": "benchmark-client",
+    "DYNAMODB_TABLE_NAME": "benchmark",
+    "DYNAMODB_ENDPOINT": "http://localhost:8001",
+    "S3_BUCKET_NAME": "benchmark",
+    "LOGGING_LEVEL": "WARNING",
+}
+
+
+def configure_environment():
+    """
+    Provides the settings required to import the application, unless they are already set.
+    """
+    for name, value in BENCHMARK_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Returns the `pct` percentile (0-100) of the samples.
+    """
+    if not samples:
+        return 0.0
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[min(98, max(0, int(pct) - 1))]